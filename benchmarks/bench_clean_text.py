@@ -0,0 +1,71 @@
+# benchmarks/bench_clean_text.py
+"""
+Débit de clean_text : ancienne implémentation (NFKC + 6 passes regex, dont 2 non
+compilées, un texte à la fois) vs clean_text_batch (passe fusionnée, raccourci ASCII).
+
+Corpus synthétique proche du trafic : commentaires majoritairement ASCII, avec
+ponctuation, allongements, URLs, emojis et un peu d'Unicode.
+
+  python -m benchmarks.bench_clean_text --n 20000
+"""
+import argparse
+import json
+import random
+import re
+import time
+import unicodedata
+
+from service import preprocess as pp
+
+
+def legacy_clean_text(s, enable_spellcorrect=True):
+    if s is None:
+        return s
+    pp._load_tokenizer_vocab()
+    s1 = unicodedata.normalize("NFKC", str(s))
+    s1 = pp.URL_RE.sub(" ", s1)
+    s1 = pp.EMOJI_RE.sub(" ", s1)
+    s1 = s1.lower()
+    s1 = re.sub(r"[^a-z0-9\s']", " ", s1)
+    s1 = re.sub(r"\s+", " ", s1).strip()
+    s1 = re.sub(r"(.)\1{2,}", r"\1\1", s1)
+    if not enable_spellcorrect or pp._TOKENIZER_VOCAB is None:
+        return s1
+    return " ".join(pp._correct_token_cached(t.strip()) for t in s1.split())
+
+
+def make_corpus(n, seed=0):
+    rng = random.Random(seed)
+    pp._load_tokenizer_vocab()
+    words = [w for w in pp._VOCAB.words if w and w != pp._VOCAB.oov_token]
+    decor = ["!!!", "...", "?", ",", "😃", "🎉", "https://example.com/x?y=1", "www.site.org",
+             "Soooo", "LOL", "café", "naïve", "“quoted”", "@user", "#tag", "\t", "  "]
+    out = []
+    for _ in range(n):
+        toks = [rng.choice(words) for _ in range(rng.choice([3, 8, 15, 30, 80]))]
+        for _ in range(rng.randrange(0, 4)):
+            toks.insert(rng.randrange(len(toks) + 1), rng.choice(decor))
+        s = " ".join(toks)
+        out.append(s.capitalize() if rng.random() < 0.5 else s)
+    return out
+
+
+def bench(name, fn, corpus):
+    t0 = time.perf_counter()
+    fn(corpus)
+    dt = time.perf_counter() - t0
+    return {"impl": name, "texts": len(corpus), "texts_per_s": round(len(corpus) / dt), "ms": round(dt * 1000, 1)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=20000)
+    args = ap.parse_args()
+    corpus = make_corpus(args.n)
+    ascii_share = sum(s.isascii() for s in corpus) / len(corpus)
+    print(json.dumps({"texts": len(corpus), "ascii_share": round(ascii_share, 3)}))
+    for spell in (False, True):
+        if spell:  # cache de correction chaud pour les deux implémentations
+            pp.clean_text_batch(corpus)
+        print(json.dumps({"spellcorrect": spell, **bench("legacy_per_text", lambda c: [legacy_clean_text(s, spell) for s in c], corpus)}))
+        print(json.dumps({"spellcorrect": spell, **bench("clean_text_batch", lambda c: pp.clean_text_batch(c, spell), corpus)}))
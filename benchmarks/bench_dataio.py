@@ -0,0 +1,71 @@
+# benchmarks/bench_dataio.py
+"""
+Chargement du CSV d'entraînement : ancienne implémentation (parse complet de toutes les
+colonnes puis .head(n).copy()) vs src.dataio.load_df (nrows + colonnes projetées) et
+iter_df (flux par chunks).
+
+Fichier synthétique au format Jigsaw (id, comment_text, 6 labels), 160k lignes par défaut,
+généré dans un dossier temporaire si --csv n'est pas fourni. Mémoire : pic tracemalloc
+(allocations Python + pandas/numpy pendant l'appel).
+
+  python -m benchmarks.bench_dataio --rows 160000 --n-rows 3000
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.bench_clean_text import make_corpus
+from src import dataio
+
+
+def legacy_load_df(csv_path, n_rows):
+    df_all = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    return df_all.head(n_rows).copy()
+
+
+def make_csv(path: Path, rows: int, seed: int = 0):
+    corpus = make_corpus(5000, seed=seed)
+    df = pd.DataFrame({"id": [f"{i:016x}" for i in range(rows)],
+                       "comment_text": [corpus[i % len(corpus)] for i in range(rows)]})
+    for j, lab in enumerate(dataio.LABEL_COLS):
+        df[lab] = [(i * (j + 3)) % 11 == 0 for i in range(rows)]
+        df[lab] = df[lab].astype(int)
+    df.to_csv(path, index=False)
+    return path
+
+
+def measure(name, fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rows = fn()
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"impl": name, "rows": rows, "s": round(dt, 3), "peak_mb": round(peak / 1e6, 1)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", default=None)
+    ap.add_argument("--rows", type=int, default=160000, help="taille du CSV synthétique")
+    ap.add_argument("--n-rows", type=int, default=3000)
+    ap.add_argument("--chunksize", type=int, default=dataio.CHUNKSIZE)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(args.csv) if args.csv else make_csv(Path(tmp) / "train.csv", args.rows)
+        print(json.dumps({"csv": str(csv), "mb": round(csv.stat().st_size / 1e6, 1)}))
+        for r in (
+            measure("legacy_head", lambda: len(legacy_load_df(csv, args.n_rows))),
+            measure("load_df_head", lambda: len(dataio.load_df(csv, args.n_rows))),
+            measure("load_df_text_only", lambda: len(dataio.load_df(csv, args.n_rows, columns=["id", "comment_text"]))),
+            measure("legacy_full", lambda: len(legacy_load_df(csv, None))),
+            measure("load_df_full", lambda: len(dataio.load_df(csv, None))),
+            measure("iter_df_stream", lambda: sum(len(c) for c in dataio.iter_df(csv, args.chunksize))),
+        ):
+            print(json.dumps(r))
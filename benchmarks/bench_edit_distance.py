@@ -0,0 +1,84 @@
+# benchmarks/bench_edit_distance.py
+"""
+Noyau de distance d'édition : DP complète O(n·m) en listes Python (ancien
+_levenshtein_distance) vs Myers bit-parallèle borné (_levenshtein_many, k = seuil).
+
+  - kernel : µs par paire (token, candidat) sur les candidats réels de l'index
+  - correction : µs par token inconnu pour _correct_token avec chaque noyau
+
+  python -m benchmarks.bench_edit_distance --n 300
+"""
+import argparse
+import json
+import time
+
+from service import preprocess as pp
+from benchmarks.bench_spellcorrect import make_cases
+
+
+def dp_distance(a: str, b: str) -> int:
+    """Ancien noyau : table DP complète, sans arrêt anticipé."""
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if la == 0: return lb
+    if lb == 0: return la
+    prev = list(range(lb + 1))
+    cur = [0] * (lb + 1)
+    for i, ca in enumerate(a, 1):
+        cur[0] = i
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (0 if ca == cb else 1))
+        prev, cur = cur, prev
+    return prev[lb]
+
+
+def dp_many(token, candidates, k=None):
+    return [dp_distance(token, c) for c in candidates]
+
+
+def _pairs(cases):
+    """(token, candidats filtrés par l'index, k) : exactement ce que vérifie le noyau en production."""
+    out = []
+    for t, _ in cases:
+        k = pp._max_distance_for(t)
+        lt = len(t)
+        cands = [w for w in pp._INDEX.words if abs(len(w) - lt) <= k][:200]
+        out.append((t, cands, k))
+    return out
+
+
+def bench_kernel(name, many, pairs):
+    n = sum(len(c) for _, c, _ in pairs)
+    t0 = time.perf_counter()
+    for t, cands, k in pairs:
+        many(t, cands, k)
+    dt = time.perf_counter() - t0
+    return {"kernel": name, "pairs": n, "us_per_pair": round(dt / n * 1e6, 2)}
+
+
+def bench_correction(name, many, cases):
+    orig = pp._levenshtein_many
+    pp._levenshtein_many = many
+    try:
+        t0 = time.perf_counter()
+        for t, _ in cases:
+            pp._correct_token(t)
+        dt = time.perf_counter() - t0
+    finally:
+        pp._levenshtein_many = orig
+    return {"kernel": name, "tokens": len(cases), "us_per_token": round(dt / len(cases) * 1e6, 1)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=300)
+    args = ap.parse_args()
+
+    pp._load_tokenizer_vocab()
+    cases = make_cases(args.n)
+    pairs = _pairs(cases)
+    for name, many in (("dp_full", dp_many), ("myers_bounded", pp._levenshtein_many)):
+        print(json.dumps(bench_kernel(name, many, pairs)))
+    for name, many in (("dp_full", dp_many), ("myers_bounded", pp._levenshtein_many)):
+        print(json.dumps(bench_correction(name, many, cases)))
@@ -0,0 +1,124 @@
+# benchmarks/bench_numpy_model.py
+"""
+Compare le backend Keras (model.keras) et le moteur NumPy (model_weights.npz, puis
+ses variantes float16 / int8) : temps de démarrage (import + chargement), RSS max
+du process, taille du fichier et latence de predict.
+
+Chaque backend est mesuré dans un sous-process neuf (RSS / imports non partagés).
+
+  python -m benchmarks.bench_numpy_model                  # artefacts de ./service
+  python -m benchmarks.bench_numpy_model --random-model   # modèle aléatoire (archi step2_train)
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+backend, path, batch, max_len = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+if backend == "keras":
+    import tensorflow as tf
+    model = tf.keras.models.load_model(path)
+else:
+    from service.numpy_model import NumpyBiLSTM
+    model = NumpyBiLSTM.load(path)
+import numpy as np
+startup = time.perf_counter() - t0
+arr = np.random.default_rng(0).integers(1, 8000, size=(batch, max_len)).astype("int32")
+model.predict(arr[:1], verbose=0)  # warmup
+lat = []
+for _ in range(10):
+    t1 = time.perf_counter()
+    model.predict(arr, verbose=0)
+    lat.append(time.perf_counter() - t1)
+lat.sort()
+# VmHWM (pic RSS du process courant) : ru_maxrss hériterait du pic du parent avant exec
+status = {l.split(":")[0]: l.split()[1] for l in open("/proc/self/status") if l.startswith(("VmHWM:", "VmRSS:"))}
+hwm_kb, rss_kb = int(status["VmHWM"]), int(status["VmRSS"])
+print(json.dumps({
+    "backend": backend,
+    "variant": getattr(model, "variant", "float32"),
+    "startup_s": round(startup, 3),
+    "max_rss_mb": round(hwm_kb / 1024, 1),
+    "rss_mb": round(rss_kb / 1024, 1),  # RSS stable après chargement (hors pic transitoire)
+    "predict_p50_ms": round(lat[len(lat) // 2] * 1000, 2),
+    "batch": batch,
+}))
+"""
+
+
+def _build_random_model(out_dir: Path):
+    import numpy as np
+    import tensorflow as tf
+    from tensorflow.keras import layers, models
+    from service.numpy_model import export_keras_weights
+
+    model = models.Sequential([
+        layers.Input(shape=(120,), dtype="int32"),
+        layers.Embedding(input_dim=8000, output_dim=64),
+        layers.Bidirectional(layers.LSTM(64)),
+        layers.Dropout(0.2),
+        layers.Dense(64, activation="relu"),
+        layers.Dense(6, activation="sigmoid"),
+    ])
+    model.predict(np.zeros((1, 120), dtype="int32"), verbose=0)
+    model.save(out_dir / "model.keras")
+    export_keras_weights(model, out_dir / "model_weights.npz")
+    return out_dir
+
+
+def _quantized_files(artifacts: Path, out_dir: Path):
+    """Variantes float16 / int8 de model_weights.npz (déjà exportées, sinon générées dans out_dir)."""
+    import numpy as np
+    from service.numpy_model import VARIANT_FILES, quantize_weights
+
+    files = []
+    for variant in ("float16", "int8"):
+        path = artifacts / VARIANT_FILES[variant]
+        if not path.exists():
+            with np.load(artifacts / "model_weights.npz") as data:
+                weights = {k: data[k] for k in data.files}
+            path = out_dir / VARIANT_FILES[variant]
+            np.savez(path, **quantize_weights(weights, variant))
+        files.append(path)
+    return files
+
+
+def run(artifacts: Path, batch: int, max_len: int):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        targets = [("keras", artifacts / "model.keras"), ("numpy", artifacts / "model_weights.npz")]
+        targets += [("numpy", p) for p in _quantized_files(artifacts, Path(tmp))]
+        for backend, path in targets:
+            if not path.exists():
+                continue
+            out = subprocess.run(
+                [sys.executable, "-c", _CHILD, backend, str(path), str(batch), str(max_len)],
+                capture_output=True, text=True, check=True,
+                env={"TF_CPP_MIN_LOG_LEVEL": "3", "PYTHONPATH": str(Path.cwd())},
+            )
+            res = json.loads(out.stdout.strip().splitlines()[-1])
+            res["file_mb"] = round(path.stat().st_size / 2**20, 2)
+            results.append(res)
+    return results
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--artifacts", default="service")
+    ap.add_argument("--random-model", action="store_true")
+    ap.add_argument("--batch", type=int, default=32)
+    ap.add_argument("--max-len", type=int, default=120)
+    args = ap.parse_args()
+
+    if args.random_model:
+        with tempfile.TemporaryDirectory() as d:
+            res = run(_build_random_model(Path(d)), args.batch, args.max_len)
+    else:
+        res = run(Path(args.artifacts), args.batch, args.max_len)
+    for r in res:
+        print(json.dumps(r))
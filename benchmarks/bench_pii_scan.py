@@ -0,0 +1,105 @@
+# benchmarks/bench_pii_scan.py
+"""
+Passe regex DCP : ancienne implémentation (7 re.sub successifs, closures de comptage)
+vs service.pii_scan.PiiScrubber (préfiltres, subn, EMAIL linéaire).
+
+Deux familles d'entrées :
+  corpus      commentaires réalistes (benchmarks.bench_clean_text.make_corpus) avec
+              quelques DCP injectées -> débit en textes/s
+  pathologic  longues suites de caractères qui font backtracker / rebalayer les motifs
+              (local-part d'email sans '@', pseudo-IP, chiffres espacés, ...) -> ms par texte
+
+  python -m benchmarks.bench_pii_scan --n 20000 --size 20000
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from benchmarks.bench_clean_text import make_corpus
+from service.pii_scan import ADDRESS_RE, CREDIT_CARD_RE, REGEX_PATTERNS, USERNAME_RE, PiiScrubber
+
+
+def legacy_scrub(text, counts, use_label_tokens=True):
+    def _mask(label):
+        return label if use_label_tokens else "****"
+
+    if not text:
+        return text
+    tmp = text
+    for label in ["EMAIL", "IP", "PHONE", "URL"]:
+        def repl(m, L=label):
+            counts[L] = counts.get(L, 0) + 1
+            return _mask(L)
+        tmp = REGEX_PATTERNS[label].sub(repl, tmp)
+    tmp = ADDRESS_RE.sub(lambda m: (counts.__setitem__("ADDRESS", counts.get("ADDRESS", 0) + 1)) or _mask("ADDRESS"), tmp)
+
+    def cc_repl(m):
+        digits = re.sub(r"\D", "", m.group(0))
+        if 13 <= len(digits) <= 19:
+            counts["CREDIT_CARD"] = counts.get("CREDIT_CARD", 0) + 1
+            return _mask("CREDIT_CARD")
+        return m.group(0)
+    tmp = CREDIT_CARD_RE.sub(cc_repl, tmp)
+    return USERNAME_RE.sub(lambda m: (counts.__setitem__("USERNAME", counts.get("USERNAME", 0) + 1)) or _mask("USERNAME"), tmp)
+
+
+PII = ["john.doe@example.com", "192.168.1.20", "+33 6 12 34 56 78", "http://example.com/u/1",
+       "12 rue de la Paix", "4111 1111 1111 1111", "@someone"]
+
+
+def make_pii_corpus(n, pii_share=0.1, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for s in make_corpus(n, seed=seed):
+        if rng.random() < pii_share:
+            s = f"{s} {rng.choice(PII)}"
+        out.append(s)
+    return out
+
+
+def pathological(size):
+    return {
+        "email_local_no_at": "a" * size,
+        "email_local_bad_domain": "a" * size + "@",
+        "dotted_digits": "1.2.3." * (size // 6),
+        "digits": "1" * size,
+        "spaced_digits": "1 " * (size // 2),
+        "digits_dash_runs": "1 - - - " * (size // 8),
+        "at_runs": ("a" * 50 + "@x ") * (size // 53),
+        "address_words": "12 street " * (size // 10),
+    }
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=20000, help="textes du corpus réaliste")
+    ap.add_argument("--size", type=int, default=20000, help="caractères par texte pathologique")
+    args = ap.parse_args()
+    scrub = PiiScrubber().scrub
+
+    corpus = make_pii_corpus(args.n)
+    legacy_counts = [{} for _ in corpus]
+    legacy, dt_legacy = _timed(lambda: [legacy_scrub(t, c) for t, c in zip(corpus, legacy_counts)])
+    fast_counts = [{} for _ in corpus]
+    fast, dt_fast = _timed(lambda: [scrub(t, c) for t, c in zip(corpus, fast_counts)])
+    assert fast == legacy and fast_counts == legacy_counts
+    print(json.dumps({"input": "corpus", "texts": len(corpus),
+                      "legacy_texts_per_s": round(len(corpus) / dt_legacy),
+                      "scrubber_texts_per_s": round(len(corpus) / dt_fast),
+                      "speedup": round(dt_legacy / dt_fast, 1)}))
+
+    for name, text in pathological(args.size).items():
+        c1, c2 = {}, {}
+        out1, dt1 = _timed(lambda: legacy_scrub(text, c1))
+        out2, dt2 = _timed(lambda: scrub(text, c2))
+        assert out1 == out2 and c1 == c2, name
+        print(json.dumps({"input": name, "chars": len(text), "legacy_ms": round(dt1 * 1000, 2),
+                          "scrubber_ms": round(dt2 * 1000, 2)}))
@@ -0,0 +1,78 @@
+# benchmarks/bench_preprocess_pool.py
+"""
+Débit du prétraitement de /predict (clean_text_batch + tokenisation) sous charge
+concurrente : threads seuls (comportement par défaut de FastAPI) vs PreprocessPool
+avec 1..N workers.
+
+Chaque "requête" = 8 commentaires, envoyée par `--clients` threads en parallèle.
+Le corpus contient des fautes de frappe uniques pour que la correction
+orthographique (cache LRU froid) domine, comme sur du trafic réel.
+
+  python -m benchmarks.bench_preprocess_pool --n 4000 --clients 16
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from service import preprocess as pp
+from service.preprocess_pool import PreprocessPool
+from service.tokenizer import BatchTokenizer
+
+MAX_LEN = 120
+REQ_SIZE = 8
+
+
+def make_corpus(n, seed=0):
+    rng = random.Random(seed)
+    words = [w for w in pp.load_vocab().words if len(w) > 3]
+    out = []
+    for i in range(n):
+        toks = [rng.choice(words) for _ in range(rng.choice([5, 12, 25, 50]))]
+        # 1 token sur 5 avec une faute unique au texte -> passe par le correcteur
+        for j in range(0, len(toks), 5):
+            w = toks[j]
+            p = rng.randrange(1, len(w))
+            toks[j] = w[:p] + "qz"[i % 2] + w[p + 1:]
+        out.append(" ".join(toks) + " !!")
+    return out
+
+
+def run(name, fn, corpus, clients):
+    reqs = [corpus[i:i + REQ_SIZE] for i in range(0, len(corpus), REQ_SIZE)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(clients) as ex:
+        list(ex.map(fn, reqs))
+    dt = time.perf_counter() - t0
+    return {"impl": name, "texts": len(corpus), "clients": clients,
+            "texts_per_s": round(len(corpus) / dt), "ms": round(dt * 1000, 1)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=4000)
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+    print(json.dumps({"cpu_count": os.cpu_count(), "texts": args.n, "req_size": REQ_SIZE}))
+
+    tok = BatchTokenizer.from_vocab(pp.load_vocab())
+
+    def inline(texts):
+        return tok.encode_batch(pp.clean_text_batch(texts), MAX_LEN, assume_clean=True)
+
+    # corpus différent à chaque mesure : le cache de correction ne sert pas d'un run à l'autre
+    print(json.dumps(run("threads", inline, make_corpus(args.n, seed=0), args.clients)))
+    workers = 1
+    while workers <= args.max_workers:
+        pool = PreprocessPool(workers, chunk_size=REQ_SIZE)
+        pool.warmup()
+        try:
+            res = run(f"pool_{workers}", lambda t: pool.clean_and_encode(t, MAX_LEN),
+                      make_corpus(args.n, seed=workers), args.clients)
+        finally:
+            pool.close()
+        print(json.dumps(res))
+        workers *= 2
@@ -0,0 +1,105 @@
+# benchmarks/bench_spellcorrect.py
+"""
+Correction orthographique : index de bigrammes (service/preprocess.py) vs l'ancien
+scan du bucket "même première lettre" limité à _MAX_CANDIDATES=200 mots.
+
+Jeu de test synthétique : mots du vocabulaire avec 1 ou 2 fautes aléatoires
+(substitution / insertion / suppression / transposition).
+  - latence : temps moyen par token inconnu (cache froid, pas de lru_cache)
+  - rappel  : part des tokens ramenés au mot d'origine
+
+  python -m benchmarks.bench_spellcorrect --n 500
+"""
+import argparse
+import json
+import random
+import time
+
+from service import preprocess as pp
+
+_LEGACY_MAX_CANDIDATES = 200
+
+
+def _legacy_buckets():
+    buckets = {}
+    for w in pp._TOKENIZER_VOCAB:
+        if w:
+            buckets.setdefault(w[0], []).append(w)
+    top = sorted(pp._TOKENIZER_VOCAB, key=lambda x: -pp._VOCAB.count(x))
+    return buckets, top
+
+
+def legacy_correct(token, buckets, top):
+    """Ancien algorithme (avant l'index) : 200 premiers mots du bucket de la 1re lettre."""
+    if token in pp._TOKENIZER_VOCAB:
+        return token
+    candidates = buckets.get(token[0], [])[:_LEGACY_MAX_CANDIDATES] or top[:_LEGACY_MAX_CANDIDATES]
+    best, best_score = None, -1.0
+    for c in candidates:
+        if abs(len(c) - len(token)) > 4:
+            continue
+        dist = pp._levenshtein_distance(token, c)
+        if dist > pp._MAX_DISTANCE:
+            continue
+        ratio = 1.0 - (dist / max(len(c), len(token), 1))
+        if ratio < pp._MIN_RATIO:
+            continue
+        freq = pp._VOCAB.count(c)
+        score = ratio + (freq / (freq + 1000)) * 0.001
+        if score > best_score:
+            best_score, best = score, c
+    return best if best is not None else token
+
+
+def _typo(w, rng, n_edits):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    s = list(w)
+    for _ in range(n_edits):
+        op = rng.choice("sidt") if len(s) > 1 else "i"
+        i = rng.randrange(len(s))
+        if op == "s":
+            s[i] = rng.choice(letters)
+        elif op == "i":
+            s.insert(i, rng.choice(letters))
+        elif op == "d":
+            del s[i]
+        elif i + 1 < len(s):
+            s[i], s[i + 1] = s[i + 1], s[i]
+    return "".join(s)
+
+
+def make_cases(n, seed=0):
+    rng = random.Random(seed)
+    # mots assez longs pour qu'une correction soit admissible (ratio >= 0.70)
+    vocab = sorted(w for w in pp._TOKENIZER_VOCAB if len(w) >= 4 and w.isalpha())
+    cases = []
+    while len(cases) < n:
+        w = rng.choice(vocab)
+        t = _typo(w, rng, 1 if rng.random() < 0.7 else 2)
+        if t and t not in pp._TOKENIZER_VOCAB:
+            cases.append((t, w))
+    return cases
+
+
+def bench(name, fn, cases):
+    t0 = time.perf_counter()
+    out = [fn(t) for t, _ in cases]
+    dt = time.perf_counter() - t0
+    hits = sum(o == w for o, (_, w) in zip(out, cases))
+    return {"impl": name, "n": len(cases), "us_per_token": round(dt / len(cases) * 1e6, 1),
+            "recall": round(hits / len(cases), 3)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    pp._load_tokenizer_vocab()
+    print(json.dumps({"vocab": len(pp._TOKENIZER_VOCAB), "load_and_index_s": round(time.perf_counter() - t0, 3)}))
+    buckets, top = _legacy_buckets()
+    cases = make_cases(args.n, args.seed)
+    print(json.dumps(bench("legacy_bucket_scan", lambda t: legacy_correct(t, buckets, top), cases)))
+    print(json.dumps(bench("qgram_index", pp._correct_token, cases)))
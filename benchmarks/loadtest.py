@@ -0,0 +1,273 @@
+# benchmarks/loadtest.py
+"""
+Test de charge local de l'API : lance uvicorn (modèle factice ou réel), envoie des
+requêtes /predict et rapporte débit + percentiles de latence.
+
+Modes :
+  --mode closed --concurrency 32    boucle fermée : C clients, chacun renvoie dès la réponse
+  --mode open   --rate 200          boucle ouverte : arrivées de Poisson à R req/s, latence
+                                    mesurée depuis l'instant d'arrivée prévu (pas d'omission
+                                    coordonnée si le service prend du retard)
+Charge :
+  --sizes 1:0.6,5:0.3,50:0.1        mélange (textes par requête : poids)
+  --dup 0.3                         part des textes tirés d'un petit ensemble "chaud" (doublons)
+Cible :
+  --model stub|real                 benchmarks.loadtest_server:app ou service.app:app
+  --workers N                       process uvicorn ; les autres réglages passent par
+                                    l'environnement (BATCH_MAX_SIZE, PRED_CACHE_SIZE, ...)
+  --url http://...                  serveur déjà lancé (rien n'est démarré)
+
+  python -m benchmarks.loadtest --mode open --rate 100 --duration 30 --dup 0.3
+  BATCH_MAX_SIZE=1 python -m benchmarks.loadtest --mode closed --concurrency 16 --json out.json
+
+Client et serveur partagent la machine : comparer des réglages sur le même hardware,
+avec le même profil de charge.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.bench_clean_text import make_corpus
+
+PERCENTILES = (50, 95, 99, 99.9)
+
+
+# ------------ charge ------------
+def parse_sizes(spec: str):
+    """'1:0.6,5:0.3,50:0.1' -> ([1, 5, 50], [0.6, 0.3, 0.1])"""
+    sizes, weights = [], []
+    for part in spec.split(","):
+        size, _, w = part.partition(":")
+        sizes.append(int(size))
+        weights.append(float(w or 1))
+    return sizes, weights
+
+
+class PayloadFactory:
+    """Requêtes de taille tirée selon le mélange ; `dup` des textes viennent d'un pool chaud."""
+
+    def __init__(self, sizes, weights, dup: float, seed: int = 0, corpus_size: int = 20000, hot_size: int = 50):
+        self.rng = random.Random(seed)
+        self.sizes, self.weights, self.dup = sizes, weights, dup
+        corpus = make_corpus(corpus_size + hot_size, seed=seed)
+        self.hot, self.cold = corpus[:hot_size], corpus[hot_size:]
+        self._i = 0
+
+    def _text(self):
+        if self.rng.random() < self.dup:
+            return self.rng.choice(self.hot)
+        # textes "froids" uniques tant que le corpus n'est pas épuisé, suffixés ensuite
+        t = self.cold[self._i % len(self.cold)]
+        n = self._i // len(self.cold)
+        self._i += 1
+        return t if n == 0 else f"{t} {n}"
+
+    def __call__(self):
+        k = self.rng.choices(self.sizes, self.weights)[0]
+        return [self._text() for _ in range(k)]
+
+
+# ------------ mesure ------------
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.status = Counter()
+        self.texts = 0
+
+    def add(self, latency_s, status, n_texts):
+        self.status[status] += 1
+        if status == 200:
+            self.latencies.append(latency_s)
+            self.texts += n_texts
+
+    def report(self, elapsed_s, **extra):
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            if not lat:
+                return None
+            i = min(len(lat) - 1, max(0, int(round(p / 100.0 * len(lat))) - 1))
+            return round(lat[i] * 1000, 2)
+
+        total = sum(self.status.values())
+        return {
+            **extra,
+            "elapsed_s": round(elapsed_s, 2),
+            "requests": total,
+            "ok": len(lat),
+            "status": {str(k): v for k, v in sorted(self.status.items(), key=lambda kv: str(kv[0]))},
+            "throughput_rps": round(len(lat) / elapsed_s, 1) if elapsed_s else 0.0,
+            "throughput_texts_s": round(self.texts / elapsed_s, 1) if elapsed_s else 0.0,
+            "latency_ms": {f"p{p:g}": pct(p) for p in PERCENTILES} | {
+                "mean": round(sum(lat) / len(lat) * 1000, 2) if lat else None,
+                "max": round(lat[-1] * 1000, 2) if lat else None,
+            },
+        }
+
+
+async def _send(client, url, texts, rec, t_start):
+    try:
+        r = await client.post(url, json={"texts": texts})
+        status = r.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    rec.add(time.perf_counter() - t_start, status, len(texts))
+
+
+async def run_closed(url, make_payload, concurrency, duration, warmup):
+    rec = Recorder()
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=concurrency)) as client:
+        t_warm = time.perf_counter() + warmup
+        t_end = t_warm + duration
+
+        async def user():
+            while True:
+                now = time.perf_counter()
+                if now >= t_end:
+                    return
+                target = rec if now >= t_warm else Recorder()  # requêtes de chauffe non comptées
+                await _send(client, url, make_payload(), target, now)
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+    return rec, duration
+
+
+async def run_open(url, make_payload, rate, duration, warmup, seed=0):
+    rng = random.Random(seed)
+    rec = Recorder()
+    tasks = []
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=1000)) as client:
+        t0 = time.perf_counter()
+        t_warm, t_end = t0 + warmup, t0 + warmup + duration
+        t_next = t0
+        while t_next < t_end:
+            delay = t_next - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            target = rec if t_next >= t_warm else Recorder()
+            # la latence part de l'arrivée prévue t_next, pas de l'envoi effectif
+            tasks.append(asyncio.ensure_future(_send(client, url, make_payload(), target, t_next)))
+            t_next += rng.expovariate(rate)
+        await asyncio.gather(*tasks)
+        # requêtes encore en vol à la fin : leur latence compte, le débit porte sur la fenêtre mesurée
+        elapsed = max(duration, time.perf_counter() - t_warm)
+    return rec, elapsed
+
+
+# ------------ serveur local ------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(model: str, workers: int, port: int, timeout_s: float = 120.0):
+    target = "benchmarks.loadtest_server:app" if model == "stub" else "service.app:app"
+    cmd = [sys.executable, "-m", "uvicorn", target, "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, start_new_session=True)
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn s'est arrêté (code {proc.returncode})")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=2).json().get("status") == "ready":
+                return proc
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.3)
+    stop_server(proc)
+    raise RuntimeError("uvicorn n'est pas prêt (timeout)")
+
+
+def stop_server(proc):
+    if proc.poll() is None:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+
+
+def _server_summary(health: dict) -> dict:
+    """Extrait de /health utile pour interpréter le run (batching, cache, admission)."""
+    batching, cache, admission = (health.get(k) or {} for k in ("batching", "cache", "admission"))
+    return {
+        "mean_batch_size": batching.get("mean_batch_size"),
+        "cache_hit_rate": cache.get("hit_rate"),
+        "admission_limit": admission.get("limit"),
+        "admission_rejected": admission.get("rejected"),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["closed", "open"], default="closed")
+    ap.add_argument("--concurrency", type=int, default=16, help="clients (mode closed)")
+    ap.add_argument("--rate", type=float, default=50.0, help="requêtes/s (mode open)")
+    ap.add_argument("--duration", type=float, default=20.0, help="secondes mesurées")
+    ap.add_argument("--warmup", type=float, default=3.0, help="secondes de chauffe non mesurées")
+    ap.add_argument("--sizes", default="1:0.6,5:0.3,50:0.1", help="textes par requête:poids")
+    ap.add_argument("--dup", type=float, default=0.2, help="part de textes en doublon (pool chaud)")
+    ap.add_argument("--model", choices=["stub", "real"], default="stub")
+    ap.add_argument("--workers", type=int, default=1, help="process uvicorn")
+    ap.add_argument("--url", default=None, help="serveur existant (ex. http://127.0.0.1:8080)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", default=None, help="écrit aussi le rapport dans ce fichier")
+    args = ap.parse_args(argv)
+
+    sizes, weights = parse_sizes(args.sizes)
+    make_payload = PayloadFactory(sizes, weights, args.dup, seed=args.seed)
+
+    proc = None
+    base = args.url
+    if base is None:
+        port = _free_port()
+        proc = start_server(args.model, args.workers, port)
+        base = f"http://127.0.0.1:{port}"
+    try:
+        url = base.rstrip("/") + "/predict"
+        if args.mode == "closed":
+            rec, elapsed = asyncio.run(run_closed(url, make_payload, args.concurrency, args.duration, args.warmup))
+        else:
+            rec, elapsed = asyncio.run(run_open(url, make_payload, args.rate, args.duration, args.warmup, args.seed))
+        try:
+            health = httpx.get(base.rstrip("/") + "/health", timeout=5).json()
+        except (httpx.HTTPError, ValueError):
+            health = {}
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    report = rec.report(
+        elapsed,
+        mode=args.mode,
+        concurrency=args.concurrency if args.mode == "closed" else None,
+        rate=args.rate if args.mode == "open" else None,
+        sizes=args.sizes,
+        dup=args.dup,
+        model=args.model if args.url is None else args.url,
+        workers=args.workers,
+        env={k: v for k, v in os.environ.items()
+             if k.startswith(("BATCH_", "PRED_CACHE", "PREPROC_", "ADMIT_", "PAD_", "LOADTEST_", "MODEL_BACKEND"))},
+        server=_server_summary(health),
+    )
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
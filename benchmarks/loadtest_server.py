@@ -0,0 +1,58 @@
+# benchmarks/loadtest_server.py
+"""
+Application servie par benchmarks/loadtest.py en mode `--model stub` :
+service.app tel quel (nettoyage, cache, batching, admission...), seuls le modèle
+et le startup sont remplacés par un modèle factice au coût CPU réglable.
+
+  LOADTEST_STUB_BASE_MS  coût fixe par appel model.predict (défaut 2)
+  LOADTEST_STUB_ROW_MS   coût par ligne (défaut 0.2)
+
+  uvicorn benchmarks.loadtest_server:app --port 8090
+"""
+import os
+import time
+
+os.environ["APP_SKIP_STARTUP"] = "1"
+
+import numpy as np
+
+from service import app as service_app
+
+BASE_S = float(os.getenv("LOADTEST_STUB_BASE_MS", "2")) / 1000.0
+ROW_S = float(os.getenv("LOADTEST_STUB_ROW_MS", "0.2")) / 1000.0
+
+
+class StubModel:
+    """Coût CPU (boucle active, GIL tenu comme un vrai forward NumPy) = base + lignes x row."""
+    mask_zero = True
+
+    def predict(self, arr, verbose=0):
+        deadline = time.perf_counter() + BASE_S + ROW_S * arr.shape[0]
+        while time.perf_counter() < deadline:
+            pass
+        # score "toxic" pseudo-aléatoire mais déterministe par contenu
+        score = (arr.sum(axis=1, keepdims=True) % 100) / 100.0
+        return np.repeat(score.astype("float32"), 6, axis=1)
+
+
+@service_app.app.on_event("startup")
+async def _install_stub():
+    service_app.tokenizer = service_app._load_tokenizer()
+    service_app.LABELS = ["toxic", "severe_toxic", "obscene", "threat", "insult", "identity_hate"]
+    service_app.model = StubModel()
+    service_app.MODEL_VERSION = "stub"
+    if service_app.BATCH_MAX_SIZE > 1:
+        service_app.batcher = service_app.MicroBatcher(
+            service_app._forward, max_batch_size=service_app.BATCH_MAX_SIZE,
+            max_wait_ms=service_app.BATCH_MAX_WAIT_MS,
+        )
+    if service_app.PREPROC_WORKERS > 0:
+        pool = service_app.PreprocessPool(
+            service_app.PREPROC_WORKERS, max_inflight=service_app.PREPROC_MAX_INFLIGHT,
+            chunk_size=service_app.PREPROC_CHUNK,
+        )
+        pool.warmup()
+        service_app.preproc_pool = pool
+
+
+app = service_app.app
@@ -0,0 +1,236 @@
+# benchmarks/suite.py
+"""
+Suite de micro-benchmarks du chemin de service, exécutable hors ligne :
+
+  clean_text          clean_text_batch sur un corpus réaliste, sans / avec correction (cache chaud)
+  correct_token       _correct_token à froid (sans lru) et _correct_token_cached à chaud
+  tokenize            BatchTokenizer.encode_batch sur les textes nettoyés
+  pad                 app._pad sur des séquences de longueurs variées
+  predict_e2e         POST /predict (TestClient, APP_SKIP_STARTUP=1, modèle factice)
+
+Chaque cas est répété `--repeat` fois ; on garde la médiane (µs par élément).
+Les résultats sont écrits en JSON (défaut : benchmarks/results/<commit>.json) ;
+avec `--baseline`, chaque cas est comparé et le process sort en erreur (code 1)
+si un cas est plus lent que la référence de plus de `--threshold` (défaut 15 %).
+Les comparaisons n'ont de sens que sur la même machine.
+
+  python -m benchmarks.suite                                   # mesure + JSON
+  python -m benchmarks.suite --baseline benchmarks/results/abc1234.json
+  python -m benchmarks.suite --quick --only clean_text,pad
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.bench_clean_text import make_corpus
+from benchmarks.bench_spellcorrect import make_cases
+from service import preprocess as pp
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_THRESHOLD = 0.15
+
+
+def _measure(fn, n_items, repeat, setup=None):
+    """-> dict : médiane et runs en µs par élément (setup() appelé avant chaque run, non chronométré)."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) / n_items * 1e6)
+    return {"us_per_item": round(statistics.median(runs), 3), "items": n_items,
+            "runs_us": [round(r, 3) for r in runs]}
+
+
+# ------------ cas ------------
+def case_clean_text(scale, repeat):
+    corpus = make_corpus(int(5000 * scale))
+    pp.clean_text_batch(corpus)  # cache de correction chaud
+    return {
+        "clean_text_nospell": _measure(lambda: pp.clean_text_batch(corpus, False), len(corpus), repeat),
+        "clean_text_spell_warm": _measure(lambda: pp.clean_text_batch(corpus, True), len(corpus), repeat),
+    }
+
+
+def case_correct_token(scale, repeat):
+    pp._load_tokenizer_vocab()
+    tokens = [t for t, _ in make_cases(int(300 * scale))]
+    cold = _measure(lambda: [pp._correct_token(t) for t in tokens], len(tokens), repeat)
+    [pp._correct_token_cached(t) for t in tokens]
+    warm = _measure(lambda: [pp._correct_token_cached(t) for t in tokens], len(tokens), repeat)
+    return {"correct_token_cold": cold, "correct_token_warm": warm}
+
+
+def _tokenizer():
+    from service.tokenizer import BatchTokenizer
+    return BatchTokenizer.from_vocab(pp.load_vocab())
+
+
+def case_tokenize(scale, repeat):
+    tok = _tokenizer()
+    cleaned = pp.clean_text_batch(make_corpus(int(5000 * scale)), False)
+    return {"tokenize": _measure(lambda: tok.encode_batch(cleaned, 120, assume_clean=True), len(cleaned), repeat)}
+
+
+def case_pad(scale, repeat):
+    from service import app
+    rng = np.random.default_rng(0)
+    seqs = [rng.integers(1, 8000, size=int(n)).astype("int32") for n in rng.integers(0, 200, size=int(5000 * scale))]
+    return {"pad": _measure(lambda: app._pad(seqs, 120), len(seqs), repeat)}
+
+
+class _StubModel:
+    """Modèle factice : coût négligeable, même interface que NumpyBiLSTM."""
+    mask_zero = True
+
+    def predict(self, arr, verbose=0):
+        return np.full((arr.shape[0], 6), 0.1, dtype="float32")
+
+
+_E2E_GLOBALS = ("tokenizer", "LABELS", "model", "batcher", "admission")
+
+
+def case_predict_e2e(scale, repeat):
+    from fastapi.testclient import TestClient
+    from service import app
+
+    # globals de l'app et APP_SKIP_STARTUP remis en l'état après le cas
+    saved = {name: getattr(app, name) for name in _E2E_GLOBALS}
+    saved_env = os.environ.get("APP_SKIP_STARTUP")
+    os.environ["APP_SKIP_STARTUP"] = "1"
+    try:
+        app.tokenizer = _tokenizer()
+        app.LABELS = ["toxic", "severe_toxic", "obscene", "threat", "insult", "identity_hate"]
+        app.model = _StubModel()
+        app.batcher = None
+        app.admission = None
+        client = TestClient(app.app)
+        corpus = make_corpus(int(2000 * scale), seed=1)
+        payloads = [corpus[i:i + 8] for i in range(0, len(corpus), 8)]
+
+        def run():
+            for p in payloads:
+                client.post("/predict", json={"texts": p})
+
+        def cold_cache():
+            if app.cache is not None:
+                app.cache.clear()
+
+        return {"predict_e2e": _measure(run, len(payloads), repeat, setup=cold_cache)}
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+        if saved_env is None:
+            os.environ.pop("APP_SKIP_STARTUP", None)
+        else:
+            os.environ["APP_SKIP_STARTUP"] = saved_env
+
+
+CASES = {
+    "clean_text": case_clean_text,
+    "correct_token": case_correct_token,
+    "tokenize": case_tokenize,
+    "pad": case_pad,
+    "predict_e2e": case_predict_e2e,
+}
+
+
+# ------------ comparaison ------------
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD):
+    """-> (lignes de rapport, noms des cas en régression). Cas absents d'un côté ignorés."""
+    lines, regressions = [], []
+    for name, cur in sorted(current["results"].items()):
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            lines.append(f"{name:<24} {cur['us_per_item']:>12.3f} µs   (nouveau)")
+            continue
+        ratio = cur["us_per_item"] / base["us_per_item"] if base["us_per_item"] else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+            flag = "  <-- RÉGRESSION"
+        lines.append(f"{name:<24} {base['us_per_item']:>12.3f} -> {cur['us_per_item']:>12.3f} µs  "
+                     f"({(ratio - 1) * 100:+.1f} %){flag}")
+    return lines, regressions
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(only=None, scale=1.0, repeat=5):
+    results = {}
+    for name, fn in CASES.items():
+        if only and name not in only:
+            continue
+        try:
+            results.update(fn(scale, repeat))
+        except ImportError as e:  # ex. fastapi/httpx absents : cas sauté, pas d'échec
+            print(f"[skip] {name} : {e}", file=sys.stderr)
+    return {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--only", default="", help="cas séparés par des virgules : " + ",".join(CASES))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--quick", action="store_true", help="corpus 5x plus petits, 3 répétitions")
+    ap.add_argument("--out", default=None, help="fichier JSON (défaut : benchmarks/results/<commit>.json)")
+    ap.add_argument("--baseline", default=None, help="JSON de référence à comparer")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="régression tolérée (0.15 = +15 %% de temps par élément)")
+    args = ap.parse_args(argv)
+
+    only = {c for c in args.only.split(",") if c}
+    unknown = only - set(CASES)
+    if unknown:
+        ap.error(f"cas inconnus : {sorted(unknown)}")
+    scale, repeat = (0.2, min(args.repeat, 3)) if args.quick else (1.0, args.repeat)
+
+    current = run_suite(only, scale, repeat)
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{current['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(current, indent=2), encoding="utf-8")
+    for name, r in current["results"].items():
+        print(f"{name:<24} {r['us_per_item']:>12.3f} µs/élément")
+    print(f"-> {out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        lines, regressions = compare(current, baseline, args.threshold)
+        print(f"\nComparaison avec {args.baseline} (commit {baseline.get('meta', {}).get('commit')}, "
+              f"seuil +{args.threshold * 100:.0f} %) :")
+        print("\n".join(lines))
+        if regressions:
+            print(f"\nÉCHEC : {len(regressions)} cas en régression : {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
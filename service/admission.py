@@ -0,0 +1,135 @@
+# service/admission.py
+"""
+Contrôle d'admission pour /predict : limite adaptative de requêtes en cours
+et rejet précoce (429 + Retry-After) plutôt qu'une file sans fin.
+
+- `limit` requêtes au plus s'exécutent en parallèle ; les suivantes attendent
+  dans une file FIFO.
+- la limite s'adapte au temps de service mesuré (AIMD sur le gradient de latence) :
+  tant que le temps de service reste proche du meilleur temps observé, on ajoute
+  ~1 slot par "tour" de limite ; s'il dépasse `tolerance` x ce temps de base
+  (le CPU sature : la concurrence ne fait plus qu'allonger chaque requête),
+  la limite est réduite de 10 %.
+- une requête est rejetée si l'attente estimée + son temps de service dépasse
+  `target_s`, ou si la file est pleine.
+
+Tout tourne dans la boucle asyncio (pas de verrou) : acquire/release sont
+appelés depuis une dépendance FastAPI, avant de passer au threadpool.
+"""
+from collections import deque
+import asyncio
+import math
+import time
+
+
+class Rejected(Exception):
+    def __init__(self, retry_after_s: float, reason: str):
+        super().__init__(reason)
+        self.retry_after_s = retry_after_s
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(self, target_s: float = 1.0, min_limit: int = 1, max_limit: int = 32,
+                 initial_limit: int = 4, max_queue: int = 64, tolerance: float = 2.0,
+                 clock=time.monotonic):
+        self.target_s = float(target_s)
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.max_queue = int(max_queue)
+        self.tolerance = float(tolerance)
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+
+        self.inflight = 0
+        self._waiters = deque()  # futures des requêtes en file (FIFO)
+        self.ewma_service_s = None  # temps de service lissé
+        self.base_service_s = None  # meilleur temps de service récent (remonte lentement)
+        self.admitted = self.rejected = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait_s(self) -> float:
+        """Attente estimée pour une nouvelle requête (0 si un slot est libre)."""
+        if self.inflight < self.limit and not self._waiters:
+            return 0.0
+        s = self.ewma_service_s or 0.0
+        return (len(self._waiters) // self.limit + 1) * s
+
+    # ------------ API ------------
+    async def acquire(self):
+        """Attend un slot ; lève Rejected si l'attente dépasserait la cible de latence."""
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            self.admitted += 1
+            return self._clock()
+
+        wait = self.estimated_wait_s()
+        if len(self._waiters) >= self.max_queue:
+            self._reject(wait, "file d'attente pleine")
+        if self.ewma_service_s is not None and wait + self.ewma_service_s > self.target_s:
+            self._reject(wait, "latence cible dépassée")
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut  # le slot est transféré par release()
+        except asyncio.CancelledError:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+            elif fut.done() and not fut.cancelled():
+                self._handoff()  # slot reçu mais client parti : on le repasse
+            raise
+        self.admitted += 1
+        return self._clock()
+
+    def release(self, started: float):
+        """Fin d'une requête admise (started = valeur renvoyée par acquire)."""
+        self._observe(self._clock() - started)
+        self._handoff()
+
+    def _handoff(self):
+        # slot libéré : réveiller le premier de la file si la limite le permet
+        self.inflight -= 1
+        while self._waiters and self.inflight < self.limit:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.inflight += 1
+                fut.set_result(None)
+
+    def _reject(self, wait_s: float, reason: str):
+        self.rejected += 1
+        raise Rejected(max(1.0, math.ceil(wait_s)), reason)
+
+    def _observe(self, service_s: float):
+        if self.ewma_service_s is None:
+            self.ewma_service_s = self.base_service_s = service_s
+        else:
+            self.ewma_service_s = 0.8 * self.ewma_service_s + 0.2 * service_s
+            # base : min récent, qui remonte de 1 % par requête (suit un changement de charge utile)
+            self.base_service_s = min(self.base_service_s * 1.01, service_s)
+
+        if self.ewma_service_s > self.tolerance * self.base_service_s:
+            self._limit = max(self.min_limit, self._limit * 0.9)
+        elif self.inflight >= self.limit:
+            # limite réellement atteinte et latence saine : on sonde un slot de plus
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "inflight": self.inflight,
+            "queued": self.queued,
+            "queue_depth": self.inflight + self.queued,
+            "target_ms": self.target_s * 1000.0,
+            "ewma_service_ms": None if self.ewma_service_s is None else self.ewma_service_s * 1000.0,
+            "base_service_ms": None if self.base_service_s is None else self.base_service_s * 1000.0,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
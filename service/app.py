@@ -1,68 +1,522 @@
-from typing import List
-from fastapi import FastAPI, HTTPException
+from typing import Any, List, NamedTuple, Optional
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
 import asyncio
+import functools
+import hmac
+import itertools
+import logging
 import os
+import threading
+import time
 import numpy as np  # ✅ garantir un ndarray pour le modèle
 
+from .admission import AdmissionController, Rejected
+from .artifacts import MAX_LEN as ARTIFACT_MAX_LEN
+from .artifacts import ARTIFACT_FILES, artifact_version, load_labels, load_model, pad_buckets, supports_masking
+from .batching import MicroBatcher
+from .cache import PredictionCache
+from .metrics import (LATENCY_BUCKETS, SIZE_BUCKETS, CallbackMetric, Histogram,
+                      process_rss_bytes, render)
+from .preprocess_pool import PreprocessPool
+from .streaming import NDJSON_MEDIA_TYPE, BodyStreamingResponse, dump_line, iter_lines, parse_item
+from .tokenizer import BatchTokenizer
+
 # === Import sécurisé du préprocesseur ===
 try:
     from .preprocess import secure_preprocess as _preprocess_fn  # type: ignore
     _SECURE_MODE = True
+
+    def _preprocess_batch(texts, vocab=None):
+        return [_preprocess_fn(t) for t in texts]
 except Exception:
     from .preprocess import clean_text as _preprocess_fn
+    from .preprocess import clean_text_batch as _preprocess_batch
     _SECURE_MODE = False
+from .preprocess import _correct_token_cached, load_vocab, read_vocab, set_vocab
 
-MAX_LEN = 120
+MAX_LEN = ARTIFACT_MAX_LEN
 TOXIC_THRESHOLD = float(os.getenv("TOXIC_THRESHOLD", "0.5"))
 
+# Micro-batching : fusion des requêtes concurrentes en un seul forward
+# (BATCH_MAX_SIZE<=1 désactive le batcher : un forward par requête)
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+# Backend du modèle : "numpy" (model_weights.npz, sans TF), "keras" (model.keras)
+# ou "auto" (numpy si model_weights.npz est présent, sinon keras)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "auto").lower()
+# Variante de poids du moteur NumPy : float32 | float16 | int8 (cf. step3_export)
+MODEL_VARIANT = os.getenv("MODEL_VARIANT", "float32").lower()
+
+# Padding dynamique : chaque bucket n'est paddé qu'à la plus petite taille de
+# PAD_BUCKETS qui le contient (MAX_LEN toujours inclus). Peu de tailles distinctes
+# = peu de retracing côté Keras.
+PAD_BUCKETS = pad_buckets(max_len=MAX_LEN)
+# Nb max de lignes par tableau passé au modèle (borne la mémoire des gros payloads)
+PREDICT_SUB_BATCH = int(os.getenv("PREDICT_SUB_BATCH", "256"))
+
+# Pool de process pour nettoyage + tokenisation (Python pur, lié au GIL) ; 0 = dans le thread
+# de la requête. PREPROC_MAX_INFLIGHT borne les tranches en cours (défaut 2 x workers).
+PREPROC_WORKERS = int(os.getenv("PREPROC_WORKERS", "0"))
+PREPROC_MAX_INFLIGHT = int(os.getenv("PREPROC_MAX_INFLIGHT", "0"))
+PREPROC_CHUNK = int(os.getenv("PREPROC_CHUNK", "64"))
+
+# Contrôle d'admission de /predict : limite adaptative de requêtes en cours, 429 si
+# l'attente estimée dépasse ADMIT_TARGET_MS (0 désactive). ADMIT_MAX_LIMIT reste
+# sous la taille du threadpool (40) : /health garde toujours un thread.
+ADMIT_TARGET_MS = float(os.getenv("ADMIT_TARGET_MS", "2000"))
+ADMIT_MIN_LIMIT = int(os.getenv("ADMIT_MIN_LIMIT", "1"))
+ADMIT_MAX_LIMIT = int(os.getenv("ADMIT_MAX_LIMIT", "16"))
+ADMIT_MAX_QUEUE = int(os.getenv("ADMIT_MAX_QUEUE", "64"))
+
+# Cache des scores (clé : hash du texte nettoyé + version du modèle) ; 0 désactive
+PRED_CACHE_SIZE = int(os.getenv("PRED_CACHE_SIZE", "10000"))
+PRED_CACHE_TTL_S = float(os.getenv("PRED_CACHE_TTL_S", "0"))  # 0 = pas d'expiration
+
+# /predict/stream : nb de commentaires scorés par chunk, taille max d'une ligne NDJSON
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "256"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(1 << 20)))
+
+# Warmup au startup : un forward factice par forme servie (longueurs de PAD_BUCKETS x
+# tailles de batch ci-dessous) avant que l'app n'accepte du trafic ; vide = pas de warmup
+WARMUP_BATCH_SIZES = sorted(
+    {int(b) for b in os.getenv("WARMUP_BATCH_SIZES", "1,32").split(",") if b.strip() and int(b) > 0}
+)
+
+
+# Rechargement à chaud des artefacts (nouveau jeu chargé + chauffé en arrière-plan, puis
+# bascule) : POST /admin/reload avec l'en-tête X-Admin-Token (désactivé si ADMIN_TOKEN est
+# vide) et/ou surveillance des fichiers toutes les RELOAD_POLL_S secondes (0 = désactivée)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+RELOAD_POLL_S = float(os.getenv("RELOAD_POLL_S", "0"))
+
 app = FastAPI(title="social comment score", version="1.0")
 BASE_DIR = Path(__file__).parent
+logger = logging.getLogger("uvicorn.error")
 
 # Globals initialisés à None, alimentés au startup
-tokenizer = None   # .texts_to_sequences(list[str]) -> List[List[int]]
+tokenizer = None   # BatchTokenizer : .encode_batch(list[str], maxlen) -> (ids int32 (N, maxlen), longueurs)
 LABELS = None      # list[str]
 model = None       # .predict(np.ndarray) -> np.ndarray shape (N, len(LABELS))
+batcher = None     # MicroBatcher autour de _forward (None -> forward direct)
+preproc_pool = None  # PreprocessPool (None -> prétraitement dans le thread de la requête)
+_vocab = None      # vocabulaire du correcteur du jeu servi
+_gen = 0           # génération du jeu servi (clé de _users / _retired)
+MODEL_VERSION = None  # hash court des artefacts chargés
+cache = PredictionCache(PRED_CACHE_SIZE, PRED_CACHE_TTL_S) if PRED_CACHE_SIZE > 0 else None
+MODEL_LOAD_SECONDS = None  # durée de chargement du modèle au startup
+STARTUP_SECONDS = {}  # phase du startup -> durée (s), exposé sur /health et /metrics
+# rechargements : nombre, échecs, dernière version / durée par phase / erreur (sur /health)
+RELOAD_STATE = {"reloads": 0, "failures": 0, "last_version": None, "last_seconds": None, "last_error": None}
+
+
+class Artifacts(NamedTuple):
+    """Jeu d'artefacts servi ; une requête garde le même du début à la fin, même si un reload bascule."""
+    tokenizer: Any
+    labels: Optional[List[str]]
+    model: Any
+    version: Optional[str]
+    batcher: Optional[MicroBatcher]
+    preproc_pool: Optional[PreprocessPool]
+    vocab: Any = None  # vocabulaire du correcteur, utilisé par _score sans pool de prétraitement
+    gen: int = 0       # génération : identifie le jeu (un par _build_artifacts)
+
+
+# Bascule atomique : les globals ci-dessus ne sont lus (_acquire) et remplacés (_install)
+# que sous ce verrou ; un jeu remplacé est fermé quand sa dernière requête se termine.
+_swap_lock = threading.Lock()
+_users = {}    # génération -> requêtes en cours sur ce jeu
+_retired = {}  # génération -> jeu remplacé, fermé à la fin de sa dernière requête
+_generations = itertools.count(1)
+_reload_lock = None  # asyncio.Lock créé au startup (un seul reload à la fois)
+_watch_task = None
+
+# Métriques Prometheus (/metrics) : latence par étape du chemin /predict
+STAGE_SECONDS = Histogram(
+    "toxicity_stage_seconds", "Latence par etape de /predict", LATENCY_BUCKETS, label="stage"
+)
+TEXTS_PER_REQUEST = Histogram("toxicity_texts_per_request", "Textes par requete /predict", SIZE_BUCKETS)
+MODEL_BATCH_SIZE = Histogram("toxicity_model_batch_size", "Lignes par appel model.predict", SIZE_BUCKETS)
+
+admission = AdmissionController(
+    target_s=ADMIT_TARGET_MS / 1000.0, min_limit=ADMIT_MIN_LIMIT,
+    max_limit=ADMIT_MAX_LIMIT, max_queue=ADMIT_MAX_QUEUE,
+) if ADMIT_TARGET_MS > 0 else None
 
 
 def _pad(seqs, maxlen=MAX_LEN):
-    """Padding simple sans TensorFlow (right pad avec 0)."""
-    out = []
-    for s in seqs:
-        s = list(s)[:maxlen]
-        if len(s) < maxlen:
-            s = s + [0] * (maxlen - len(s))
-        out.append(s)
+    """Padding sans TensorFlow (right pad avec 0) dans une matrice int32 préallouée."""
+    out = np.zeros((len(seqs), maxlen), dtype="int32")
+    for i, s in enumerate(seqs):
+        s = s[:maxlen]
+        out[i, :len(s)] = s
     return out
 
 
+_supports_masking = supports_masking
+
+
+def _bucket_len(n: int) -> int:
+    for b in PAD_BUCKETS:
+        if n <= b:
+            return b
+    return MAX_LEN
+
+
+def _buckets(seqs, m=None):
+    """
+    Découpe les indices de seqs en groupes (indices, longueur de padding).
+    - modèle masqué : tri par longueur, chaque bucket est paddé à sa taille de PAD_BUCKETS
+    - sinon : padding fixe à MAX_LEN (le padding change les scores sans masque)
+    Chaque groupe fait au plus PREDICT_SUB_BATCH lignes.
+    """
+    n = len(seqs)
+    if not _supports_masking(model if m is None else m):
+        return [(list(range(i, min(i + PREDICT_SUB_BATCH, n))), MAX_LEN)
+                for i in range(0, n, PREDICT_SUB_BATCH)]
+
+    order = sorted(range(n), key=lambda i: len(seqs[i]))
+    groups, cur, cur_len = [], [], None
+    for i in order:
+        L = _bucket_len(len(seqs[i]))
+        if cur and (L != cur_len or len(cur) >= PREDICT_SUB_BATCH):
+            groups.append((cur, cur_len))
+            cur = []
+        cur.append(i)
+        cur_len = L
+    if cur:
+        groups.append((cur, cur_len))
+    return groups
+
+
+def _forward(seqs, m=None):
+    """Padding par bucket + forward du modèle (m, défaut : modèle courant) -> ndarray (N, C)."""
+    m = model if m is None else m
+    out = None
+    for idx, maxlen in _buckets(seqs, m):
+        with STAGE_SECONDS.time("pad"):
+            arr = _pad(seqs=[seqs[i] for i in idx], maxlen=maxlen)
+        MODEL_BATCH_SIZE.observe(len(idx))
+        with STAGE_SECONDS.time("model"):
+            preds = m.predict(arr, verbose=0) if hasattr(m, "predict") else m(arr)
+            preds = np.asarray(preds)
+        if out is None:
+            out = np.empty((len(seqs), preds.shape[1]), dtype=preds.dtype)
+        out[idx] = preds
+    if out is None:
+        return np.zeros((0, len(LABELS or [])), dtype="float32")
+    return out
+
+
+def _artifact_version(base: Path = BASE_DIR) -> str:
+    return artifact_version(base)
+
+
+def _current() -> Artifacts:
+    return Artifacts(tokenizer, LABELS, model, MODEL_VERSION, batcher, preproc_pool, _vocab, _gen)
+
+
+def _acquire() -> Artifacts:
+    """Jeu d'artefacts courant, réservé jusqu'à _release (un reload ne le ferme pas avant)."""
+    with _swap_lock:
+        art = _current()
+        _users[art.gen] = _users.get(art.gen, 0) + 1
+    return art
+
+
+def _release(art: Artifacts):
+    with _swap_lock:
+        key = art.gen
+        _users[key] -= 1
+        old = None
+        if _users[key] == 0:
+            del _users[key]
+            old = _retired.pop(key, None)
+    if old is not None:
+        _close_later(old)
+
+
+def _close(art: Artifacts):
+    if art.batcher is not None:
+        art.batcher.close()
+    if art.preproc_pool is not None:
+        art.preproc_pool.close()
+
+
+def _close_later(art: Artifacts):
+    """Fermeture hors du chemin de la requête (join du batcher, arrêt des workers)."""
+    if art.batcher is not None or art.preproc_pool is not None:
+        threading.Thread(target=_close, args=(art,), name="close-artifacts", daemon=True).start()
+
+
+def _install(art: Artifacts):
+    """Bascule atomique vers art ; l'ancien jeu est fermé dès qu'aucune requête ne l'utilise."""
+    global tokenizer, LABELS, model, MODEL_VERSION, batcher, preproc_pool, _vocab, _gen
+    with _swap_lock:
+        old = _current()
+        tokenizer, LABELS, model, MODEL_VERSION, batcher, preproc_pool, _vocab, _gen = art
+        if art.vocab is not None and art.vocab is not load_vocab():
+            set_vocab(art.vocab)
+        # version des artefacts : toute modification invalide le cache des scores
+        if cache is not None and art.version is not None:
+            cache.set_version(art.version)
+        busy = _users.get(old.gen, 0) > 0
+        if busy:
+            _retired[old.gen] = old
+    if not busy:
+        _close_later(old)
+    return old
+
+
+def _score(texts, art: Artifacts = None):
+    """
+    Textes bruts -> scores ndarray (N, C), avec le jeu d'artefacts art (défaut : courant).
+    Doublons (bruts puis après nettoyage) traités une seule fois ; les textes nettoyés
+    déjà vus sont servis par le cache, seuls les autres passent tokenizer + modèle.
+    """
+    art = _current() if art is None else art
+    uniq_raw = list(dict.fromkeys(texts))
+    if art.preproc_pool is not None:
+        # nettoyage + tokenisation hors GIL, dans les workers du pool
+        with STAGE_SECONDS.time("preprocess_pool"):
+            cleaned, ids, lengths = art.preproc_pool.clean_and_encode(uniq_raw, MAX_LEN)
+    else:
+        with STAGE_SECONDS.time("preprocess"):
+            # vocabulaire du jeu de la requête, pas le vocabulaire partagé (déjà basculé par un reload)
+            cleaned, ids = _preprocess_batch(uniq_raw, vocab=art.vocab), None
+    uniq = list(dict.fromkeys(cleaned))
+
+    cached = cache.get_many(uniq, art.version) if cache is not None else [None] * len(uniq)
+    rows = {t: v for t, v in zip(uniq, cached) if v is not None}
+    todo = [t for t, v in zip(uniq, cached) if v is None]
+    if todo:
+        # tokenisation directe dans une matrice int32 (clean_text a déjà filtré + lowercase) ;
+        # le padding par bucket est fait au moment du forward
+        if ids is None:
+            with STAGE_SECONDS.time("tokenize"):
+                ids, lengths = art.tokenizer.encode_batch(todo, MAX_LEN, assume_clean=not _SECURE_MODE)
+            pos = range(len(todo))
+        else:
+            first = {}
+            for i, c in enumerate(cleaned):
+                first.setdefault(c, i)
+            pos = [first[t] for t in todo]
+        seqs = [ids[i, :lengths[i]] for i in pos]
+        # forward : via le micro-batcher (fusion avec les requêtes concurrentes) ou direct
+        preds = art.batcher(seqs) if art.batcher is not None else _forward(seqs, art.model)
+        fresh = [np.array(p, dtype=np.float32) for p in preds]
+        rows.update(zip(todo, fresh))
+        if cache is not None:
+            cache.put_many(todo, fresh, art.version)
+
+    if not texts:
+        return np.zeros((0, len(art.labels or [])), dtype=np.float32)
+    by_raw = {raw: rows[c] for raw, c in zip(uniq_raw, cleaned)}
+    return np.stack([by_raw[t] for t in texts])
+
+
+def _load_model():
+    """Charge le modèle selon MODEL_BACKEND / MODEL_VARIANT (appelé dans un thread au startup)."""
+    return load_model(BASE_DIR, MODEL_BACKEND, MODEL_VARIANT)
+
+
+# textes de chauffe : URL, allongements, fautes (passe par la correction orthographique)
+_WARMUP_TEXTS = [
+    "Thanks for the quick reply, see you tomorrow!",
+    "you are such an idoit, stop postinggggg this",
+    "check http://example.com it's sooooo bad :)",
+]
+
+
+def _warmup_shapes(m):
+    """Formes (lignes, longueur) envoyées au modèle en service : cf. _buckets."""
+    lengths = PAD_BUCKETS if _supports_masking(m) else [MAX_LEN]
+    return [(bs, L) for L in lengths for bs in WARMUP_BATCH_SIZES]
+
+
+def _warmup_model(m):
+    """Un forward par forme servie (traçage du graphe Keras, buffers NumPy), hors métriques."""
+    for bs, L in _warmup_shapes(m):
+        arr = np.ones((bs, L), dtype="int32")
+        m.predict(arr, verbose=0) if hasattr(m, "predict") else m(arr)
+
+
+def _load_tokenizer(vocab=None):
+    """
+    Tokenizer natif construit sur le vocabulaire partagé avec le correcteur
+    (vocab.bin, un seul chargement par process) ; fallback : tokenizer.json.
+    """
+    vocab = load_vocab() if vocab is None else vocab
+    if vocab is None:
+        return BatchTokenizer.from_json((BASE_DIR / "tokenizer.json").read_text(encoding="utf-8"))
+    return BatchTokenizer.from_vocab(vocab)
+
+
+def _load_labels():
+    return load_labels(BASE_DIR)
+
+
+async def _build_artifacts(phases: dict, fresh_vocab: bool = False) -> Artifacts:
+    """
+    Charge et chauffe un jeu d'artefacts complet, sans toucher au jeu servi.
+    fresh_vocab : relit vocab.bin (reload) au lieu du vocabulaire déjà partagé par le process.
+    """
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+
+    def done(phase):
+        nonlocal t0
+        now = time.perf_counter()
+        phases[phase] = round(now - t0, 4)
+        t0 = now
+
+    # Vocabulaire partagé tokenizer / correcteur (vocab.bin) + tokenizer natif (sans TensorFlow)
+    # (reload : un vocab.bin illisible fait échouer le reload, l'ancien jeu reste servi)
+    if fresh_vocab:
+        vocab = await loop.run_in_executor(None, functools.partial(read_vocab, BASE_DIR, strict=True))
+    else:
+        vocab = load_vocab()
+    tok = _load_tokenizer(vocab)
+    done("tokenizer")
+
+    labels = _load_labels()
+    done("labels")
+
+    # Charger le modèle en thread (pas de asyncio.run ici)
+    m = await loop.run_in_executor(None, _load_model)
+    done("model")
+
+    version = await loop.run_in_executor(None, _artifact_version)
+    done("version")
+
+    # Warmup avant le premier vrai trafic : regex, cache de correction, tokenisation,
+    # puis un forward par forme servie (sinon payés par les premières requêtes)
+    if WARMUP_BATCH_SIZES:
+        tok.encode_batch(_preprocess_batch(_WARMUP_TEXTS, vocab=vocab), MAX_LEN, assume_clean=not _SECURE_MODE)
+        done("warmup_preprocess")
+        await loop.run_in_executor(None, _warmup_model, m)
+        done("warmup_model")
+
+    # batcher propre au jeu : jamais de séquences d'un tokenizer envoyées à un autre modèle
+    b = pool = None
+    try:
+        if BATCH_MAX_SIZE > 1:
+            b = MicroBatcher(lambda seqs: _forward(seqs, m), max_batch_size=BATCH_MAX_SIZE,
+                             max_wait_ms=BATCH_MAX_WAIT_MS)
+
+        # idem pour les workers de prétraitement (leur vocabulaire est lu au spawn)
+        if PREPROC_WORKERS > 0:
+            pool = PreprocessPool(PREPROC_WORKERS, max_inflight=PREPROC_MAX_INFLIGHT, chunk_size=PREPROC_CHUNK)
+            await loop.run_in_executor(None, pool.warmup)
+            done("preprocess_pool")
+    except BaseException:
+        # jeu à moitié construit : thread du batcher et workers fermés avant de remonter l'erreur
+        _close(Artifacts(tok, labels, m, version, b, pool, vocab))
+        raise
+
+    return Artifacts(tok, labels, m, version, b, pool, vocab, next(_generations))
+
+
 @app.on_event("startup")
 async def load_artifacts():
     """Chargement lazy des artefacts. Skippable en CI via APP_SKIP_STARTUP=1."""
     if os.getenv("APP_SKIP_STARTUP", "0") == "1":
         return
 
-    global tokenizer, LABELS, model
+    global MODEL_LOAD_SECONDS, _reload_lock, _watch_task
 
-    # Charger tokenizer / labels (imports tardifs pour éviter de charger TF inutilement)
-    tok_json = (BASE_DIR / "tokenizer.json").read_text(encoding="utf-8")
-    from tensorflow.keras.preprocessing.text import tokenizer_from_json  # lazy import
-    tokenizer = tokenizer_from_json(tok_json)
+    phases = {}
+    t_start = time.perf_counter()
+    art = await _build_artifacts(phases)
+    MODEL_LOAD_SECONDS = phases["model"]
+    _install(art)
 
-    LABELS = [
-        l.strip() for l in (BASE_DIR / "labels.txt").read_text(encoding="utf-8").splitlines()
-        if l.strip()
-    ]
+    phases["total"] = round(time.perf_counter() - t_start, 4)
+    STARTUP_SECONDS.clear()
+    STARTUP_SECONDS.update(phases)
+    logger.info("startup : %s", " ".join(f"{k}={v:.3f}s" for k, v in phases.items()))
 
-    # Charger le modèle en thread (pas de asyncio.run ici)
-    import tensorflow as tf  # lazy import
-    loop = asyncio.get_running_loop()
-    model = await loop.run_in_executor(
-        None,
-        tf.keras.models.load_model,
-        str(BASE_DIR / "model.keras"),
-    )
+    _reload_lock = asyncio.Lock()
+    if RELOAD_POLL_S > 0:
+        _watch_task = asyncio.create_task(_watch_artifacts())
+
+
+async def reload_artifacts(force: bool = False) -> dict:
+    """
+    Recharge les artefacts de BASE_DIR en arrière-plan (chargement + warmup), puis bascule.
+    Sans force, ne fait rien si leur version (hash du contenu) est celle déjà servie.
+    En cas d'échec, l'ancien jeu reste servi et l'erreur est exposée sur /health.
+    """
+    async with _reload_lock:
+        loop = asyncio.get_running_loop()
+        if not force and await loop.run_in_executor(None, _artifact_version) == MODEL_VERSION:
+            return {"reloaded": False, "model_version": MODEL_VERSION}
+
+        phases = {}
+        t_start = time.perf_counter()
+        try:
+            art = await _build_artifacts(phases, fresh_vocab=True)
+        except Exception as e:
+            RELOAD_STATE["failures"] += 1
+            RELOAD_STATE["last_error"] = f"{type(e).__name__}: {e}"
+            logger.exception("reload : échec, version %s toujours servie", MODEL_VERSION)
+            raise
+        old = _install(art)
+        phases["total"] = round(time.perf_counter() - t_start, 4)
+        RELOAD_STATE.update(reloads=RELOAD_STATE["reloads"] + 1, last_version=art.version,
+                            last_seconds=phases, last_error=None)
+        logger.info("reload : %s -> %s %s", old.version, art.version,
+                    " ".join(f"{k}={v:.3f}s" for k, v in phases.items()))
+        return {"reloaded": True, "model_version": art.version, "previous_version": old.version,
+                "seconds": phases}
+
+
+def _artifact_stamp():
+    """(nom, mtime, taille) des artefacts : détection de changement sans relire les fichiers."""
+    out = []
+    for name in ARTIFACT_FILES:
+        try:
+            st = (BASE_DIR / name).stat()
+        except OSError:
+            continue
+        out.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(out)
+
+
+async def _watch_artifacts():
+    """
+    Surveillance des artefacts toutes les RELOAD_POLL_S secondes. Un changement n'est pris en
+    compte qu'une fois stable sur deux relevés (copie terminée), puis reload_artifacts().
+    """
+    seen = prev = _artifact_stamp()
+    while True:
+        await asyncio.sleep(RELOAD_POLL_S)
+        stamp = _artifact_stamp()
+        if stamp != prev:  # copie peut-être en cours : on attend le relevé suivant
+            prev = stamp
+            continue
+        if stamp == seen:
+            continue
+        seen = stamp  # en cas d'échec : nouvel essai au prochain changement de fichiers
+        try:
+            await reload_artifacts()
+        except Exception:
+            pass  # déjà journalisé, l'ancien jeu reste servi
+
+
+@app.on_event("shutdown")
+def stop_batcher():
+    if _watch_task is not None:
+        _watch_task.cancel()
+    with _swap_lock:
+        arts = [_current(), *_retired.values()]
+        _retired.clear()
+    for art in arts:
+        _close(art)
 
 
 class PredictIn(BaseModel):
@@ -86,43 +540,250 @@ def root():
 
 
 @app.get("/health")
-def health():
+async def health():
+    # async : ne passe pas par le threadpool, répond même quand /predict sature
     status = "ready" if all([tokenizer, LABELS, model]) else "loading"
     return {
         "status": status,
         "labels": LABELS or [],
         "secure_mode": _SECURE_MODE,
         "toxic_threshold": TOXIC_THRESHOLD,
+        "model_version": MODEL_VERSION,
+        "model_variant": getattr(model, "variant", "float32") if model is not None else None,
+        "batching": batcher.stats() if batcher is not None else None,
+        "cache": cache.stats() if cache is not None else None,
+        "preprocess_pool": preproc_pool.stats() if preproc_pool is not None else None,
+        "admission": admission.stats() if admission is not None else None,
+        "startup_seconds": STARTUP_SECONDS or None,
+        "reload": dict(RELOAD_STATE, watch_interval_s=RELOAD_POLL_S or None),
     }
 
 
+@app.post("/admin/reload")
+async def admin_reload(force: bool = False, x_admin_token: str = Header(default="")):
+    """
+    Recharge les artefacts sans redémarrage : le nouveau jeu est chargé et chauffé pendant que
+    l'ancien sert, puis bascule ; les requêtes en cours se terminent sur l'ancien.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Rechargement désactivé (ADMIN_TOKEN non défini)")
+    if not hmac.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Jeton admin invalide")
+    if _reload_lock is None:
+        raise HTTPException(status_code=503, detail="Model not ready yet")
+    try:
+        return await reload_artifacts(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500,
+                            detail=f"Rechargement échoué ({e}) ; version {MODEL_VERSION} toujours servie") from None
+
+
+def _toxic_index(labels=None) -> int:
+    labels = LABELS if labels is None else labels
+    idx = next((i for i, lab in enumerate(labels) if lab.lower() == "toxic"), None)
+    if idx is None:
+        raise HTTPException(status_code=500, detail="Label 'toxic' introuvable dans LABELS.")
+    return idx
+
+
+async def _admit():
+    """Dépendance de /predict : attend un slot (boucle asyncio, avant le threadpool) ou 429."""
+    ctl = admission
+    if ctl is None:
+        yield
+        return
+    try:
+        started = await ctl.acquire()
+    except Rejected as e:
+        raise HTTPException(
+            status_code=429, detail=f"Surcharge : {e.reason}",
+            headers={"Retry-After": str(int(e.retry_after_s))},
+        ) from None
+    try:
+        yield
+    finally:
+        ctl.release(started)
+
+
+async def _admit_chunk(ctl: AdmissionController) -> float:
+    """
+    Slot d'admission pour un chunk de /predict/stream. L'en-tête de la réponse est déjà
+    parti : en surcharge, le flux attend Retry-After puis réessaie au lieu d'un 429.
+    """
+    while True:
+        try:
+            return await ctl.acquire()
+        except Rejected as e:
+            await asyncio.sleep(e.retry_after_s)
+
+
+def _spell_cache():
+    # cache lru du correcteur (process API ; avec PREPROC_WORKERS chaque worker a le sien)
+    return _correct_token_cached.cache_info()
+
+
+def _spell_hit_ratio():
+    info = _spell_cache()
+    total = info.hits + info.misses
+    return info.hits / total if total else 0.0
+
+
+def _admission_stat(key):
+    return lambda: admission.stats()[key] if admission is not None else None
+
+
+def _cache_stat(key):
+    return lambda: cache.stats()[key] if cache is not None else None
+
+
+# métriques lues au scrape (rien sur le chemin chaud)
+_SCRAPED = [
+    CallbackMetric("toxicity_spellcheck_cache_hits_total", "Hits du cache de correction orthographique",
+                   lambda: _spell_cache().hits, kind="counter"),
+    CallbackMetric("toxicity_spellcheck_cache_misses_total", "Misses du cache de correction orthographique",
+                   lambda: _spell_cache().misses, kind="counter"),
+    CallbackMetric("toxicity_spellcheck_cache_hit_ratio", "Taux de hit du cache de correction orthographique",
+                   _spell_hit_ratio),
+    CallbackMetric("toxicity_spellcheck_cache_size", "Entrees du cache de correction orthographique",
+                   lambda: _spell_cache().currsize),
+    CallbackMetric("toxicity_prediction_cache_hit_ratio", "Taux de hit du cache de scores", _cache_stat("hit_rate")),
+    CallbackMetric("toxicity_prediction_cache_size", "Entrees du cache de scores", _cache_stat("size")),
+    CallbackMetric("toxicity_model_load_seconds", "Duree de chargement du modele au startup",
+                   lambda: MODEL_LOAD_SECONDS),
+    CallbackMetric("toxicity_startup_seconds", "Duree des phases du startup (chargement, warmup)",
+                   lambda: dict(STARTUP_SECONDS) or None, label="phase"),
+    CallbackMetric("toxicity_reloads_total", "Rechargements a chaud des artefacts",
+                   lambda: RELOAD_STATE["reloads"], kind="counter"),
+    CallbackMetric("toxicity_reload_failures_total", "Rechargements a chaud echoues",
+                   lambda: RELOAD_STATE["failures"], kind="counter"),
+    CallbackMetric("process_resident_memory_bytes", "RSS du process", process_rss_bytes),
+    CallbackMetric("toxicity_admission_queue_depth", "Requetes /predict en cours + en file",
+                   _admission_stat("queue_depth")),
+    CallbackMetric("toxicity_admission_inflight", "Requetes /predict en cours", _admission_stat("inflight")),
+    CallbackMetric("toxicity_admission_queued", "Requetes /predict en file", _admission_stat("queued")),
+    CallbackMetric("toxicity_admission_limit", "Limite adaptative de requetes en cours", _admission_stat("limit")),
+    CallbackMetric("toxicity_admission_rejected_total", "Requetes /predict rejetees (429)",
+                   _admission_stat("rejected"), kind="counter"),
+]
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métriques au format Prometheus : latence par étape, tailles, caches, RSS, file d'admission."""
+    return render([STAGE_SECONDS, TEXTS_PER_REQUEST, MODEL_BATCH_SIZE, *_SCRAPED])
+
+
 @app.post("/predict", response_model=PredictOut)
-def predict(payload: PredictIn):
-    assert tokenizer is not None and model is not None and LABELS is not None, "Model not ready yet"
+def predict(payload: PredictIn, _slot: None = Depends(_admit)):
+    # jeu d'artefacts figé pour toute la requête (un reload concurrent n'y touche pas)
+    art = _acquire()
+    try:
+        return _predict(payload, art)
+    finally:
+        _release(art)
+
+
+def _predict(payload: PredictIn, art: Artifacts):
+    assert art.tokenizer is not None and art.model is not None and art.labels is not None, "Model not ready yet"
 
     # 0) trouver l'index du label "toxic"
-    toxic_idx = next((i for i, lab in enumerate(LABELS) if lab.lower() == "toxic"), None)
-    if toxic_idx is None:
-        raise HTTPException(status_code=500, detail="Label 'toxic' introuvable dans LABELS.")
+    toxic_idx = _toxic_index(art.labels)
+
+    t0 = time.perf_counter()
+    TEXTS_PER_REQUEST.observe(len(payload.texts))
+
+    # 1) preprocess + tokenisation + forward (doublons et textes déjà vus servis par le cache)
+    preds = _score(payload.texts, art)
+
+    # 2) décision : si score toxic > seuil -> "toxic" sinon "non toxic"
+    with STAGE_SECONDS.time("response"):
+        out_labels = []
+        for row in preds:
+            toxic_score = float(row[toxic_idx])
+            out_labels.append("toxic" if toxic_score > TOXIC_THRESHOLD else "non toxic")
+        out = PredictOut(labels=out_labels)
+
+    STAGE_SECONDS.observe(time.perf_counter() - t0, "total")
+    return out
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """
+    Scoring en flux pour les gros volumes (balayages de modération).
+
+    Entrée : NDJSON, une ligne par commentaire : `"texte"` ou `{"text": "...", "id": ...}`.
+    Sortie : NDJSON dans le même ordre, une ligne par commentaire non vide :
+      {"index": i, "id": ..., "label": "toxic"|"non toxic", "scores": {label: score}}
+    ou {"index": i, "error": "..."} pour une ligne invalide (le flux continue).
 
-    # 1) preprocess (clean_text ou secure_preprocess selon ce qui est dispo)
-    cleaned = [_preprocess_fn(t) for t in payload.texts]
+    Les commentaires sont scorés par chunks de STREAM_CHUNK_SIZE via le même chemin
+    que /predict, admission comprise ; le corps n'est lu qu'au rythme où le client consomme la réponse.
+    Tout le flux est scoré par le même jeu d'artefacts, même si un reload bascule entre-temps.
+    """
+    art = _acquire()
+    try:
+        if art.tokenizer is None or art.model is None or art.labels is None:
+            raise HTTPException(status_code=503, detail="Model not ready yet")
+        toxic_idx = _toxic_index(art.labels)
+    except BaseException:
+        _release(art)
+        raise
+    labels = list(art.labels)
 
-    # 2) tokenisation + padding hors-TF
-    seqs = tokenizer.texts_to_sequences(cleaned)
-    pad = _pad(seqs=seqs, maxlen=MAX_LEN)
+    async def results():
+        try:
+            async for chunk in _stream_results():
+                yield chunk
+        finally:
+            _release(art)
 
-    # 3) ndarray int32 pour Keras
-    arr = np.asarray(pad, dtype="int32")
+    async def _stream_results():
+        pending = []  # (index, id, texte) du chunk courant
+        index = 0
 
-    # 4) forward
-    preds = model.predict(arr, verbose=0) if hasattr(model, "predict") else model(arr)
-    preds = np.asarray(preds)  # shape (N, C)
+        async def flush():
+            # chaque chunk passe par l'admission, comme une requête /predict
+            ctl = admission
+            started = await _admit_chunk(ctl) if ctl is not None else None
+            try:
+                preds = await run_in_threadpool(_score, [t for _, _, t in pending], art)
+            finally:
+                if ctl is not None:
+                    ctl.release(started)
+            out = bytearray()
+            for (i, item_id, _), row in zip(pending, preds):
+                line = {"index": i}
+                if item_id is not None:
+                    line["id"] = item_id
+                line["label"] = "toxic" if float(row[toxic_idx]) > TOXIC_THRESHOLD else "non toxic"
+                line["scores"] = {lab: float(v) for lab, v in zip(labels, row)}
+                out += dump_line(line)
+            pending.clear()
+            return bytes(out)
 
-    # 5) décision : si score toxic > seuil -> "toxic" sinon "non toxic"
-    out_labels = []
-    for row in preds:
-        toxic_score = float(row[toxic_idx])
-        out_labels.append("toxic" if toxic_score > TOXIC_THRESHOLD else "non toxic")
+        async for line in iter_lines(request.stream(), STREAM_MAX_LINE_BYTES):
+            if isinstance(line, Exception):
+                if pending:
+                    yield await flush()
+                yield dump_line({"index": index, "error": str(line)})
+                index += 1
+                continue
+            if not line.strip():
+                continue
+            try:
+                item_id, text = parse_item(line)
+            except ValueError as e:
+                # on vide d'abord le chunk en cours pour garder l'ordre des lignes
+                if pending:
+                    yield await flush()
+                yield dump_line({"index": index, "error": str(e)})
+            else:
+                pending.append((index, item_id, text))
+                if len(pending) >= STREAM_CHUNK_SIZE:
+                    yield await flush()
+            index += 1
+        if pending:
+            yield await flush()
 
-    return PredictOut(labels=out_labels)
+    return BodyStreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
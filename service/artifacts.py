@@ -0,0 +1,88 @@
+# service/artifacts.py
+"""
+Artefacts du modèle servi (dossier service/ ou --service-dir), partagés par l'API
+(service/app.py) et le scoring offline (src/score_bulk.py) :
+- `load_model(base, backend, variant)` : moteur NumPy (model_weights*.npz) ou Keras
+- `supports_masking(m)` : le modèle ignore-t-il le padding (Embedding(mask_zero=True)) ?
+- `artifact_version(base)` : hash du contenu des artefacts (version du modèle)
+- `pad_buckets()` : longueurs de padding servies, partagées avec l'entraînement tf.data
+"""
+from pathlib import Path
+import hashlib
+import os
+
+from .numpy_model import VARIANT_FILES, NumpyBiLSTM
+
+MAX_LEN = 120
+# Longueurs de padding servies (PAD_BUCKETS de l'API) = buckets tf.data de step2_train
+DEFAULT_PAD_BUCKETS = (16, 32, 64)
+
+# Fichiers dont le contenu définit la version du modèle servi
+ARTIFACT_FILES = ("labels.txt", "vocab.bin", "tokenizer.json", *VARIANT_FILES.values(), "model.keras")
+
+
+def pad_buckets(spec: str = None, max_len: int = MAX_LEN) -> list:
+    """"16,32,64" (défaut : $PAD_BUCKETS, sinon DEFAULT_PAD_BUCKETS) -> bornes triées, max_len inclus."""
+    if spec is None:
+        spec = os.getenv("PAD_BUCKETS", ",".join(map(str, DEFAULT_PAD_BUCKETS)))
+    return sorted({min(int(b), max_len) for b in spec.split(",") if b.strip()} | {max_len})
+
+
+def resolve_backend(base: Path, backend: str = "auto", variant: str = "float32") -> str:
+    """"numpy" | "keras" ; "auto" = numpy si les poids de la variante sont présents."""
+    if variant not in VARIANT_FILES:
+        raise RuntimeError(f"MODEL_VARIANT inconnue : {variant} (attendu : {sorted(VARIANT_FILES)})")
+    if backend == "auto":
+        return "numpy" if (Path(base) / VARIANT_FILES[variant]).exists() or variant != "float32" else "keras"
+    return backend
+
+
+def load_model(base: Path, backend: str = "auto", variant: str = "float32"):
+    """Modèle exposant .predict(ids, verbose=0) -> scores (N, C)."""
+    base = Path(base)
+    backend = resolve_backend(base, backend, variant)
+    weights = base / VARIANT_FILES[variant]
+    if backend == "numpy":
+        if not weights.exists():
+            raise RuntimeError(
+                f"{weights.name} absent : exporter les variantes via `python -m src.step3_export`"
+            )
+        return NumpyBiLSTM.load(weights)
+    if variant != "float32":
+        raise RuntimeError("MODEL_VARIANT float16/int8 : backend numpy uniquement")
+    try:
+        import tensorflow as tf  # lazy import (optionnel : backend keras uniquement)
+    except ImportError as e:
+        raise RuntimeError(
+            "Backend keras : tensorflow n'est pas installé "
+            "(exporter model_weights.npz via `python -m src.step3_export` ou installer tensorflow)"
+        ) from e
+    return tf.keras.models.load_model(str(base / "model.keras"))
+
+
+def supports_masking(m) -> bool:
+    """True si le modèle ignore le padding (Embedding(mask_zero=True))."""
+    if getattr(m, "mask_zero", False):
+        return True
+    layers = getattr(m, "layers", None) or []
+    return bool(layers) and bool(getattr(layers[0], "mask_zero", False))
+
+
+def artifact_version(base: Path) -> str:
+    """Hash (sha256 tronqué) du contenu des artefacts présents : change dès qu'un fichier change."""
+    h = hashlib.sha256()
+    for name in ARTIFACT_FILES:
+        p = Path(base) / name
+        if p.exists():
+            h.update(name.encode("utf-8"))
+            with open(p, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def load_labels(base: Path):
+    return [
+        l.strip() for l in (Path(base) / "labels.txt").read_text(encoding="utf-8").splitlines()
+        if l.strip()
+    ]
@@ -0,0 +1,147 @@
+# service/batching.py
+"""
+Micro-batching in-process pour /predict.
+
+Les requêtes concurrentes (souvent 1 à 5 commentaires) déposent leurs éléments
+dans une file ; un thread unique les fusionne en un seul forward, borné par
+`max_batch_size` éléments et `max_wait_ms` d'attente, puis renvoie à chaque
+requête la tranche de sortie qui lui correspond.
+"""
+from concurrent.futures import Future
+from collections import deque
+import threading
+import time
+
+
+class _Pending:
+    """Une requête en attente : ses éléments, le curseur d'avancement et ses sorties."""
+    __slots__ = ("items", "offset", "outputs", "future")
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.offset = 0
+        self.outputs = [None] * len(self.items)
+        self.future = Future()
+
+
+class MicroBatcher:
+    """
+    fn(items: list) -> séquence de sorties de même longueur (ex. ndarray (N, C)).
+
+    - submit(items) renvoie un Future résolu avec la liste des sorties de la requête
+    - une requête plus grande que max_batch_size est découpée sur plusieurs forwards
+    - stats() expose la distribution des tailles de batch réellement formées
+    """
+
+    def __init__(self, fn, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        self.fn = fn
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._n_batches = 0
+        self._n_items = 0
+        self._sizes = {}  # taille de batch -> nb d'occurrences
+
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    # ------------ API ------------
+    def submit(self, items) -> Future:
+        p = _Pending(items)
+        if not p.items:
+            p.future.set_result([])
+            return p.future
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher arrêté")
+            self._queue.append(p)
+            self._cond.notify()
+        return p.future
+
+    def __call__(self, items, timeout=None):
+        return self.submit(items).result(timeout=timeout)
+
+    def close(self, timeout: float = 5.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._n_batches,
+                "items": self._n_items,
+                "mean_batch_size": (self._n_items / self._n_batches) if self._n_batches else 0.0,
+                "batch_sizes": dict(sorted(self._sizes.items())),
+                "queued_requests": len(self._queue),
+            }
+
+    # ------------ boucle du thread ------------
+    def _collect(self):
+        """Attend le premier élément puis remplit le batch jusqu'à max_batch_size ou max_wait."""
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            deadline = time.monotonic() + self.max_wait
+            while self._pending_items() < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # découpe : (requête, début, fin) jusqu'à max_batch_size éléments
+            slices, room = [], self.max_batch_size
+            while self._queue and room > 0:
+                p = self._queue[0]
+                start = p.offset
+                end = min(len(p.items), start + room)
+                slices.append((p, start, end))
+                room -= end - start
+                p.offset = end
+                if p.offset >= len(p.items):
+                    self._queue.popleft()
+            return slices
+
+    def _pending_items(self) -> int:
+        return sum(len(p.items) - p.offset for p in self._queue)
+
+    def _run(self):
+        while True:
+            slices = self._collect()
+            if slices is None:
+                return
+            batch = []
+            for p, start, end in slices:
+                batch.extend(p.items[start:end])
+
+            try:
+                outputs = self.fn(batch)
+            except BaseException as e:  # l'erreur remonte à toutes les requêtes du batch
+                for p, _, _ in slices:
+                    if not p.future.done():
+                        p.future.set_exception(e)
+                continue
+
+            with self._cond:
+                self._n_batches += 1
+                self._n_items += len(batch)
+                self._sizes[len(batch)] = self._sizes.get(len(batch), 0) + 1
+
+            pos = 0
+            for p, start, end in slices:
+                n = end - start
+                p.outputs[start:end] = list(outputs[pos:pos + n])
+                pos += n
+                if end >= len(p.items) and not p.future.done():
+                    p.future.set_result(p.outputs)
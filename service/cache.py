@@ -0,0 +1,98 @@
+# service/cache.py
+"""
+Cache des scores de prédiction, indexé par un hash du texte nettoyé et la version
+du modèle : les doublons (spam copié-collé, "first!", insultes répétées) ne
+repassent ni par la tokenisation ni par le BiLSTM.
+
+LRU borné (`maxsize` entrées) + TTL optionnel. Changer de version (nouveaux
+artefacts) vide le cache : une entrée ne peut jamais servir un autre modèle.
+`version=` sur get_many/put_many : une requête encore servie par l'ancien modèle
+pendant un rechargement ne lit ni n'écrit le cache de la nouvelle version.
+"""
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 10000, ttl_s: float = 0.0, version: str = "", clock=time.monotonic):
+        self.maxsize = int(maxsize)
+        self.ttl_s = float(ttl_s)
+        self.version = version
+        self._clock = clock
+        self._data = OrderedDict()  # clé -> (expiration, valeur)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def key(self, text: str) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self.version.encode("utf-8"))
+        h.update(b"\0")
+        h.update(text.encode("utf-8"))
+        return h.digest()
+
+    def set_version(self, version: str):
+        """Nouvelle version d'artefacts -> invalidation complète."""
+        with self._lock:
+            if version != self.version:
+                self.version = version
+                self._data.clear()
+
+    def get_many(self, texts, version: str = None):
+        """-> liste de valeurs (None si absente / expirée), dans l'ordre de texts."""
+        now = self._clock()
+        out = []
+        with self._lock:
+            if version is not None and version != self.version:
+                self.misses += len(texts)
+                return [None] * len(texts)
+            for t in texts:
+                k = self.key(t)
+                item = self._data.get(k)
+                if item is not None and self.ttl_s > 0 and item[0] <= now:
+                    del self._data[k]
+                    self.expirations += 1
+                    item = None
+                if item is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._data.move_to_end(k)
+                    self.hits += 1
+                    out.append(item[1])
+        return out
+
+    def put_many(self, texts, values, version: str = None):
+        if self.maxsize <= 0:
+            return
+        expires = self._clock() + self.ttl_s if self.ttl_s > 0 else None
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            for t, v in zip(texts, values):
+                k = self.key(t)
+                self._data[k] = (expires, v)
+                self._data.move_to_end(k)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl_s,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
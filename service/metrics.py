@@ -0,0 +1,128 @@
+# service/metrics.py
+"""
+Métriques Prometheus (format texte) sans dépendance externe.
+
+- `Histogram` : buckets fixes, un label optionnel (ex. stage="model"),
+  observation = bisect + 3 additions sous un verrou (~1 µs sur le chemin chaud)
+- `CallbackMetric` : gauge / counter dont la valeur est lue au moment du scrape
+  (stats de cache, RSS...) : rien n'est calculé tant que /metrics n'est pas appelé
+"""
+from bisect import bisect_left
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _fmt(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v)) if abs(v) < 1e15 else repr(v)
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+class _Timer:
+    __slots__ = ("_hist", "_label", "_t0")
+
+    def __init__(self, hist, label):
+        self._hist, self._label = hist, label
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.observe(time.perf_counter() - self._t0, self._label)
+        return False
+
+
+class Histogram:
+    def __init__(self, name: str, help_: str, buckets=LATENCY_BUCKETS, label: str = None):
+        self.name, self.help, self.label = name, help_, label
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # valeur de label -> [compteurs par bucket (+Inf inclus), somme, nb]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label=None):
+        i = bisect_left(self.buckets, value)  # premier bucket >= value (le = "le" Prometheus)
+        with self._lock:
+            s = self._series.get(label)
+            if s is None:
+                s = self._series[label] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    def time(self, label=None) -> _Timer:
+        """with HIST.time("model"): ... -> observe la durée du bloc."""
+        return _Timer(self, label)
+
+    def snapshot(self, label=None):
+        """-> (compteurs cumulés par bucket, somme, nb) ; None si aucune observation."""
+        with self._lock:
+            s = self._series.get(label)
+            if s is None:
+                return None
+            counts, total, n = list(s[0]), s[1], s[2]
+        cum, acc = [], 0
+        for c in counts:
+            acc += c
+            cum.append(acc)
+        return cum, total, n
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            labels = list(self._series)
+        for lab in sorted(labels, key=lambda x: "" if x is None else str(x)):
+            cum, total, n = self.snapshot(lab)
+            base = f'{self.label}="{lab}",' if self.label and lab is not None else ""
+            for le, c in zip(self.buckets + (float("inf"),), cum):
+                lines.append(f'{self.name}_bucket{{{base}le="{_fmt(float(le))}"}} {c}')
+            tail = "{" + base.rstrip(",") + "}" if base else ""
+            lines.append(f"{self.name}_sum{tail} {_fmt(total)}")
+            lines.append(f"{self.name}_count{tail} {n}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge ou counter lu au scrape : fn() -> nombre, ou dict {valeur de label: nombre}."""
+
+    def __init__(self, name: str, help_: str, fn, kind: str = "gauge", label: str = None):
+        self.name, self.help, self.fn, self.kind, self.label = name, help_, fn, kind, label
+
+    def render(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if isinstance(value, dict):
+            for lab, v in value.items():
+                if v is not None:
+                    lines.append(f'{self.name}{{{self.label}="{lab}"}} {_fmt(v)}')
+        else:
+            lines.append(f"{self.name} {_fmt(value)}")
+        return lines
+
+
+def render(metrics) -> str:
+    lines = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes():
+    """RSS courante (Linux : /proc/self/statm), sinon pic via getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
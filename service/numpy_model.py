@@ -0,0 +1,244 @@
+# service/numpy_model.py
+"""
+Moteur d'inférence NumPy (sans TensorFlow) pour le BiLSTM de src/step2_train.py :
+  Embedding -> Bidirectional(LSTM(64)) -> Dropout -> Dense(64, relu) -> Dense(6, sigmoid)
+
+Les poids sont lus depuis un .npz produit par `python -m src.step3_export`
+(cf. `export_keras_weights`). Le forward est batché sur les textes et vectorisé
+sur les 4 portes (i, f, c, o — ordre Keras) : un seul produit matriciel par pas
+de temps et par direction.
+
+Si le modèle a été entraîné avec `Embedding(mask_zero=True)`, l'id 0 (padding)
+est masqué comme dans Keras : l'état LSTM n'est pas mis à jour sur le padding,
+et le score ne dépend donc pas de la longueur de padding.
+
+Variantes quantifiées (cf. `quantize_weights`, produites par step3_export) :
+  float16 : poids stockés en float16, table de projection d'entrée gardée en float16
+  int8    : poids int8 symétriques (une échelle par colonne), table de projection
+            en int8 (une échelle par colonne), déquantifiée à la lecture des lignes
+Les calculs restent en float32 ; le gain porte sur la taille des fichiers et la
+mémoire résidente (la table vocab x 8 * units domine).
+"""
+from pathlib import Path
+import numpy as np
+
+WEIGHT_KEYS = (
+    "embedding",
+    "fwd_kernel", "fwd_recurrent_kernel", "fwd_bias",
+    "bwd_kernel", "bwd_recurrent_kernel", "bwd_bias",
+    "dense_kernel", "dense_bias",
+    "out_kernel", "out_bias",
+)
+
+# variante -> nom du fichier de poids dans service/
+VARIANT_FILES = {
+    "float32": "model_weights.npz",
+    "float16": "model_weights.fp16.npz",
+    "int8": "model_weights.int8.npz",
+}
+_SCALE = "__scale"
+
+
+def _sigmoid(x):
+    # sigmoid stable numériquement (pas d'overflow sur exp pour x très négatif)
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _quantize_int8(w: np.ndarray, axis: int):
+    """Quantification symétrique int8 ; une échelle par tranche le long de `axis` conservé."""
+    w = np.asarray(w, dtype=np.float32)
+    reduce = tuple(i for i in range(w.ndim) if i != axis % w.ndim) if w.ndim > 1 else None
+    scale = np.max(np.abs(w), axis=reduce, keepdims=w.ndim > 1) / 127.0
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    q = np.clip(np.rint(w / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+def _projection_table(embedding, kernel, bias, variant, rows=1024):
+    """
+    Table embedding @ kernel + bias dans la précision de la variante. Calculée par blocs
+    de `rows` mots : la table float32 complète n'est jamais matérialisée pour float16/int8
+    (pas de pic mémoire au chargement).
+    """
+    if variant == "float32":
+        return embedding @ kernel + bias, None
+    blocks = range(0, embedding.shape[0], rows)
+    out = np.empty((embedding.shape[0], kernel.shape[1]), dtype=np.float16 if variant == "float16" else np.int8)
+    if variant == "float16":
+        for i in blocks:
+            out[i:i + rows] = embedding[i:i + rows] @ kernel + bias
+        return out, None
+    # int8 : 1re passe pour l'échelle de chaque colonne, 2e passe pour quantifier
+    amax = np.zeros(kernel.shape[1], dtype=np.float32)
+    for i in blocks:
+        np.maximum(amax, np.abs(embedding[i:i + rows] @ kernel + bias).max(axis=0), out=amax)
+    scale = np.where(amax > 0, amax / 127.0, 1.0).astype(np.float32)
+    for i in blocks:
+        block = (embedding[i:i + rows] @ kernel + bias) / scale
+        out[i:i + rows] = np.clip(np.rint(block, out=block), -127, 127, out=block)
+    return out, scale
+
+
+def quantize_weights(weights: dict, variant: str) -> dict:
+    """Poids float32 (clés WEIGHT_KEYS) -> tableaux à écrire dans le .npz de la variante."""
+    if variant not in VARIANT_FILES:
+        raise ValueError(f"Variante inconnue : {variant} (attendu : {sorted(VARIANT_FILES)})")
+    out = {}
+    for k in WEIGHT_KEYS:
+        w = np.asarray(weights[k], dtype=np.float32)
+        if variant == "float32":
+            out[k] = w
+        elif variant == "float16":
+            out[k] = w.astype(np.float16)
+        elif k.endswith("bias"):
+            out[k] = w  # biais : négligeables en taille, gardés en float32
+        else:
+            # embedding : une échelle par mot ; kernels : une échelle par colonne de sortie
+            q, scale = _quantize_int8(w, axis=0 if k == "embedding" else -1)
+            out[k], out[k + _SCALE] = q, scale
+    if "mask_zero" in weights:
+        out["mask_zero"] = np.asarray(bool(np.asarray(weights["mask_zero"])))
+    out["variant"] = np.asarray(variant)
+    return out
+
+
+def dequantize_weights(data: dict):
+    """Inverse de quantize_weights -> (poids float32, variante)."""
+    variant = str(np.asarray(data["variant"])) if "variant" in data else "float32"
+    weights = {}
+    for k, v in data.items():
+        if k.endswith(_SCALE) or k == "variant":
+            continue
+        v = np.asarray(v)
+        if k + _SCALE in data:
+            v = v.astype(np.float32) * np.asarray(data[k + _SCALE], dtype=np.float32)
+        elif v.dtype.kind == "f":
+            v = v.astype(np.float32)
+        weights[k] = v
+    return weights, variant
+
+
+class NumpyBiLSTM:
+    """Remplaçant de `tf.keras.models.load_model(...)` : expose `.predict(arr, verbose=0)`."""
+
+    def __init__(self, weights: dict, dtype="float32", mask_zero=None, variant="float32"):
+        missing = [k for k in WEIGHT_KEYS if k not in weights]
+        if missing:
+            raise ValueError(f"Poids manquants dans l'archive NumPy : {missing}")
+        if variant not in VARIANT_FILES:
+            raise ValueError(f"Variante inconnue : {variant}")
+        self.dtype = np.dtype(dtype)
+        self.variant = variant
+        w = {k: np.asarray(weights[k], dtype=self.dtype) for k in WEIGHT_KEYS}
+
+        if mask_zero is None:
+            mask_zero = bool(np.asarray(weights.get("mask_zero", False)))
+        self.mask_zero = bool(mask_zero)
+
+        self.vocab_size, self.embed_dim = w["embedding"].shape
+        self.units = w["fwd_recurrent_kernel"].shape[0]
+
+        # Embedding @ kernel pré-calculés : la projection d'entrée des 2 directions
+        # devient une simple lecture de table (vocab, 2 * 4 * units)
+        kernel = np.concatenate([w["fwd_kernel"], w["bwd_kernel"]], axis=1)
+        bias = np.concatenate([w["fwd_bias"], w["bwd_bias"]])
+        self._xproj, self._xproj_scale = _projection_table(w["embedding"], kernel, bias, variant)
+
+        self._u_fwd = w["fwd_recurrent_kernel"]
+        self._u_bwd = w["bwd_recurrent_kernel"]
+        self._dense_k, self._dense_b = w["dense_kernel"], w["dense_bias"]
+        self._out_k, self._out_b = w["out_kernel"], w["out_bias"]
+
+    @classmethod
+    def load(cls, path, dtype="float32"):
+        """Charge un .npz float32 ou quantifié (variante lue dans l'archive)."""
+        with np.load(Path(path)) as data:
+            weights, variant = dequantize_weights({k: data[k] for k in data.files})
+        return cls(weights, dtype=dtype, variant=variant)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire des tableaux gardés pour l'inférence."""
+        arrays = (self._xproj, self._xproj_scale, self._u_fwd, self._u_bwd,
+                  self._dense_k, self._dense_b, self._out_k, self._out_b)
+        return int(sum(a.nbytes for a in arrays if a is not None))
+
+    def _lstm_step(self, z, h, c, u, m=None):
+        n = self.units
+        z = z + h @ u
+        i = _sigmoid(z[:, :n])
+        f = _sigmoid(z[:, n:2 * n])
+        g = np.tanh(z[:, 2 * n:3 * n])
+        o = _sigmoid(z[:, 3 * n:])
+        c_new = f * c + i * g
+        h_new = o * np.tanh(c_new)
+        if m is None:
+            return h_new, c_new
+        # pas masqué : on garde l'état précédent (sémantique Keras)
+        return np.where(m, h_new, h), np.where(m, c_new, c)
+
+    def encode(self, ids: np.ndarray) -> np.ndarray:
+        """ids (N, T) int -> concat(h_fwd, h_bwd) (N, 2 * units)."""
+        ids = np.asarray(ids)
+        N, T = ids.shape
+        n4 = 4 * self.units
+        # ids hors vocab : Keras lèverait une erreur ; ici on les ramène sur 0 (padding)
+        ids = np.where((ids >= 0) & (ids < self.vocab_size), ids, 0)
+        xp = self._xproj[ids]  # (N, T, 8 * units)
+        if self._xproj_scale is not None:
+            xp = np.multiply(xp, self._xproj_scale, dtype=self.dtype)
+        elif xp.dtype != self.dtype:
+            xp = xp.astype(self.dtype)
+        mask = (ids != 0)[:, :, None] if self.mask_zero else None
+
+        h_f = np.zeros((N, self.units), dtype=self.dtype); c_f = np.zeros_like(h_f)
+        h_b = np.zeros_like(h_f); c_b = np.zeros_like(h_f)
+        for t in range(T):
+            tb = T - 1 - t
+            h_f, c_f = self._lstm_step(xp[:, t, :n4], h_f, c_f, self._u_fwd,
+                                       None if mask is None else mask[:, t])
+            h_b, c_b = self._lstm_step(xp[:, tb, n4:], h_b, c_b, self._u_bwd,
+                                       None if mask is None else mask[:, tb])
+        return np.concatenate([h_f, h_b], axis=1)
+
+    def __call__(self, ids):
+        h = self.encode(ids)
+        h = np.maximum(h @ self._dense_k + self._dense_b, 0.0)  # Dropout = identité en inférence
+        return _sigmoid(h @ self._out_k + self._out_b)
+
+    def predict(self, arr, verbose=0, batch_size=None):
+        arr = np.asarray(arr)
+        if arr.ndim != 2:
+            raise ValueError(f"Entrée attendue (N, T), reçu {arr.shape}")
+        if arr.shape[0] == 0:
+            return np.zeros((0, self._out_b.shape[0]), dtype=self.dtype)
+        return self(arr)
+
+
+def export_keras_weights(keras_model, out_path) -> Path:
+    """Extrait les poids d'un modèle Keras (architecture step2_train) vers un .npz."""
+    from tensorflow.keras import layers  # import tardif : uniquement côté export
+
+    emb = [l for l in keras_model.layers if isinstance(l, layers.Embedding)]
+    bi = [l for l in keras_model.layers if isinstance(l, layers.Bidirectional)]
+    dense = [l for l in keras_model.layers if isinstance(l, layers.Dense)]
+    if len(emb) != 1 or len(bi) != 1 or len(dense) != 2:
+        raise ValueError("Architecture inattendue : Embedding -> BiLSTM -> Dense -> Dense attendu")
+
+    fk, fu, fb = bi[0].forward_layer.get_weights()
+    bk, bu, bb = bi[0].backward_layer.get_weights()
+    dk, db = dense[0].get_weights()
+    ok, ob = dense[1].get_weights()
+    weights = {
+        "embedding": emb[0].get_weights()[0],
+        "fwd_kernel": fk, "fwd_recurrent_kernel": fu, "fwd_bias": fb,
+        "bwd_kernel": bk, "bwd_recurrent_kernel": bu, "bwd_bias": bb,
+        "dense_kernel": dk, "dense_bias": db,
+        "out_kernel": ok, "out_bias": ob,
+    }
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {k: np.asarray(v, dtype="float32") for k, v in weights.items()}
+    arrays["mask_zero"] = np.asarray(bool(getattr(emb[0], "mask_zero", False)))
+    np.savez(out_path, **arrays)
+    return out_path
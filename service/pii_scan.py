@@ -0,0 +1,131 @@
+# service/pii_scan.py
+"""
+Masquage des DCP par regex (EMAIL, IP, PHONE, URL, ADDRESS, CREDIT_CARD, USERNAME),
+sans spaCy : utilisé par src/anonymize.py avant la NER et réutilisable côté service.
+
+Même résultat que les 7 `re.sub` successifs historiques (chaque motif voit le texte
+déjà masqué par les précédents, même ordre, mêmes comptes), mais :
+- préfiltres par caractère : un motif n'est lancé que si le texte contient ce qu'il
+  exige ('@', '.', "http"/"www.", nb de chiffres). Les masques insérés ne contiennent
+  ni chiffre, ni '@', ni '.', ni minuscule : le préfiltre calculé une fois sur le texte
+  d'origine reste valable après chaque passe ;
+- remplacement par chaîne constante + `subn` (comptage en C, pas de closure par match),
+  sauf CREDIT_CARD qui filtre sur le nombre de chiffres ;
+- EMAIL sans balayage quadratique : la partie locale ne contient pas '@', donc si un
+  départ échoue, tout départ plus loin dans la même suite de caractères échoue aussi ;
+  seuls les débuts de suite sont essayés (lookbehind), en plus de la position courante.
+"""
+import re
+
+REGEX_PATTERNS = {
+    "EMAIL": re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"),
+    "IP":    re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b"),
+    "URL":   re.compile(r"https?://\S+|www\.\S+"),
+    "PHONE": re.compile(r"\b(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{2,4}\)?[-.\s]?)?\d{3,4}[-.\s]?\d{3,4}\b"),
+    "TIME":  re.compile(r"\b\d{1,2}:\d{2}\b"),
+    "DATE":  re.compile(
+        r"\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|"
+        r"Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?)"
+        r"[\w\s,]*\d{4}\b", re.IGNORECASE
+    ),
+}
+
+ADDRESS_RE = re.compile(
+    r"\b\d{1,5}\s+(?:rue|avenue|av\.?|bd|boulevard|impasse|allée|route|chemin|che\.?|place|pl\.?|quai|square|sq\.?|"
+    r"street|st\.?|ave\.?|road|rd\.?|blvd\.?|lane|ln\.?|drive|dr\.?|court|ct\.?)\s+[A-Za-zÀ-ÖØ-öø-ÿ'’\-\. ]+\b",
+    re.IGNORECASE
+)
+CREDIT_CARD_RE = re.compile(r"\b(?:\d[ -]*?){13,19}\b")
+USERNAME_RE    = re.compile(r"(?<!\w)@[\w._\-]{2,32}")
+
+# ordre d'application des regex (la NER PERSON vient après, cf. src/anonymize.py)
+REGEX_ORDER = ("EMAIL", "IP", "PHONE", "URL", "ADDRESS", "CREDIT_CARD", "USERNAME")
+
+_EMAIL_RE = REGEX_PATTERNS["EMAIL"]
+_EMAIL_RUN_START_RE = re.compile(r"(?<![a-zA-Z0-9._%+-])" + _EMAIL_RE.pattern)
+_DIGIT_RE = re.compile(r"\d")
+_NON_DIGITS_ASCII = {c: None for c in range(128) if not chr(c).isdigit()}
+
+
+def _count_digits(s: str) -> int:
+    # \d = chiffres Unicode (Nd) ; raccourci translate pour l'ASCII
+    if s.isascii():
+        return len(s.translate(_NON_DIGITS_ASCII))
+    return len(_DIGIT_RE.findall(s))
+
+
+def _sub_email(s: str, mask: str):
+    """EMAIL_RE.subn(mask, s), en temps linéaire sur les longues suites sans '@' valide."""
+    out, n, last, pos = [], 0, 0, 0
+    while True:
+        m = _EMAIL_RE.match(s, pos) or _EMAIL_RUN_START_RE.search(s, pos)
+        if m is None:
+            break
+        out.append(s[last:m.start()])
+        out.append(mask)
+        n += 1
+        last = pos = m.end()
+    if not n:
+        return s, 0
+    out.append(s[last:])
+    return "".join(out), n
+
+
+class PiiScrubber:
+    """
+    scrub(text, counts) -> texte masqué ; counts (dict label -> nb) est incrémenté
+    comme par l'anonymisation historique. Masque = le label, ou "****".
+    """
+
+    def __init__(self, use_label_tokens: bool = True):
+        self.use_label_tokens = use_label_tokens
+        self.masks = {label: label if use_label_tokens else "****" for label in REGEX_ORDER}
+
+    def _credit_card(self, s: str):
+        mask, n = self.masks["CREDIT_CARD"], 0
+
+        def repl(m):
+            nonlocal n
+            if 13 <= _count_digits(m.group(0)) <= 19:
+                n += 1
+                return mask
+            return m.group(0)
+
+        return CREDIT_CARD_RE.sub(repl, s), n
+
+    def scrub(self, text: str, counts=None) -> str:
+        counts = {} if counts is None else counts
+        if not text:
+            return text
+        masks = self.masks
+        has_at = "@" in text
+        dots = text.count(".")
+        digits = _count_digits(text)
+
+        def add(label, n):
+            if n:
+                counts[label] = counts.get(label, 0) + n
+
+        s = text
+        if has_at and dots:
+            s, n = _sub_email(s, masks["EMAIL"])
+            add("EMAIL", n)
+        if digits >= 4 and dots >= 3:
+            s, n = REGEX_PATTERNS["IP"].subn(masks["IP"], s)
+            add("IP", n)
+        if digits >= 6:
+            s, n = REGEX_PATTERNS["PHONE"].subn(masks["PHONE"], s)
+            add("PHONE", n)
+        if "http" in s or "www." in s:
+            s, n = REGEX_PATTERNS["URL"].subn(masks["URL"], s)
+            add("URL", n)
+        if digits:
+            s, n = ADDRESS_RE.subn(masks["ADDRESS"], s)
+            add("ADDRESS", n)
+        if digits >= 13:
+            s, n = self._credit_card(s)
+            add("CREDIT_CARD", n)
+        if has_at:
+            s, n = USERNAME_RE.subn(masks["USERNAME"], s)
+            add("USERNAME", n)
+        return s
@@ -5,15 +5,21 @@ Comportement :
  - nettoie URL / emojis / caractères indésirables
  - lowercase, normalisation unicode
  - réduit allongements (3+ -> 2) en pré-traitement
- - si tokenizer.json présent, charge le vocabulaire (word_counts / word_index)
+ - charge le vocabulaire du modèle (vocab.bin, sinon tokenizer.json : word_counts / word_index)
    et essaye de corriger les tokens inconnus en utilisant la distance de Levenshtein
+   (candidats fournis par un index de bigrammes construit une fois sur le vocabulaire)
    en choisissant le candidat le plus fréquent parmi ceux ayant une similarité acceptable.
- - fallback : si pas de tokenizer.json, on applique seulement les nettoyages légers.
+ - fallback : si ni vocab.bin ni tokenizer.json, on applique seulement les nettoyages légers.
 """
+from array import array
 from pathlib import Path
 import json
+import mmap
+import struct
+import sys
 import unicodedata
 import re
+from collections import Counter
 from functools import lru_cache
 
 EMOJI_RE = re.compile(r"[\U00010000-\U0010ffff]", flags=re.UNICODE)
@@ -23,53 +29,307 @@ URL_RE   = re.compile(r"https?://\S+|www\.\S+")
 def _normalize_unicode(s: str) -> str:
     return unicodedata.normalize("NFKC", s)
 
+# (.)\1\1+ == (.)\1{2,}, mais ~2x plus rapide avec le moteur `re`
+ELONGATION_RE = re.compile(r"(.)\1\1+")
+
 def _reduce_elongation_keep_doubles(s: str) -> str:
     # réduit répétitions de 3+ caractères sur la même lettre en 2 occurrences
-    return re.sub(r"(.)\1{2,}", r"\1\1", s)
+    return ELONGATION_RE.sub(r"\1\1", s)
 
-def _levenshtein_distance(a: str, b: str) -> int:
+# Filtre "garde a-z0-9, apostrophe et blancs ; le reste -> espace" en une passe translate.
+# ASCII : table de 256 octets (bytes.translate) ; sinon table Unicode remplie à la demande.
+# Les blancs sont ceux de str.isspace(), identiques à \s de `re` et à str.split().
+_KEEP = frozenset("abcdefghijklmnopqrstuvwxyz0123456789'")
+_ASCII_FILTER = bytes(
+    c if (chr(c) in _KEEP or chr(c).isspace()) else 0x20 for c in range(256)
+)
+
+class _UnicodeFilter(dict):
+    def __missing__(self, code):
+        ch = chr(code)
+        v = code if (ch in _KEEP or ch.isspace()) else 0x20
+        self[code] = v
+        return v
+
+_UNICODE_FILTER = _UnicodeFilter()
+
+# ------------ distance d'édition bornée (Myers / Hyyrö, bit-parallèle) ------------
+# Chaque colonne de la matrice DP est codée dans des entiers Python (1 bit par
+# caractère du motif) : un caractère du texte = une dizaine d'opérations bit à bit,
+# au lieu d'une boucle sur tout le motif. Avec un seuil k, on s'arrête dès que la
+# distance finale ne peut plus être <= k.
+
+def _peq(pattern: str) -> dict:
+    """Masques de positions par caractère du motif."""
+    peq = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    return peq
+
+def _myers(peq: dict, m: int, text: str, k=None) -> int:
+    n = len(text)
+    if m == 0:
+        return n if k is None or n <= k else k + 1
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for j, ch in enumerate(text, 1):
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+        # chaque caractère restant fait baisser la distance d'au plus 1
+        if k is not None and score - (n - j) > k:
+            return k + 1
+    return score
+
+def _levenshtein_bounded(a: str, b: str, k=None) -> int:
+    """Distance de Levenshtein ; si k est donné, renvoie k + 1 dès qu'elle dépasse k."""
     if a == b:
         return 0
-    la, lb = len(a), len(b)
-    if la == 0: return lb
-    if lb == 0: return la
-    prev = list(range(lb + 1))
-    cur = [0] * (lb + 1)
-    for i, ca in enumerate(a, 1):
-        cur[0] = i
-        for j, cb in enumerate(b, 1):
-            add = prev[j] + 1
-            delete = cur[j-1] + 1
-            change = prev[j-1] + (0 if ca == cb else 1)
-            cur[j] = min(add, delete, change)
-        prev, cur = cur, prev
-    return prev[lb]
+    if k is not None and abs(len(a) - len(b)) > k:
+        return k + 1
+    return _myers(_peq(a), len(a), b, k)
+
+def _levenshtein_many(token: str, candidates, k=None):
+    """Forme batch : distances (bornées à k + 1) de token vers chaque candidat, motif encodé une fois."""
+    peq, m = _peq(token), len(token)
+    out = []
+    for c in candidates:
+        if k is not None and abs(len(c) - m) > k:
+            out.append(k + 1)
+        else:
+            out.append(_myers(peq, m, c, k))
+    return out
+
+def _levenshtein_distance(a: str, b: str) -> int:
+    return _levenshtein_bounded(a, b)
 
 def _lev_ratio(a: str, b: str) -> float:
     max_len = max(len(a), len(b), 1)
     return 1.0 - (_levenshtein_distance(a, b) / max_len)
 
-# ------------ chargement vocabulaire tokenizer.json (si présent) ------------
-_TOKENIZER_VOCAB = None
-_WORD_COUNTS = None
-_WORDS_BY_FIRST = None
-_TOP_WORDS = None
+# ------------ index de candidats (q-grammes) ------------
+class _QGramIndex:
+    """
+    Index inversé de bigrammes (mots paddés par '#'), partitionné par longueur de mot.
+    search(token, k) renvoie TOUS les mots à distance de Levenshtein <= k :
+    seules les listes des longueurs |len(w) - len(token)| <= k sont parcourues,
+    puis filtre par q-grammes communs (lemme des q-grammes : au moins
+    max(la, lb) + 1 - 2k bigrammes partagés) et vérification par distance
+    bornée (_levenshtein_many) uniquement sur les survivants.
+    (Mots très courts vs k grand : aucun bigramme requis -> scan de leur bucket de longueur.)
 
-def _load_tokenizer_vocab():
-    global _TOKENIZER_VOCAB, _WORD_COUNTS, _WORDS_BY_FIRST, _TOP_WORDS
-    if _TOKENIZER_VOCAB is not None:
-        return
-    try:
-        p = Path(__file__).parent / "tokenizer.json"
-        if not p.exists():
-            _TOKENIZER_VOCAB = None
-            return
-        data = json.loads(p.read_text(encoding="utf-8"))
-        # standard Keras tokenizer fields: 'word_counts' and/or 'word_index'
-        word_counts = {}
-        if "word_counts" in data and isinstance(data["word_counts"], dict):
+    postings : (bigramme, longueur) -> ids ; listes Python ou tranches d'un memoryview
+    (vocab.bin mappé en mémoire, cf. write_vocab_file).
+    """
+    __slots__ = ("words", "postings", "by_len")
+
+    def __init__(self, words, ids=None, postings=None):
+        self.words = words if isinstance(words, list) else list(words)
+        ids = range(len(self.words)) if ids is None else ids
+        by_len = {}
+        for i in ids:
+            by_len.setdefault(len(self.words[i]), []).append(i)
+        self.by_len = by_len
+        self.postings = self._build(self.words, ids) if postings is None else postings
+
+    @classmethod
+    def _build(cls, words, ids) -> dict:
+        postings = {}
+        for i in ids:
+            w = words[i]
+            for g in cls._grams(w):
+                postings.setdefault((g, len(w)), []).append(i)
+        return postings
+
+    @staticmethod
+    def _grams(w: str) -> dict:
+        w = "#" + w + "#"
+        out = {}
+        for i in range(len(w) - 1):
+            g = w[i:i + 2]
+            out[g] = out.get(g, 0) + 1
+        return out
+
+    def search(self, token: str, k: int):
+        """Liste de (mot, distance) pour les mots à distance <= k de token."""
+        if k < 0:
+            return []
+        lt = len(token)
+        lengths = range(max(lt - k, 0), lt + k + 1)
+        # compte (par excès si bigramme répété : n >= min(n, m)) -> aucun faux négatif
+        shared = Counter()
+        postings = self.postings
+        for g, n in self._grams(token).items():
+            for lw in lengths:
+                ids = postings.get((g, lw))
+                if ids:
+                    for _ in range(n):
+                        shared.update(ids)  # boucle de comptage en C
+        for lw in lengths:
+            if max(lw, lt) + 1 - 2 * k <= 0:
+                for i in self.by_len.get(lw, ()):
+                    shared.setdefault(i, 0)
+
+        need = {lw: max(lw, lt) + 1 - 2 * k for lw in lengths}
+        words = self.words
+        cands = [words[i] for i, c in shared.items() if c >= need[len(words[i])]]
+        return [(w, d) for w, d in zip(cands, _levenshtein_many(token, cands, k)) if d <= k]
+
+# ------------ vocabulaire partagé tokenizer / correcteur ------------
+# vocab.bin : vocabulaire compact écrit par src/step2_train.py et src/step3_export.py,
+# élagué aux num_words ids réellement utilisés par le modèle. Lu par mmap : les
+# comptes et l'index de candidats restent dans le fichier (pages partagées entre
+# workers) ; seuls la liste des mots et le dict word -> id sont matérialisés.
+#
+# Format : b"TXVOCAB1" | uint32 taille de l'en-tête | en-tête JSON | sections alignées
+# sur 4 octets (cf. en-tête "sections" : nom -> [offset, taille]) :
+#   words       : mots utf-8 séparés par "\n", position = id (id 0 = padding "")
+#   counts      : uint32[n] occurrences par id
+#   keys        : clés d'index "bigramme\tlongueur" séparées par "\n"
+#   key_offsets : uint32[len(keys) + 1] bornes de chaque clé dans postings
+#   postings    : uint32 ids des mots
+VOCAB_FILE = "vocab.bin"
+_VOCAB_MAGIC = b"TXVOCAB1"
+
+class _Vocab:
+    """Vocabulaire du modèle : word_index / words / counts (par id) + index de candidats."""
+    __slots__ = ("words", "word_index", "counts", "num_words", "oov_token", "index", "_mm")
+
+    def __init__(self, words, counts, num_words, oov_token, postings=None, mm=None):
+        self.words = words
+        self.word_index = {w: i for i, w in enumerate(words) if w}
+        self.counts = counts
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self._mm = mm  # garde le mmap ouvert tant que le vocab vit
+        self.index = _QGramIndex(words, self._candidate_ids(words, oov_token), postings)
+
+    @staticmethod
+    def _candidate_ids(words, oov_token):
+        return [i for i, w in enumerate(words) if w and w != oov_token]
+
+    def count(self, word: str) -> int:
+        i = self.word_index.get(word)
+        return 0 if i is None else int(self.counts[i])
+
+    def __contains__(self, word) -> bool:
+        return word in self.word_index
+
+    def __len__(self) -> int:
+        return len(self.word_index)
+
+    @classmethod
+    def from_word_index(cls, word_index, word_counts, num_words=None, oov_token=None):
+        """Construit le vocab élagué aux ids < num_words (comme Tokenizer(num_words=...))."""
+        n = max(word_index.values(), default=0) + 1
+        if num_words:
+            n = min(n, int(num_words))
+        words = [""] * n
+        for w, i in word_index.items():
+            if 0 < i < n:
+                words[i] = w
+        counts = [int(word_counts.get(w, 0)) if w else 0 for w in words]
+        return cls(words, counts, num_words, oov_token)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(mm)
+        if bytes(buf[:8]) != _VOCAB_MAGIC:
+            raise ValueError(f"{path}: format de vocabulaire inconnu")
+        (hlen,) = struct.unpack_from("<I", mm, 8)
+        header = json.loads(bytes(buf[12:12 + hlen]).decode("utf-8"))
+        # tableaux uint32 relus tels quels (mmap) : illisibles sur une machine d'autre boutisme
+        if header.get("byteorder", sys.byteorder) != sys.byteorder:
+            raise ValueError(f"{path}: écrit en {header['byteorder']}-endian, machine {sys.byteorder}-endian "
+                             "(régénérer vocab.bin via `python -m src.step3_export`)")
+
+        def section(name):
+            off, size = header["sections"][name]
+            return buf[off:off + size]
+
+        words = bytes(section("words")).decode("utf-8").split("\n")
+        counts = section("counts").cast("I")
+        key_offsets = section("key_offsets").cast("I")
+        ids = section("postings").cast("I")
+        postings = {}
+        keys = bytes(section("keys")).decode("utf-8")
+        for j, key in enumerate(keys.split("\n") if keys else []):
+            g, lw = key.split("\t")
+            postings[(g, int(lw))] = ids[key_offsets[j]:key_offsets[j + 1]]
+        return cls(words, counts, header.get("num_words"), header.get("oov_token"), postings, mm)
+
+def write_vocab_file(path, word_index, word_counts, num_words=None, oov_token=None) -> Path:
+    """Écrit vocab.bin depuis le word_index / word_counts d'un Tokenizer Keras."""
+    v = _Vocab.from_word_index(word_index, word_counts, num_words, oov_token)
+    keys = sorted(v.index.postings)
+    key_offsets, postings = [0], []
+    for key in keys:
+        postings.extend(v.index.postings[key])
+        key_offsets.append(len(postings))
+
+    blobs = {
+        "words": "\n".join(v.words).encode("utf-8"),
+        "counts": array("I", v.counts).tobytes(),
+        "keys": "\n".join(f"{g}\t{lw}" for g, lw in keys).encode("utf-8"),
+        "key_offsets": array("I", key_offsets).tobytes(),
+        "postings": array("I", postings).tobytes(),
+    }
+    # les offsets dépendent de la taille de l'en-tête : on itère jusqu'à taille stable
+    header = b""
+    while True:
+        sections, pos = {}, 12 + len(header)
+        for name, blob in blobs.items():
+            pos += -pos % 4
+            sections[name] = [pos, len(blob)]
+            pos += len(blob)
+        new = json.dumps({
+            "version": 1, "num_words": num_words, "oov_token": oov_token,
+            "byteorder": sys.byteorder, "sections": sections,
+        }).encode("utf-8")
+        new += b" " * (-(12 + len(new)) % 4)
+        if len(new) == len(header):
+            header = new
+            break
+        header = new
+
+    out = bytearray(_VOCAB_MAGIC + struct.pack("<I", len(header)) + header)
+    for name, blob in blobs.items():
+        out += b"\0" * (sections[name][0] - len(out))
+        out += blob
+    path = Path(path)
+    path.write_bytes(bytes(out))
+    return path
+
+def _parse_word_counts(data):
+    """word_counts depuis tokenizer.json (format Keras : config.word_counts est une chaîne JSON)."""
+    cfg = data.get("config") if isinstance(data.get("config"), dict) else data
+    for key in ("word_counts", "word_index"):
+        raw = cfg.get(key, data.get(key))
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except Exception:
+                raw = None
+        if isinstance(raw, dict):
+            if key == "word_index":
+                # fallback: build uniform counts from word_index
+                return {w: 1 for w in raw.keys()}
+            word_counts = {}
             # word_counts values may be strings; convert to int if needed
-            for w, c in data["word_counts"].items():
+            for w, c in raw.items():
                 try:
                     word_counts[w] = int(c)
                 except Exception:
@@ -77,98 +337,187 @@ def _load_tokenizer_vocab():
                         word_counts[w] = int(float(c))
                     except Exception:
                         word_counts[w] = 1
-        elif "word_index" in data and isinstance(data["word_index"], dict):
-            # fallback: build uniform counts from word_index
-            for w in data["word_index"].keys():
-                word_counts[w] = 1
-        else:
-            _TOKENIZER_VOCAB = None
-            return
-
-        _TOKENIZER_VOCAB = set(word_counts.keys())
-        _WORD_COUNTS = word_counts
+            return word_counts
+    return None
 
-        # buckets by first letter for faster candidate search
-        buckets = {}
-        for w in _TOKENIZER_VOCAB:
-            if not w:
-                continue
-            first = w[0]
-            buckets.setdefault(first, []).append(w)
-        _WORDS_BY_FIRST = buckets
+def vocab_from_tokenizer_json(data: dict):
+    """(word_index, word_counts, num_words, oov_token) depuis le JSON d'un Tokenizer Keras."""
+    cfg = data.get("config") if isinstance(data.get("config"), dict) else data
+    word_counts = _parse_word_counts(data)
+    if not word_counts:
+        return None
+    word_index = cfg.get("word_index")
+    if isinstance(word_index, str):
+        word_index = json.loads(word_index)
+    oov_token = cfg.get("oov_token")
+    if not isinstance(word_index, dict):
+        # ancien format sans word_index : ids par fréquence décroissante (comme Keras)
+        ranked = sorted(word_counts, key=lambda w: -word_counts[w])
+        if oov_token:
+            ranked = [oov_token] + ranked
+        word_index = {w: i for i, w in enumerate(ranked, 1)}
+    return {w: int(i) for w, i in word_index.items()}, word_counts, cfg.get("num_words"), oov_token
 
-        # precompute top words list (sorted by count desc)
-        _TOP_WORDS = sorted(_TOKENIZER_VOCAB, key=lambda x: -_WORD_COUNTS.get(x, 0))
+# ------------ chargement vocabulaire (vocab.bin, sinon tokenizer.json) ------------
+_VOCAB = None
+_TOKENIZER_VOCAB = None
+_INDEX = None
 
+def read_vocab(base: Path = None, strict: bool = False):
+    """
+    Lit vocab.bin (sinon tokenizer.json) sans toucher au vocabulaire partagé ; None si indisponible.
+    strict (rechargement) : un fichier absent ou illisible lève une exception au lieu de None.
+    """
+    base = Path(__file__).parent if base is None else Path(base)
+    try:
+        if (base / VOCAB_FILE).exists():
+            return _Vocab.load(base / VOCAB_FILE)
+        p = base / "tokenizer.json"
+        if not p.exists():
+            if strict:
+                raise FileNotFoundError(f"ni {VOCAB_FILE} ni tokenizer.json dans {base}")
+            return None
+        parsed = vocab_from_tokenizer_json(json.loads(p.read_text(encoding="utf-8")))
+        if parsed is None and strict:
+            raise ValueError(f"{p} : pas de word_index")
+        return None if parsed is None else _Vocab.from_word_index(*parsed)
     except Exception:
-        _TOKENIZER_VOCAB = None
-        _WORD_COUNTS = None
-        _WORDS_BY_FIRST = None
-        _TOP_WORDS = None
+        if strict:
+            raise
+        return None
+
+def _load_tokenizer_vocab():
+    if _TOKENIZER_VOCAB is not None:
+        return
+    vocab = read_vocab()
+    if vocab is not None:
+        set_vocab(vocab)
+
+def set_vocab(vocab):
+    """
+    Remplace le vocabulaire partagé (rechargement à chaud des artefacts) et vide le cache
+    de correction. _correct_token ne lit que _VOCAB : jamais un mélange ancien / nouveau.
+    """
+    global _VOCAB, _TOKENIZER_VOCAB, _INDEX
+    _VOCAB = vocab
+    _TOKENIZER_VOCAB = vocab.word_index if vocab is not None else None
+    _INDEX = vocab.index if vocab is not None else None
+    _correct_token_cached.cache_clear()
+
+def load_vocab():
+    """Vocabulaire partagé (chargé une seule fois par process) ; None si indisponible."""
+    _load_tokenizer_vocab()
+    return _VOCAB
 
 # ------------ correction token -> mot du vocab le plus proche ------------
 # paramètres ajustables
-_MAX_CANDIDATES = 200        # nb max de candidats à tester (par bucket)
 _MIN_RATIO = 0.70           # ratio min accepté pour remplacement (0..1)
 _MAX_DISTANCE = 3           # distance de Levenshtein maximale autorisée
 
+def _max_distance_for(token: str) -> int:
+    """
+    Distance max utile pour ce token : ratio >= _MIN_RATIO impose
+    d <= (1 - _MIN_RATIO) * max(len) et len(candidat) <= len(token) + d,
+    donc d <= (1 - r) * len(token) / r.
+    """
+    r = _MIN_RATIO
+    bound = int(((1.0 - r) * len(token)) / r + 1e-9) if r > 0 else _MAX_DISTANCE
+    return min(_MAX_DISTANCE, bound)
+
 @lru_cache(maxsize=20000)
-def _correct_token_cached(token: str):
-    return _correct_token(token)
+def _correct_token_cached(token: str, vocab=None):
+    return _correct_token(token, vocab)
 
-def _correct_token(token: str):
+def _correct_token(token: str, vocab=None):
     """
     Si tokenizer vocab disponible :
       - si token connu -> retourne token
-      - sinon recherche candidats dans bucket (même première lettre) + top words fallback
+      - sinon interroge l'index : tous les mots du vocab à distance <= _MAX_DISTANCE
       - calcule ratio de similarité ; garde candidats avec ratio >= _MIN_RATIO
       - retourne meilleur candidat selon (ratio, fréquence)
     Sinon : retourne token inchangé.
+    vocab : vocabulaire à utiliser (défaut : vocabulaire partagé).
     """
     if not token:
         return token
 
-    if _TOKENIZER_VOCAB is None:
+    if vocab is None:
+        vocab = _VOCAB  # lu une fois : set_vocab peut le remplacer pendant l'appel
+    if vocab is None:
         return token
 
     # si déjà connu
-    if token in _TOKENIZER_VOCAB:
+    if token in vocab.word_index:
         return token
 
-    first = token[0]
-    candidates = []
-    if _WORDS_BY_FIRST and first in _WORDS_BY_FIRST:
-        candidates = _WORDS_BY_FIRST[first][:_MAX_CANDIDATES]
-    # fallback : top words (rare)
-    if not candidates:
-        candidates = _TOP_WORDS[:_MAX_CANDIDATES]
-
     best = None
     best_score = -1.0
-    best_freq = 0
-    for c in candidates:
-        # quick length filter
-        if abs(len(c) - len(token)) > 4:
-            continue
-        dist = _levenshtein_distance(token, c)
-        if dist > _MAX_DISTANCE:
-            continue
+    for c, dist in vocab.index.search(token, _max_distance_for(token)):
         ratio = 1.0 - (dist / max(len(c), len(token), 1))
         if ratio < _MIN_RATIO:
             continue
-        freq = _WORD_COUNTS.get(c, 0)
+        freq = vocab.count(c)
         # score improvement: prefer higher ratio, then higher freq
         score = ratio + (freq / (freq + 1000)) * 0.001
         if score > best_score:
             best_score = score
             best = c
-            best_freq = freq
 
     if best is not None:
         return best
     return token
 
-# ------------ fonction publique clean_text ------------
+# ------------ fonctions publiques clean_text / clean_text_batch ------------
+def _normalize_one(s: str) -> str:
+    """Étapes 1 à 6 de clean_text (sans correction), en une passe fusionnée."""
+    s = str(s)
+    ascii_only = s.isascii()
+    # 1) normalise unicode (NFKC ne modifie jamais un texte ASCII)
+    if not ascii_only:
+        s = unicodedata.normalize("NFKC", s)
+        ascii_only = s.isascii()
+    # 2) retire URLs (emojis : remplacés par le filtre, comme tout caractère hors a-z0-9')
+    if "http" in s or "www." in s:
+        s = URL_RE.sub(" ", s)
+    # 3) lowercase + 4) filtre + 5) collapse espaces
+    s = s.lower()
+    if ascii_only:
+        s = s.encode("ascii").translate(_ASCII_FILTER).decode("ascii")
+    else:
+        s = s.translate(_UNICODE_FILTER)
+    s = " ".join(s.split())
+    # 6) réduction allongements (3+ -> 2)
+    return ELONGATION_RE.sub(r"\1\1", s)
+
+def clean_text_batch(texts, enable_spellcorrect: bool = True, vocab=None):
+    """
+    Version batch de clean_text (même sortie, texte par texte) : vocab chargé une
+    fois, normalisation fusionnée avec raccourci ASCII, correction via le cache.
+    Les None sont conservés tels quels.
+    vocab : corrige avec ce vocabulaire plutôt que le vocabulaire partagé (API : celui du
+    jeu d'artefacts de la requête, même si un reload a basculé entre-temps).
+    """
+    if vocab is not None:
+        # clé de cache (token, vocab) : jamais une correction d'un autre vocabulaire
+        def correct(t):
+            return _correct_token_cached(t, vocab)
+    else:
+        if enable_spellcorrect:
+            _load_tokenizer_vocab()
+            enable_spellcorrect = _TOKENIZER_VOCAB is not None
+        correct = _correct_token_cached
+    out = []
+    for s in texts:
+        if s is None:
+            out.append(s)
+            continue
+        s = _normalize_one(s)
+        if enable_spellcorrect and s:
+            # 7) tokenisation simple (by space) + correction token par token
+            s = " ".join([correct(t) for t in s.split(" ")])
+        out.append(s)
+    return out
+
 def clean_text(s: str, enable_spellcorrect: bool = True) -> str:
     """
     Nettoyage + correction légère :
@@ -177,44 +526,6 @@ def clean_text(s: str, enable_spellcorrect: bool = True) -> str:
     - lowercase
     - garde a-z0-9 et apostrophe
     - réduit allongements (3+ -> 2)
-    - si enable_spellcorrect et tokenizer.json présent, corrige tokens inconnus via vocab
+    - si enable_spellcorrect et vocabulaire présent, corrige tokens inconnus via vocab
     """
-    if s is None:
-        return s
-
-    # lazy load vocab (une seule fois)
-    _load_tokenizer_vocab()
-
-    # 1) normalise unicode
-    s0 = _normalize_unicode(str(s))
-
-    # 2) retire URLs & emojis
-    s1 = URL_RE.sub(" ", s0)
-    s1 = EMOJI_RE.sub(" ", s1)
-
-    # 3) lowercase
-    s1 = s1.lower()
-
-    # 4) filtre caractères indésirables (garde letters/numbers/space/apostrophe)
-    s1 = re.sub(r"[^a-z0-9\s']", " ", s1)
-
-    # 5) collapse espaces
-    s1 = re.sub(r"\s+", " ", s1).strip()
-
-    # 6) réduction allongements (3+ -> 2)
-    s_reduced = _reduce_elongation_keep_doubles(s1)
-
-    if not enable_spellcorrect or _TOKENIZER_VOCAB is None:
-        return s_reduced
-
-    # 7) tokenisation simple (by space) + correction token par token
-    tokens = s_reduced.split()
-    corrected = []
-    for t in tokens:
-        # conserve apostrophe forms intact (e.g. "i'm") but treat token for correction
-        t_clean = t.strip()
-        # attempt correction
-        corr = _correct_token_cached(t_clean)
-        corrected.append(corr)
-
-    return " ".join(corrected)
+    return clean_text_batch([s], enable_spellcorrect=enable_spellcorrect)[0]
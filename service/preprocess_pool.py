@@ -0,0 +1,120 @@
+# service/preprocess_pool.py
+"""
+Pool de process pour le prétraitement de /predict (nettoyage + tokenisation).
+
+Le nettoyage (regex, correction orthographique Levenshtein) est du Python pur
+qui tient le GIL : plus de threads = plus de contention, pas plus de débit.
+Ici chaque worker (process "spawn", créé une fois au startup) charge son
+vocabulaire (vocab.bin en mmap : pages partagées entre workers) et son
+tokenizer, puis traite des tranches de `chunk_size` textes.
+
+`max_inflight` borne le nombre de tranches soumises et non terminées : au-delà,
+l'appelant attend (backpressure) au lieu d'empiler du travail dans le pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import multiprocessing as mp
+import threading
+
+import numpy as np
+
+_TOKENIZER = None
+_PREPROCESS = None
+_SECURE = False
+
+
+def _init_worker():
+    """Chargé une fois par worker : préprocesseur (sécurisé si dispo) + tokenizer natif."""
+    global _TOKENIZER, _PREPROCESS, _SECURE
+    from service import preprocess as pp
+    from service.tokenizer import BatchTokenizer
+
+    secure = getattr(pp, "secure_preprocess", None)
+    if secure is not None:
+        _PREPROCESS, _SECURE = (lambda texts: [secure(t) for t in texts]), True
+    else:
+        _PREPROCESS, _SECURE = pp.clean_text_batch, False
+
+    vocab = pp.load_vocab()
+    if vocab is None:
+        text = (Path(pp.__file__).parent / "tokenizer.json").read_text(encoding="utf-8")
+        _TOKENIZER = BatchTokenizer.from_json(text)
+    else:
+        _TOKENIZER = BatchTokenizer.from_vocab(vocab)
+
+
+def _ping():
+    return True
+
+
+def _clean_and_encode(texts, maxlen):
+    """-> (textes nettoyés, ids int32 (N, maxlen), longueurs) ; exécuté dans un worker."""
+    cleaned = _PREPROCESS(texts)
+    ids, lengths = _TOKENIZER.encode_batch(cleaned, maxlen, assume_clean=not _SECURE)
+    return cleaned, ids, lengths
+
+
+class PreprocessPool:
+    def __init__(self, workers: int, max_inflight: int = 0, chunk_size: int = 64):
+        if workers < 1:
+            raise ValueError("workers doit être >= 1")
+        self.workers = int(workers)
+        self.max_inflight = int(max_inflight) if max_inflight > 0 else 2 * self.workers
+        self.chunk_size = max(1, int(chunk_size))
+        # spawn : pas de fork d'un process qui a déjà des threads (uvicorn, batcher, TF)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=mp.get_context("spawn"), initializer=_init_worker
+        )
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._tasks = 0
+        self._texts = 0
+
+    def warmup(self):
+        """Démarre tous les workers (spawn + chargement vocab) avant le premier appel."""
+        for f in [self._pool.submit(_ping) for _ in range(self.workers)]:
+            f.result()
+
+    def _submit(self, texts, maxlen):
+        self._slots.acquire()  # bloque tant que max_inflight tranches sont en cours
+        with self._lock:
+            self._inflight += 1
+            self._tasks += 1
+            self._texts += len(texts)
+        try:
+            fut = self._pool.submit(_clean_and_encode, texts, maxlen)
+        except BaseException:
+            self._release(None)
+            raise
+        fut.add_done_callback(self._release)
+        return fut
+
+    def _release(self, _fut):
+        with self._lock:
+            self._inflight -= 1
+        self._slots.release()
+
+    def clean_and_encode(self, texts, maxlen: int):
+        """Textes bruts -> (nettoyés, ids (N, maxlen), longueurs), tranches réparties sur les workers."""
+        futs = [self._submit(texts[i:i + self.chunk_size], maxlen)
+                for i in range(0, len(texts), self.chunk_size)]
+        parts = [f.result() for f in futs]
+        if not parts:
+            return [], np.zeros((0, maxlen), dtype=np.int32), np.zeros(0, dtype=np.int32)
+        cleaned = [t for p in parts for t in p[0]]
+        return cleaned, np.concatenate([p[1] for p in parts]), np.concatenate([p[2] for p in parts])
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_inflight": self.max_inflight,
+                "chunk_size": self.chunk_size,
+                "inflight": self._inflight,
+                "tasks": self._tasks,
+                "texts": self._texts,
+            }
@@ -0,0 +1,92 @@
+# service/streaming.py
+"""
+Outils pour /predict/stream : lecture NDJSON incrémentale du corps de requête
+et réponse en flux.
+
+Le corps est consommé morceau par morceau (jamais matérialisé) ; la réponse est
+produite au même rythme : tant que le client ne lit pas la sortie, `send` bloque
+et le corps n'est plus lu (backpressure de bout en bout). La mémoire reste bornée
+par la taille d'un chunk de scoring, quelle que soit la taille de l'entrée.
+"""
+import json
+
+from starlette.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse dont le générateur lit lui-même le corps de la requête.
+
+    La version Starlette écoute `receive` en parallèle pour détecter la déconnexion
+    et avalerait les messages `http.request` du corps ; ici la déconnexion remonte
+    directement à la lecture du corps (ClientDisconnect) ou à l'envoi.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+async def iter_lines(chunks, max_line_bytes: int):
+    """
+    Itérable async de bytes -> lignes (bytes, sans '\\n'), dans l'ordre.
+    Une ligne plus longue que max_line_bytes est jetée et signalée par une
+    instance de LineTooLong à sa place (le flux continue).
+    """
+    buf = bytearray()
+    skipping = False  # on est au milieu d'une ligne trop longue
+    async for chunk in chunks:
+        start = 0
+        while True:
+            nl = chunk.find(b"\n", start)
+            if nl < 0:
+                if not skipping:
+                    buf += chunk[start:]
+                    if len(buf) > max_line_bytes:
+                        buf.clear()
+                        skipping = True
+                break
+            if skipping:
+                skipping = False
+                yield LineTooLong(f"ligne > {max_line_bytes} octets")
+            else:
+                buf += chunk[start:nl]
+                if len(buf) > max_line_bytes:
+                    yield LineTooLong(f"ligne > {max_line_bytes} octets")
+                else:
+                    yield bytes(buf)
+                buf.clear()
+            start = nl + 1
+    if skipping:
+        yield LineTooLong(f"ligne > {max_line_bytes} octets")
+    elif buf.strip():
+        yield bytes(buf)
+
+
+def parse_item(line: bytes):
+    """
+    Une ligne NDJSON -> (id, texte). Formats acceptés :
+      "un commentaire"                      -> id None
+      {"text": "un commentaire", "id": 42}  -> id optionnel, renvoyé tel quel
+    Lève ValueError si la ligne est invalide.
+    """
+    try:
+        obj = json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"JSON invalide : {e}") from None
+    if isinstance(obj, str):
+        return None, obj
+    if isinstance(obj, dict) and isinstance(obj.get("text"), str):
+        return obj.get("id"), obj["text"]
+    raise ValueError("attendu une chaîne JSON ou un objet {\"text\": ..., \"id\": ...}")
+
+
+def dump_line(obj) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
@@ -0,0 +1,92 @@
+# service/tokenizer.py
+"""
+Tokenizer natif (sans TensorFlow), compatible avec `keras.preprocessing.text.Tokenizer`
+pour l'usage du service : même découpage (lower + filters + split), même coupure
+`num_words` (ids >= num_words -> oov), même gestion de `oov_token`.
+
+`encode_batch` écrit directement les ids de tout le batch dans une matrice int32
+préallouée (troncature/padding "post", comme pad_sequences dans step2_train).
+Pour des textes déjà passés par `clean_text` (minuscules, sans ponctuation),
+`assume_clean=True` saute le lowercase et les filtres.
+"""
+import json
+import numpy as np
+
+KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+
+class BatchTokenizer:
+    def __init__(self, word_index: dict, num_words=None, oov_token=None,
+                 filters: str = KERAS_FILTERS, lower: bool = True, split: str = " "):
+        self.word_index = word_index
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.lower = lower
+        self.split = split
+        self.oov_index = word_index.get(oov_token) if oov_token is not None else None
+        # lookup direct : la coupure num_words est appliquée une fois pour toutes
+        self._lookup = word_index if not num_words else {
+            w: i for w, i in word_index.items() if i < num_words
+        }
+        self._table = str.maketrans({c: split for c in filters})
+
+    @classmethod
+    def from_vocab(cls, vocab):
+        """Depuis le vocabulaire partagé (preprocess.load_vocab(), déjà élagué à num_words)."""
+        return cls(vocab.word_index, num_words=vocab.num_words, oov_token=vocab.oov_token)
+
+    @classmethod
+    def from_json(cls, text: str):
+        """Depuis le JSON d'un Tokenizer Keras (tokenizer.to_json())."""
+        cfg = json.loads(text)
+        cfg = cfg.get("config", cfg)
+        if cfg.get("char_level"):
+            raise ValueError("Tokenizer char_level non supporté")
+        word_index = cfg["word_index"]
+        if isinstance(word_index, str):
+            word_index = json.loads(word_index)
+        return cls(
+            {w: int(i) for w, i in word_index.items()},
+            num_words=cfg.get("num_words"),
+            oov_token=cfg.get("oov_token"),
+            filters=cfg.get("filters", KERAS_FILTERS),
+            lower=cfg.get("lower", True),
+            split=cfg.get("split", " "),
+        )
+
+    def _words(self, text: str, assume_clean: bool):
+        if not assume_clean:
+            if self.lower:
+                text = text.lower()
+            text = text.translate(self._table)
+        return [w for w in text.split(self.split) if w]
+
+    def _ids(self, words):
+        get, oov = self._lookup.get, self.oov_index
+        if oov is not None:
+            return [get(w, oov) for w in words]
+        return [i for i in map(get, words) if i is not None]
+
+    def texts_to_sequences(self, texts, assume_clean: bool = False):
+        """Équivalent de Tokenizer.texts_to_sequences."""
+        return [self._ids(self._words(t, assume_clean)) for t in texts]
+
+    def encode_batch(self, texts, maxlen: int, assume_clean: bool = False):
+        """
+        -> (ids int32 (N, maxlen) paddés à droite avec 0, longueurs int32 (N,))
+        Les séquences plus longues que maxlen sont tronquées à la fin.
+        """
+        n = len(texts)
+        ids = np.zeros((n, maxlen), dtype=np.int32)
+        lengths = np.zeros(n, dtype=np.int32)
+        flat = []
+        for i, t in enumerate(texts):
+            seq = self._ids(self._words(t, assume_clean))[:maxlen]
+            lengths[i] = len(seq)
+            flat.extend(seq)
+        if flat:
+            # une seule écriture vectorisée : (ligne, colonne) de chaque id
+            rows = np.repeat(np.arange(n), lengths)
+            starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+            ids[rows, np.arange(len(flat)) - starts] = flat
+        return ids, lengths
@@ -0,0 +1,78 @@
+"""
+Magasin des lignes déjà anonymisées (SQLite, stdlib) pour l'anonymisation incrémentale :
+une ligne = (id, hash du texte source, texte anonymisé, comptes DCP de la ligne).
+
+- `lookup(ids, digests)` : résultats réutilisables (même id ET même hash de texte) ;
+  une ligne nouvelle ou modifiée n'est pas renvoyée et repasse par spaCy
+- `upsert(rows)` : une transaction par chunk -> un run interrompu garde tous les chunks
+  déjà validés, le suivant repart de là
+- la config (masquage, modèle spaCy, PREP_VERSION, hash du code) est mémorisée : si elle change, le
+  magasin est vidé plutôt que de mélanger deux anonymisations
+"""
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_PATH = Path("data/.anon_store.sqlite")
+# nombre de paramètres par requête IN (...) (limite SQLite historique : 999)
+_LOOKUP_BATCH = 500
+
+
+def text_digest(text) -> str:
+    return hashlib.sha1(("" if text is None else str(text)).encode("utf-8")).hexdigest()
+
+
+class AnonStore:
+    def __init__(self, path=DEFAULT_PATH, config: Optional[dict] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        # WAL : écritures par chunk rapides et lecture cohérente même après un arrêt brutal
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS rows (id TEXT PRIMARY KEY, digest TEXT NOT NULL, "
+                             "anonymized TEXT NOT NULL, counts TEXT NOT NULL)")
+        self.reset = False
+        if config is not None:
+            self._check_config(json.dumps(config, sort_keys=True))
+
+    def _check_config(self, cfg: str):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+        if row is not None and row[0] == cfg:
+            return
+        with self._db:
+            if row is not None:  # autre réglage : les anciens résultats ne sont plus valables
+                self._db.execute("DELETE FROM rows")
+                self.reset = True
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('config', ?)", (cfg,))
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def lookup(self, ids: Sequence[str], digests: Sequence[str]) -> List[Optional[Tuple[str, Dict[str, int]]]]:
+        """Pour chaque ligne : (texte anonymisé, comptes) si id connu avec le même hash, sinon None."""
+        found = {}
+        uniq = list(dict.fromkeys(ids))
+        for i in range(0, len(uniq), _LOOKUP_BATCH):
+            part = uniq[i:i + _LOOKUP_BATCH]
+            q = f"SELECT id, digest, anonymized, counts FROM rows WHERE id IN ({','.join('?' * len(part))})"
+            for rid, dig, anon, counts in self._db.execute(q, part):
+                found[rid] = (dig, anon, counts)
+        out = []
+        for rid, dig in zip(ids, digests):
+            hit = found.get(rid)
+            out.append((hit[1], json.loads(hit[2])) if hit is not None and hit[0] == dig else None)
+        return out
+
+    def upsert(self, rows: Iterable[Tuple[str, str, str, Dict[str, int]]]):
+        """rows : (id, digest, texte anonymisé, comptes), validées en une transaction."""
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?)",
+                                 ((rid, dig, anon, json.dumps(c)) for rid, dig, anon, c in rows))
+
+    def close(self):
+        self._db.close()
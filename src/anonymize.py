@@ -1,7 +1,8 @@
 import re
-from typing import Dict
+from typing import Dict, Iterable, List, Tuple
 import spacy
-from .pii_patterns import REGEX_PATTERNS, ADDRESS_RE, CREDIT_CARD_RE, USERNAME_RE, PII_LABELS
+from service.pii_scan import PiiScrubber
+from .pii_patterns import PII_LABELS
 from .config import SPACY_MODEL
 
 try:
@@ -10,39 +11,8 @@ except OSError:
     # permet "python -m spacy download en_core_web_sm" avant, sinon lève une erreur claire
     raise RuntimeError(f"spaCy model '{SPACY_MODEL}' introuvable. Installe-le: python -m spacy download {SPACY_MODEL}")
 
-def anonymize_text(text: str, counts: Dict[str, int], use_label_tokens: bool = True) -> str:
-    def _mask(label: str) -> str:
-        return label if use_label_tokens else "****"
-
-    if not text:
-        return text
-    tmp = text
-
-    # 1) Regex DCP
-    for label in ["EMAIL","IP","PHONE","URL"]:
-        rx = REGEX_PATTERNS[label]
-        def repl(m, L=label):
-            counts[L] = counts.get(L, 0) + 1
-            return _mask(L)
-        tmp = rx.sub(repl, tmp)
-
-    # Adresse postale
-    tmp = ADDRESS_RE.sub(lambda m: (counts.__setitem__("ADDRESS", counts.get("ADDRESS",0)+1)) or _mask("ADDRESS"), tmp)
-
-    # Cartes bancaires (filtrage)
-    def cc_repl(m):
-        digits = re.sub(r"\D", "", m.group(0))
-        if 13 <= len(digits) <= 19:
-            counts["CREDIT_CARD"] = counts.get("CREDIT_CARD", 0) + 1
-            return _mask("CREDIT_CARD")
-        return m.group(0)
-    tmp = CREDIT_CARD_RE.sub(cc_repl, tmp)
-
-    # @username
-    tmp = USERNAME_RE.sub(lambda m: (counts.__setitem__("USERNAME", counts.get("USERNAME",0)+1)) or _mask("USERNAME"), tmp)
-
-    # 2) spaCy PERSON uniquement
-    doc = nlp(tmp)
+def _person_pass(tmp: str, doc, counts: Dict[str, int], _mask) -> str:
+    """Étape 2 : remplace les entités PERSON du doc spaCy (calculé sur tmp)."""
     out, last = [], 0
     for ent in doc.ents:
         if ent.start_char > last:
@@ -55,5 +25,41 @@ def anonymize_text(text: str, counts: Dict[str, int], use_label_tokens: bool = T
     anonymized = "".join(out)
 
     # Nettoyage PERSON PERSON
-    anonymized = re.sub(r"(PERSON)(?:\s*,?\s*PERSON)+", "PERSON", anonymized)
+    return re.sub(r"(PERSON)(?:\s*,?\s*PERSON)+", "PERSON", anonymized)
+
+def _ner_only_disable() -> List[str]:
+    """Composants inutiles pour PERSON : tout sauf ner (et le tok2vec partagé s'il l'écoute)."""
+    keep = {"ner"}
+    for name in nlp.pipe_names:
+        if "ner" in getattr(nlp.get_pipe(name), "listening_components", ()):
+            keep.add(name)
+    return [name for name in nlp.pipe_names if name not in keep]
+
+def anonymize_batch(texts: Iterable[str], use_label_tokens: bool = True,
+                    batch_size: int = 256, n_process: int = 1) -> Tuple[List[str], List[Dict[str, int]]]:
+    """
+    Anonymise une liste de textes -> (textes anonymisés, comptes DCP par ligne), dans l'ordre.
+    Regex texte par texte (PiiScrubber), puis NER en lot via nlp.pipe (batch_size textes par lot,
+    n_process process) avec seulement le composant ner actif. Sortie identique à
+    anonymize_text ligne par ligne.
+    """
+    def _mask(label: str) -> str:
+        return label if use_label_tokens else "****"
+
+    texts = list(texts)
+    out = list(texts)
+    counts = [{} for _ in texts]
+    todo = [i for i, t in enumerate(texts) if t]  # textes vides renvoyés tels quels
+    scrubber = PiiScrubber(use_label_tokens)
+    tmps = [scrubber.scrub(texts[i], counts[i]) for i in todo]
+    docs = nlp.pipe(tmps, batch_size=batch_size, n_process=n_process, disable=_ner_only_disable())
+    for i, tmp, doc in zip(todo, tmps, docs):
+        out[i] = _person_pass(tmp, doc, counts[i], _mask)
+    return out, counts
+
+def anonymize_text(text: str, counts: Dict[str, int], use_label_tokens: bool = True) -> str:
+    """Anonymise un texte ; les DCP trouvées sont ajoutées à counts."""
+    (anonymized,), (local,) = anonymize_batch([text], use_label_tokens=use_label_tokens)
+    for k, v in local.items():
+        counts[k] = counts.get(k, 0) + v
     return anonymized
@@ -1,7 +1,79 @@
+"""
+Lecture des jeux de données (CSV, ou Parquet via pyarrow) sans tout charger :
+- projection : seules les colonnes utiles au pipeline sont parsées (id, textes, labels) ;
+  une colonne demandée mais absente du fichier est ignorée
+- `load_df(csv, n_rows)` s'arrête après n_rows lignes (plus de parse complet + .head())
+- `iter_df(csv, chunksize)` : DataFrames successifs de taille fixe, pour traiter en flux
+  des fichiers plus gros que la RAM (anonymisation, préparation, scoring en masse)
+"""
 import pandas as pd
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 from .config import CSV_PATH, N_ROWS
 
-def load_df(csv_path: Path | str = CSV_PATH, n_rows: int = N_ROWS) -> pd.DataFrame:
-    df_all = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
-    return df_all.head(n_rows).copy()
+LABEL_COLS = ["toxic","severe_toxic","obscene","threat","insult","identity_hate"]
+# colonnes lues par défaut (None = toutes)
+DEFAULT_COLUMNS = ("id", "comment_text", "comment_text_anonymized", *LABEL_COLS)
+CHUNKSIZE = 50000
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+def _fast_engine() -> Optional[str]:
+    """Parseur CSV pyarrow (multithreadé) s'il est installé."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return "pyarrow"
+
+def _project(available, columns) -> Optional[list]:
+    """Colonnes demandées présentes dans le fichier, dans l'ordre du fichier (None = toutes)."""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return [c for c in available if c in wanted]
+
+def _csv_kwargs(path: Path, columns) -> dict:
+    header = pd.read_csv(path, nrows=0).columns
+    return dict(usecols=_project(header, columns), dtype=str, keep_default_na=False)
+
+def iter_df(csv_path: Path | str = CSV_PATH, chunksize: int = CHUNKSIZE,
+            columns: Optional[Iterable[str]] = DEFAULT_COLUMNS,
+            n_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """DataFrames de chunksize lignes (le dernier éventuellement plus court), n_rows au plus."""
+    path = Path(csv_path)
+    if _is_parquet(path):
+        import pyarrow.parquet as pq  # optionnel : uniquement pour l'entrée Parquet
+        f = pq.ParquetFile(path)
+        batches = (b.to_pandas() for b in f.iter_batches(batch_size=chunksize,
+                                                         columns=_project(f.schema_arrow.names, columns)))
+    else:
+        batches = pd.read_csv(path, chunksize=chunksize, nrows=n_rows or None, **_csv_kwargs(path, columns))
+    left = n_rows or None
+    for df in batches:
+        if left is not None:
+            if left <= 0:
+                break
+            if len(df) > left:
+                df = df.iloc[:left]
+            left -= len(df)
+        yield df
+
+def load_df(csv_path: Path | str = CSV_PATH, n_rows: Optional[int] = N_ROWS,
+            columns: Optional[Iterable[str]] = DEFAULT_COLUMNS) -> pd.DataFrame:
+    """n_rows premières lignes (None/0 = tout le fichier), colonnes projetées."""
+    path = Path(csv_path)
+    if _is_parquet(path):
+        parts = list(iter_df(path, columns=columns, n_rows=n_rows))
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(columns or []))
+    kwargs = _csv_kwargs(path, columns)
+    if n_rows:
+        return pd.read_csv(path, nrows=n_rows, **kwargs)  # parse arrêté après n_rows lignes
+    engine = _fast_engine()
+    if engine is not None:
+        try:
+            return pd.read_csv(path, engine=engine, **kwargs)
+        except ValueError:  # option non supportée par ce moteur/cette version : parseur C
+            pass
+    return pd.read_csv(path, **kwargs)
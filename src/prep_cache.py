@@ -0,0 +1,169 @@
+"""
+Cache des prétraitements, adressé par contenu : une entrée est identifiée par le hash
+du fichier d'entrée, la plage de lignes, la configuration du prétraitement et le hash
+des sources qui le réalisent (nettoyage, motifs DCP...). Relancer
+step1/step2 sur les mêmes données avec les mêmes réglages relit le résultat au lieu de
+refaire spaCy, le nettoyage, le fit du tokenizer et le padding.
+
+Une entrée = un dossier `<racine>/<étape>-<clé>/` :
+  meta.json              configuration, infos libres (comptes DCP, tailles...)
+  <nom> (texte)          fichier libre (ex. tokenizer.json)
+  <nom>.npy              tableaux (ex. ids int32 paddés) relus en mmap (np.load mmap_mode="r")
+  <nom>.txt.bin          colonne de textes : UTF-8 concaténé, relu en mmap
+  <nom>.offsets.npy      bornes int64 de chaque texte dans <nom>.txt.bin
+Écriture dans un dossier temporaire puis rename : une entrée visible est toujours complète.
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DIR = Path("data/.prep_cache")
+# à incrémenter si le format des entrées change (le code des étapes est couvert par code_digest)
+PREP_VERSION = 1
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def file_digest(path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def code_digest(sources) -> str:
+    """Hash des fichiers sources (chemins relatifs à la racine du dépôt) d'un prétraitement."""
+    h = hashlib.sha256()
+    for rel in sources:
+        h.update(rel.encode("utf-8"))
+        h.update(file_digest(_ROOT / rel).encode("ascii"))
+    return h.hexdigest()[:16]
+
+
+def cache_key(path, n_rows, config: dict, code=()) -> str:
+    """Hash (contenu du fichier, plage de lignes, config, sources `code` du prétraitement, PREP_VERSION)."""
+    payload = json.dumps({"file": file_digest(path), "n_rows": n_rows or None, "config": config,
+                          "code": code_digest(code), "version": PREP_VERSION}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+class TextColumn:
+    """Textes relus à la demande depuis le blob UTF-8 mappé en mémoire."""
+
+    def __init__(self, blob_path: Path, offsets_path: Path):
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        size = blob_path.stat().st_size
+        if size:
+            with open(blob_path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:  # mmap refuse les fichiers vides
+            self._mm = b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self._mm[int(self.offsets[i]):int(self.offsets[i + 1])].decode("utf-8")
+
+    def tolist(self):
+        return self[:]
+
+
+class _TextWriter:
+    def __init__(self, base: Path):
+        self._f = open(base.with_suffix(".txt.bin"), "wb")
+        self._base = base
+        self._offsets = [0]
+
+    def extend(self, texts):
+        pos = self._offsets[-1]
+        for t in texts:
+            b = ("" if t is None else str(t)).encode("utf-8")
+            self._f.write(b)
+            pos += len(b)
+            self._offsets.append(pos)
+
+    def close(self):
+        self._f.close()
+        np.save(self._base.with_suffix(".offsets.npy"), np.asarray(self._offsets, dtype=np.int64))
+
+
+class Entry:
+    """Entrée du cache en lecture."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+
+    def array(self, name: str) -> np.ndarray:
+        return np.load(self.path / f"{name}.npy", mmap_mode="r")
+
+    def texts(self, name: str) -> TextColumn:
+        return TextColumn(self.path / f"{name}.txt.bin", self.path / f"{name}.offsets.npy")
+
+    def read_text(self, name: str) -> str:
+        return (self.path / name).read_text(encoding="utf-8")
+
+
+class EntryWriter:
+    """Entrée en cours d'écriture (dossier temporaire, publiée par commit())."""
+
+    def __init__(self, final: Path):
+        self.final = final
+        self.path = final.with_name(f".{final.name}.tmp-{os.getpid()}")
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.path.mkdir(parents=True)
+        self.meta = {}
+        self._texts = {}
+
+    def save_array(self, name: str, arr):
+        np.save(self.path / f"{name}.npy", np.ascontiguousarray(arr))
+
+    def save_text(self, name: str, text: str):
+        (self.path / name).write_text(text, encoding="utf-8")
+
+    def extend_texts(self, name: str, texts):
+        """Ajout incrémental (chunk par chunk) à une colonne de textes."""
+        w = self._texts.get(name)
+        if w is None:
+            w = self._texts[name] = _TextWriter(self.path / name)
+        w.extend(texts)
+
+    def commit(self) -> Entry:
+        for w in self._texts.values():
+            w.close()
+        (self.path / "meta.json").write_text(json.dumps(self.meta, indent=2), encoding="utf-8")
+        try:
+            os.rename(self.path, self.final)
+        except OSError:  # publiée entre-temps par un autre run : on garde la sienne
+            shutil.rmtree(self.path, ignore_errors=True)
+        return Entry(self.final)
+
+    def abort(self):
+        for w in self._texts.values():
+            w._f.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class PrepCache:
+    def __init__(self, root=DEFAULT_DIR):
+        self.root = Path(root)
+
+    def _dir(self, stage: str, key: str) -> Path:
+        return self.root / f"{stage}-{key}"
+
+    def get(self, stage: str, key: str):
+        """Entry, ou None si absente."""
+        p = self._dir(stage, key)
+        return Entry(p) if (p / "meta.json").exists() else None
+
+    def writer(self, stage: str, key: str) -> EntryWriter:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return EntryWriter(self._dir(stage, key))
@@ -0,0 +1,210 @@
+"""
+Scoring offline en masse d'un CSV / Parquet, sans passer par l'API HTTP.
+
+  python -m src.score_bulk --input data/comments.csv --output out/scores
+  python -m src.score_bulk --input data/comments.parquet --output out/scores --workers 8
+
+- l'entrée est lue par chunks (`--chunksize` lignes, colonnes projetées : id + texte)
+- nettoyage (service.preprocess.clean_text_batch, correction orthographique comprise)
+  et tokenisation sont répartis sur un pool de processus (`--workers`)
+- le modèle (NumPy ou Keras, cf. service/app.py) reçoit de gros batchs triés par longueur
+- sortie : un fichier par chunk dans `--output` (part-00000.parquet, ...), une colonne
+  par label ; écriture atomique, donc une relance reprend au premier chunk manquant
+"""
+import argparse, json, os, time
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from service.artifacts import artifact_version, load_labels, load_model, resolve_backend, supports_masking
+from service.numpy_model import VARIANT_FILES
+
+from .config import EXPORT_DIR
+from .dataio import iter_df
+
+MAX_LEN = 120
+META_FILE = "_meta.json"
+
+# ------------ workers : nettoyage + tokenisation ------------
+_TOKENIZER = None
+
+
+def _init_worker(service_dir: str):
+    """
+    Initialisation par process : vocab.bin de service_dir (mmap, pages partagées), sinon
+    son tokenizer.json ; installé pour le tokenizer ET le correcteur (mêmes ids que le modèle).
+    """
+    global _TOKENIZER
+    from service.preprocess import read_vocab, set_vocab
+    from service.tokenizer import BatchTokenizer
+    vocab = read_vocab(service_dir)
+    if vocab is None:
+        raise RuntimeError(f"{service_dir} : ni vocab.bin ni tokenizer.json lisible")
+    set_vocab(vocab)
+    _TOKENIZER = BatchTokenizer.from_vocab(vocab)
+
+
+def _encode(texts, enable_spellcorrect: bool = True):
+    """Textes bruts -> (ids int32 (N, MAX_LEN), longueurs) ; exécuté dans un worker."""
+    from service.preprocess import clean_text_batch
+    cleaned = clean_text_batch(texts, enable_spellcorrect=enable_spellcorrect)
+    return _TOKENIZER.encode_batch(cleaned, MAX_LEN, assume_clean=True)
+
+
+class _InlinePool:
+    """--workers 0 : même interface que le pool, exécution dans le process courant."""
+
+    class _Done:
+        def __init__(self, value):
+            self._value = value
+
+        def result(self):
+            return self._value
+
+    def submit(self, fn, *args):
+        return self._Done(fn(*args))
+
+    def shutdown(self, wait=True):
+        pass
+
+
+# ------------ modèle (même chargement que l'API : service/artifacts.py) ------------
+def predict_ids(model, ids, lengths, batch_size: int = 2048):
+    """
+    ids (N, MAX_LEN) -> scores (N, C). Modèle masqué : tri par longueur et padding
+    coupé à la plus longue séquence de chaque batch ; sinon padding fixe MAX_LEN.
+    """
+    n = len(lengths)
+    masked = supports_masking(model)
+    order = np.argsort(lengths, kind="stable") if masked else np.arange(n)
+    out = None
+    for start in range(0, n, batch_size):
+        idx = order[start:start + batch_size]
+        width = max(1, int(lengths[idx].max())) if masked else MAX_LEN
+        preds = np.asarray(model.predict(ids[idx, :width], verbose=0))
+        if out is None:
+            out = np.empty((n, preds.shape[1]), dtype=np.float32)
+        out[idx] = preds
+    return out
+
+
+# ------------ entrée / sortie ------------
+def _part_path(out_dir: Path, k: int, fmt: str) -> Path:
+    return out_dir / f"part-{k:05d}.{fmt}"
+
+
+def _write_part(df: pd.DataFrame, path: Path, fmt: str):
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)  # atomique : un part présent est toujours complet
+
+
+def _check_meta(out_dir: Path, meta: dict):
+    """Reprise : refuse de mélanger des parts produits avec d'autres paramètres."""
+    p = out_dir / META_FILE
+    if p.exists():
+        old = json.loads(p.read_text(encoding="utf-8"))
+        if old != meta:
+            raise SystemExit(f"{out_dir} contient un scoring différent ({old}) ; choisir un autre --output")
+    else:
+        p.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+# ------------ pipeline ------------
+def main(input_path, output_dir, text_col="comment_text", id_col="id", chunksize=50000,
+         workers=None, batch_size=2048, fmt="parquet", backend="auto", variant="float32",
+         service_dir=EXPORT_DIR, enable_spellcorrect=True):
+    input_path, out_dir, service_dir = Path(input_path), Path(output_dir), Path(service_dir)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    backend = resolve_backend(service_dir, backend, variant)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # modèle compris : une reprise après ré-export des artefacts ne mélange pas deux modèles
+    _check_meta(out_dir, {
+        "input": str(input_path.resolve()), "text_col": text_col, "id_col": id_col,
+        "chunksize": chunksize, "spellcorrect": enable_spellcorrect, "format": fmt,
+        "artifact_version": artifact_version(service_dir), "backend": backend, "variant": variant,
+    })
+
+    labels = load_labels(service_dir)
+
+    # workers en "spawn" : ils ne démarrent qu'au premier submit, après le chargement du modèle,
+    # et ne doivent pas hériter (fork) d'un process où TF a déjà lancé ses threads
+    if workers > 0:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(str(service_dir),))
+    else:
+        _init_worker(str(service_dir))
+        pool = _InlinePool()
+    model = load_model(service_dir, backend, variant)
+    slices = max(1, workers)
+
+    def submit(k, df):
+        texts = df[text_col].astype(str).tolist()
+        step = -(-len(texts) // slices) or 1
+        futs = [pool.submit(_encode, texts[i:i + step], enable_spellcorrect) for i in range(0, len(texts), step)]
+        return k, df, futs
+
+    t0 = time.perf_counter()
+    done_rows = skipped = 0
+    inflight = deque()  # chunk k+1 prétraité par le pool pendant le forward du chunk k
+
+    def finish(k, df, futs):
+        nonlocal done_rows
+        parts = [f.result() for f in futs]
+        ids = np.concatenate([p[0] for p in parts]) if parts else np.zeros((0, MAX_LEN), np.int32)
+        lengths = np.concatenate([p[1] for p in parts]) if parts else np.zeros(0, np.int32)
+        scores = predict_ids(model, ids, lengths, batch_size) if len(lengths) else np.zeros((0, len(labels)), np.float32)
+        out = pd.DataFrame({id_col: df[id_col].to_numpy()}) if id_col else pd.DataFrame(index=range(len(df)))
+        for j, lab in enumerate(labels):
+            out[lab] = scores[:, j]
+        _write_part(out, _part_path(out_dir, k, fmt), fmt)
+        done_rows += len(df)
+        dt = time.perf_counter() - t0
+        print(f"chunk {k:05d} : {len(df)} lignes | total {done_rows} en {dt:.1f}s ({done_rows / dt:.0f} lignes/s)")
+
+    try:
+        for k, df in enumerate(iter_df(input_path, chunksize, columns=[c for c in (id_col, text_col) if c])):
+            if _part_path(out_dir, k, fmt).exists():
+                skipped += 1
+                continue
+            inflight.append(submit(k, df))
+            if len(inflight) > 1:
+                finish(*inflight.popleft())
+        while inflight:
+            finish(*inflight.popleft())
+    finally:
+        pool.shutdown(wait=True)
+
+    dt = time.perf_counter() - t0
+    rate = done_rows / dt if dt > 0 else 0.0
+    print(f"Terminé : {done_rows} lignes scorées en {dt:.1f}s ({rate:.0f} lignes/s), "
+          f"{skipped} chunks déjà présents -> {out_dir}")
+    return {"rows": done_rows, "seconds": dt, "rows_per_s": rate, "skipped_chunks": skipped}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--input", required=True, help="CSV ou Parquet")
+    ap.add_argument("--output", required=True, help="dossier de sortie (un fichier par chunk)")
+    ap.add_argument("--text-col", default="comment_text")
+    ap.add_argument("--id-col", default="id", help="'' pour ne pas reporter d'identifiant")
+    ap.add_argument("--chunksize", type=int, default=50000)
+    ap.add_argument("--workers", type=int, default=None, help="process de prétraitement (0 = inline)")
+    ap.add_argument("--batch-size", type=int, default=2048, help="lignes par forward du modèle")
+    ap.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    ap.add_argument("--backend", choices=["auto", "numpy", "keras"], default="auto")
+    ap.add_argument("--variant", choices=sorted(VARIANT_FILES), default="float32", help="poids NumPy (cf. step3_export)")
+    ap.add_argument("--service-dir", default=str(EXPORT_DIR))
+    ap.add_argument("--no-spellcorrect", action="store_true")
+    args = ap.parse_args()
+    main(args.input, args.output, text_col=args.text_col, id_col=args.id_col or None,
+         chunksize=args.chunksize, workers=args.workers, batch_size=args.batch_size,
+         fmt=args.format, backend=args.backend, variant=args.variant, service_dir=args.service_dir,
+         enable_spellcorrect=not args.no_spellcorrect)
@@ -1,23 +1,107 @@
 import argparse
+import time
 from datetime import datetime
-from .config import CSV_PATH, N_ROWS
-from .dataio import load_df
-from .anonymize import anonymize_text
+from importlib import metadata
+from .config import CSV_PATH, N_ROWS, SPACY_MODEL
+from .dataio import CHUNKSIZE, iter_df
+from .anon_store import DEFAULT_PATH as DEFAULT_STORE, AnonStore, text_digest
 from .pii_patterns import PII_LABELS
+from .prep_cache import DEFAULT_DIR, PREP_VERSION, PrepCache, cache_key, code_digest
 from .utils_text import short
 
-def main(csv: str, n_rows: int, use_labels: bool):
-    dfN = load_df(csv, n_rows)
+# sources de l'anonymisation (NER + motifs DCP) : une modification invalide cache et magasin
+ANONYMIZE_CODE = ("src/anonymize.py", "src/pii_patterns.py", "service/pii_scan.py")
 
-    counts_global, anon_list = {}, []
-    for _, row in dfN.iterrows():
-        local = {}
-        anon = anonymize_text(row.get("comment_text",""), local, use_label_tokens=use_labels)
-        anon_list.append(anon)
-        for k, v in local.items():
-            counts_global[k] = counts_global.get(k, 0) + v
+def _spacy_model_version():
+    try:
+        return metadata.version(SPACY_MODEL)
+    except metadata.PackageNotFoundError:
+        return None
 
-    dfN["comment_text_anonymized"] = anon_list
+def _anonymize_chunk(anonymize_batch, texts, ids, store, **kw):
+    """anonymize_batch, mais seules les lignes absentes du magasin (ou modifiées) passent par spaCy."""
+    if store is None:
+        anon_list, per_row = anonymize_batch(texts, **kw)
+        return anon_list, per_row, len(texts)
+    digests = [text_digest(t) for t in texts]
+    known = store.lookup(ids, digests)
+    todo = [i for i, hit in enumerate(known) if hit is None]
+    fresh, fresh_counts = anonymize_batch([texts[i] for i in todo], **kw) if todo else ([], [])
+    anon_list = [hit[0] if hit is not None else None for hit in known]
+    per_row = [hit[1] if hit is not None else None for hit in known]
+    for i, anon, c in zip(todo, fresh, fresh_counts):
+        anon_list[i], per_row[i] = anon, c
+    # validé avant d'écrire le chunk : un arrêt ensuite ne perd rien
+    store.upsert((ids[i], digests[i], anon_list[i], per_row[i]) for i in todo)
+    return anon_list, per_row, len(todo)
+
+def main(csv: str, n_rows: int, use_labels: bool, batch_size: int = 256, n_process: int = 1,
+         chunksize: int = CHUNKSIZE, out: str = "data/_anonymized_head.csv", cache_dir=DEFAULT_DIR,
+         store_path=None):
+    config = {"use_labels": use_labels, "spacy_model": SPACY_MODEL, "spacy_model_version": _spacy_model_version()}
+    # cache adressé par contenu : même fichier, mêmes lignes, même config -> spaCy n'est pas relancé
+    entry = writer = store = None
+    if cache_dir:
+        cache = PrepCache(cache_dir)
+        key = cache_key(csv, n_rows, {"stage": "anonymize", **config}, ANONYMIZE_CODE)
+        entry = cache.get("anonymize", key)
+        writer = cache.writer("anonymize", key) if entry is None else None
+    if entry is not None:
+        print(f"Cache : {entry.path} (anonymisation relue, spaCy non chargé)")
+        cached, counts_global = entry.texts("anonymized"), dict(entry.meta["counts"])
+    else:
+        from .anonymize import anonymize_batch  # charge spaCy : seulement si le cache ne sert pas
+        counts_global = {}
+        if store_path:
+            # mode incrémental : lignes connues (même id, même texte) relues, nouvelles/modifiées anonymisées
+            store = AnonStore(store_path, {**config, "version": PREP_VERSION,
+                                           "code": code_digest(ANONYMIZE_CODE)})
+            print(f"Magasin incrémental : {store_path} ({len(store)} lignes"
+                  f"{', vidé : configuration changée' if store.reset else ''})")
+
+    # lecture en flux (chunksize lignes, colonnes projetées) : chaque chunk anonymisé est
+    # ajouté au CSV de sortie, seul le premier est gardé pour l'aperçu
+    dfN, total, fresh = None, 0, 0
+    t0 = time.perf_counter()
+    try:
+        for k, df in enumerate(iter_df(csv, chunksize, n_rows=n_rows)):
+            if entry is not None:
+                anon_list = cached[total:total + len(df)]
+            else:
+                # NER en lot (nlp.pipe, composant ner seul) ; ordre des lignes conservé
+                texts = df["comment_text"].tolist() if "comment_text" in df else [""] * len(df)
+                ids = df["id"].tolist() if "id" in df else [text_digest(t) for t in texts]
+                anon_list, per_row, n_new = _anonymize_chunk(anonymize_batch, texts, ids, store,
+                                                             use_label_tokens=use_labels,
+                                                             batch_size=batch_size, n_process=n_process)
+                fresh += n_new
+                for local in per_row:
+                    for key, v in local.items():
+                        counts_global[key] = counts_global.get(key, 0) + v
+                if writer is not None:
+                    writer.extend_texts("anonymized", anon_list)
+            df["comment_text_anonymized"] = anon_list
+            df.to_csv(out, index=False, mode="w" if k == 0 else "a", header=k == 0)
+            total += len(df)
+            if dfN is None:
+                dfN = df
+            elapsed = time.perf_counter() - t0
+            print(f"Anonymisation : {total} lignes en {elapsed:.1f} s "
+                  f"({total / elapsed if elapsed else 0:.0f} lignes/s, batch_size={batch_size}, n_process={n_process})"
+                  + (f" | spaCy : {fresh} nouvelles/modifiées, {total - fresh} relues" if store is not None else ""))
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    finally:
+        if store is not None:
+            store.close()
+    if writer is not None:
+        writer.meta = {"rows": total, "counts": counts_global}
+        writer.commit()
+    if dfN is None:
+        print(f"{csv} : aucune ligne")
+        return
 
     print("\nAperçu anonymisé (5 lignes) :")
     print(dfN.loc[:, ["id","comment_text_anonymized"]].head(5).to_string(index=False))
@@ -30,8 +114,8 @@ def main(csv: str, n_rows: int, use_labels: bool):
 
     print("\n=== REGISTRE (imprimé) — Anonymisation DCP uniquement ===")
     print(f"Date UTC         : {datetime.utcnow().isoformat()}Z")
-    print(f"Fichier traité   : {csv} (N_ROWS={len(dfN)})")
-    print("Modèle NER       : spaCy en_core_web_sm (PERSON uniquement)")
+    print(f"Fichier traité   : {csv} (N_ROWS={total})")
+    print("Modèle NER       : spaCy en_core_web_sm, composant ner seul (PERSON uniquement)")
     print("Catégories DCP   : PERSON, EMAIL, PHONE, ADDRESS, IP, URL, USERNAME, CREDIT_CARD")
     print(f"Sortie/format    : {'Labels (PERSON/EMAIL/...)' if use_labels else '**** (masquage intégral)'}")
 
@@ -39,14 +123,24 @@ def main(csv: str, n_rows: int, use_labels: bool):
     for k in ["PERSON","EMAIL","PHONE","ADDRESS","IP","URL","USERNAME","CREDIT_CARD"]:
         if k in counts_global:
             print(f"  - {k:>11}: {counts_global[k]}")
-
-    # Sauvegarde rapide si tu veux réutiliser directement en étape 2
-    dfN.to_csv("data/_anonymized_head.csv", index=False)
+    print(f"\nSortie           : {out}")
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--csv", default=str(CSV_PATH))
     ap.add_argument("--n-rows", type=int, default=N_ROWS)
     ap.add_argument("--mask-labels", action="store_true", help="PERSON/EMAIL/... ; sinon ****")
+    ap.add_argument("--batch-size", type=int, default=256, help="textes par lot nlp.pipe")
+    ap.add_argument("--n-process", type=int, default=1, help="process spaCy (nlp.pipe n_process)")
+    ap.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="lignes lues par chunk")
+    ap.add_argument("--out", default="data/_anonymized_head.csv", help="CSV anonymisé (réutilisable en étape 2)")
+    ap.add_argument("--cache-dir", default=str(DEFAULT_DIR), help="cache des prétraitements")
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--incremental", action="store_true",
+                    help="n'anonymiser que les lignes nouvelles ou modifiées (magasin --store)")
+    ap.add_argument("--store", default=str(DEFAULT_STORE), help="magasin des lignes anonymisées (SQLite)")
     args = ap.parse_args()
-    main(csv=args.csv, n_rows=args.n_rows, use_labels=args.mask_labels)
+    main(csv=args.csv, n_rows=args.n_rows, use_labels=args.mask_labels,
+         batch_size=args.batch_size, n_process=args.n_process, chunksize=args.chunksize, out=args.out,
+         cache_dir=None if args.no_cache else args.cache_dir,
+         store_path=args.store if args.incremental else None)
@@ -1,40 +1,84 @@
-import argparse, time
+import argparse, json, time
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import precision_score, recall_score, f1_score
 import tensorflow as tf
-from tensorflow.keras.preprocessing.text import Tokenizer
+from tensorflow.keras.preprocessing.text import Tokenizer, tokenizer_from_json
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 from tensorflow.keras import layers, models
 from .config import CSV_PATH, N_ROWS
-from .dataio import load_df
-from .utils_text import clean_text
+from .dataio import LABEL_COLS, iter_df
+from .prep_cache import DEFAULT_DIR, PrepCache, cache_key
+from .tf_input import DEFAULT_BUCKETS, ThroughputCallback, bucketed_dataset, set_cpu_threads
+from service.preprocess import clean_text_batch, write_vocab_file
 
-LABEL_COLS = ["toxic","severe_toxic","obscene","threat","insult","identity_hate"]
+MAX_VOCAB, MAX_LEN = 8000, 120
+# tout ce qui change les séquences d'entrée : fait partie de la clé du cache de préparation
+PREP_CONFIG = {"stage": "train", "spellcorrect": False, "max_vocab": MAX_VOCAB, "max_len": MAX_LEN,
+               "oov_token": "<unk>", "padding": "post", "test_size": 0.3, "random_state": 42}
+# sources du nettoyage (clean_text_batch) : une modification invalide le cache
+PREP_CODE = ("service/preprocess.py",)
 
-def main(csv: str, n_rows: int, use_anonymized: bool = True):
-    dfN = load_df(csv, n_rows)
+def prepare(csv: str, n_rows: int, use_anonymized: bool = True):
+    """Nettoyage, split, fit du tokenizer, padding int32 -> (tokenizer, Xtr, Xva, Y_train, Y_val)."""
+    # lecture en flux : seuls les textes nettoyés et les labels restent en mémoire
+    X, Ys = [], []
+    for dfN in iter_df(csv, n_rows=n_rows):
+        text_col = "comment_text_anonymized" if use_anonymized and "comment_text_anonymized" in dfN.columns else "comment_text"
+        X.extend(clean_text_batch(dfN[text_col].astype(str).tolist(), enable_spellcorrect=False))
+        Ys.append(dfN[LABEL_COLS].apply(pd.to_numeric, errors="coerce").fillna(0).astype(int).values)
+    Y = np.concatenate(Ys) if Ys else np.zeros((0, len(LABEL_COLS)), dtype=int)
 
-    for c in LABEL_COLS:
-        dfN[c] = pd.to_numeric(dfN[c], errors="coerce").fillna(0).astype(int)
+    X_train, X_val, Y_train, Y_val = train_test_split(X, Y, test_size=PREP_CONFIG["test_size"],
+                                                      random_state=PREP_CONFIG["random_state"])
+    tokenizer = Tokenizer(num_words=MAX_VOCAB, oov_token="<unk>")
+    tokenizer.fit_on_texts(X_train)
+    Xtr = pad_sequences(tokenizer.texts_to_sequences(X_train), maxlen=MAX_LEN, padding="post", truncating="post", dtype="int32")
+    Xva = pad_sequences(tokenizer.texts_to_sequences(X_val),   maxlen=MAX_LEN, padding="post", truncating="post", dtype="int32")
+    return tokenizer, Xtr, Xva, Y_train, Y_val
 
-    text_col = "comment_text_anonymized" if use_anonymized and "comment_text_anonymized" in dfN.columns else "comment_text"
-    dfN["text_clean"] = dfN[text_col].apply(clean_text)
-    X = dfN["text_clean"].astype(str).tolist()
-    Y = dfN[LABEL_COLS].values
+def load_prepared(csv: str, n_rows: int, use_anonymized: bool = True, cache_dir=DEFAULT_DIR):
+    """prepare() via le cache : une entrée existante est relue en mmap (aucun nettoyage ni padding)."""
+    if not cache_dir:
+        return (*prepare(csv, n_rows, use_anonymized), False)
+    cache = PrepCache(cache_dir)
+    key = cache_key(csv, n_rows, {**PREP_CONFIG, "use_anonymized": use_anonymized}, PREP_CODE)
+    entry = cache.get("train", key)
+    hit = entry is not None
+    if not hit:
+        tokenizer, *arrays = prepare(csv, n_rows, use_anonymized)
+        w = cache.writer("train", key)
+        try:
+            for name, arr in zip(("Xtr", "Xva", "Y_train", "Y_val"), arrays):
+                w.save_array(name, arr)
+            w.save_text("tokenizer.json", tokenizer.to_json())
+            w.meta = {"n_train": len(arrays[0]), "n_val": len(arrays[1])}
+        except BaseException:
+            w.abort()
+            raise
+        entry = w.commit()
+    tokenizer = tokenizer_from_json(entry.read_text("tokenizer.json"))
+    return (tokenizer, *(entry.array(n) for n in ("Xtr", "Xva", "Y_train", "Y_val")), hit)
 
-    X_train, X_val, Y_train, Y_val = train_test_split(X, Y, test_size=0.3, random_state=42)
-    print("Taille train/val :", len(X_train), "/", len(X_val))
+def main(csv: str, n_rows: int, use_anonymized: bool = True, pipeline: str = "numpy", batch_size: int = None,
+         epochs: int = 8, buckets=DEFAULT_BUCKETS, intra_threads: int = None, inter_threads: int = None,
+         report: str = "service/training_report.json", cache_dir=DEFAULT_DIR):
+    # threads TF fixés avant toute opération TF (seulement si demandés)
+    intra, inter = set_cpu_threads(intra_threads, inter_threads)
+    # pipeline "numpy" : tableaux paddés à 120 (historique) ; "tfdata" : buckets de longueur
+    batch_size = batch_size or (64 if pipeline == "tfdata" else 8)
 
-    MAX_VOCAB, MAX_LEN = 8000, 120
-    tokenizer = Tokenizer(num_words=MAX_VOCAB, oov_token="<unk>")
-    tokenizer.fit_on_texts(X_train)
-    Xtr = pad_sequences(tokenizer.texts_to_sequences(X_train), maxlen=MAX_LEN, padding="post", truncating="post")
-    Xva = pad_sequences(tokenizer.texts_to_sequences(X_val),   maxlen=MAX_LEN, padding="post", truncating="post")
+    t_prep = time.perf_counter()
+    tokenizer, Xtr, Xva, Y_train, Y_val, cache_hit = load_prepared(csv, n_rows, use_anonymized, cache_dir)
+    prep_time = time.perf_counter() - t_prep
+    print("Taille train/val :", len(Xtr), "/", len(Xva))
+    print(f"Préparation : {prep_time:.2f}s ({'cache' if cache_hit else 'calculée'})")
 
     model = models.Sequential([
-        layers.Embedding(input_dim=MAX_VOCAB, output_dim=64),
+        # mask_zero : le padding (id 0) est ignoré par le LSTM -> le service peut
+        # padder dynamiquement par bucket sans changer les scores
+        layers.Embedding(input_dim=MAX_VOCAB, output_dim=64, mask_zero=True),
         layers.Bidirectional(layers.LSTM(64)),
         layers.Dropout(0.2),
         layers.Dense(64, activation="relu"),
@@ -42,8 +86,15 @@ def main(csv: str, n_rows: int, use_anonymized: bool = True):
     ])
     model.compile(optimizer="adam", loss="binary_crossentropy", metrics=[])
 
+    throughput = ThroughputCallback(len(Xtr))
     t0 = time.perf_counter()
-    hist = model.fit(Xtr, Y_train, validation_data=(Xva, Y_val), epochs=8, batch_size=8, verbose=0)
+    if pipeline == "tfdata":
+        train_ds = bucketed_dataset(Xtr, Y_train, batch_size, MAX_LEN, buckets)
+        val_ds = bucketed_dataset(Xva, Y_val, batch_size, MAX_LEN, buckets, shuffle=False)
+        hist = model.fit(train_ds, validation_data=val_ds, epochs=epochs, verbose=0, callbacks=[throughput])
+    else:
+        hist = model.fit(Xtr, Y_train, validation_data=(Xva, Y_val), epochs=epochs, batch_size=batch_size,
+                         verbose=0, callbacks=[throughput])
     train_time = time.perf_counter() - t0
 
     t1 = time.perf_counter()
@@ -52,27 +103,62 @@ def main(csv: str, n_rows: int, use_anonymized: bool = True):
     Yhat = (Yp >= 0.5).astype(int)
 
     print("=== Modèle (BiLSTM) ===")
+    print(f"Pipeline : {pipeline} | batch={batch_size} | threads intra={intra} inter={inter}")
+    for e in throughput.epochs:
+        print(f"  epoch {e['epoch']:>2} : {e['seconds']:.2f}s | {e['samples_per_s']} échantillons/s")
     print(f"Temps entraînement : {train_time:.3f}s | Prédiction : {pred_time:.3f}s")
+    print(f"Débit entraînement : {throughput.steady_samples_per_s()} échantillons/s (hors 1re epoch)")
+    scores = {}
     for avg in ("micro","macro"):
         p = precision_score(Y_val, Yhat, average=avg, zero_division=0)
         r = recall_score   (Y_val, Yhat, average=avg, zero_division=0)
         f = f1_score       (Y_val, Yhat, average=avg, zero_division=0)
+        scores[avg] = {"precision": round(float(p), 4), "recall": round(float(r), 4), "f1": round(float(f), 4)}
         print(f"{avg.title():<5} P={p:.3f} R={r:.3f} F1={f:.3f}")
 
     # Sauvegarde “checkpoint” pour l’étape 3
     model.save("service/model.keras")
     with open("service/tokenizer.json", "w", encoding="utf-8") as f:
         f.write(tokenizer.to_json())
+    # vocabulaire compact (mmap) partagé par le tokenizer et le correcteur du service
+    write_vocab_file("service/vocab.bin", tokenizer.word_index, tokenizer.word_counts,
+                     num_words=MAX_VOCAB, oov_token="<unk>")
     with open("service/labels.txt", "w", encoding="utf-8") as f:
         for lab in LABEL_COLS:
             f.write(lab + "\n")
 
-    print("Artefacts sauvegardés dans ./service")
+    # suivi d'un run à l'autre : débit par epoch à côté des P/R/F1
+    with open(report, "w", encoding="utf-8") as f:
+        json.dump({
+            "pipeline": pipeline, "batch_size": batch_size, "epochs": epochs, "use_anonymized": use_anonymized,
+            "buckets": list(buckets) if pipeline == "tfdata" else None,
+            "threads": {"intra": intra, "inter": inter},
+            "n_train": len(Xtr), "n_val": len(Xva),
+            "prep_seconds": round(prep_time, 3), "prep_cache_hit": cache_hit,
+            "train_seconds": round(train_time, 3), "predict_seconds": round(pred_time, 3),
+            "samples_per_s": throughput.steady_samples_per_s(), "per_epoch": throughput.epochs,
+            "scores": scores,
+        }, f, indent=2)
+
+    print(f"Artefacts sauvegardés dans ./service (rapport : {report})")
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--csv", default=str(CSV_PATH))
     ap.add_argument("--n-rows", type=int, default=N_ROWS)
     ap.add_argument("--use-anonymized", action="store_true")
+    ap.add_argument("--pipeline", choices=["numpy", "tfdata"], default="numpy",
+                    help="tfdata : batchs par bucket de longueur, shuffle + prefetch")
+    ap.add_argument("--batch-size", type=int, default=None, help="défaut : 8 (numpy), 64 (tfdata)")
+    ap.add_argument("--epochs", type=int, default=8)
+    ap.add_argument("--buckets", default=",".join(map(str, DEFAULT_BUCKETS)), help="bornes de longueur (tfdata)")
+    ap.add_argument("--intra-threads", type=int, default=None, help="défaut : choix de TF (ex. nb de CPU)")
+    ap.add_argument("--inter-threads", type=int, default=None, help="défaut : choix de TF (ex. 2)")
+    ap.add_argument("--cache-dir", default=str(DEFAULT_DIR), help="cache des prétraitements")
+    ap.add_argument("--no-cache", action="store_true")
     args = ap.parse_args()
-    main(args.csv, args.n_rows, use_anonymized=args.use_anonymized)
+    main(args.csv, args.n_rows, use_anonymized=args.use_anonymized, pipeline=args.pipeline,
+         batch_size=args.batch_size, epochs=args.epochs,
+         buckets=[int(b) for b in args.buckets.split(",") if b.strip()],
+         intra_threads=args.intra_threads, inter_threads=args.inter_threads,
+         cache_dir=None if args.no_cache else args.cache_dir)
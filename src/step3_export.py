@@ -1,6 +1,7 @@
 import argparse, json
 from pathlib import Path
-from .config import EXPORT_DIR
+import numpy as np
+from .config import CSV_PATH, EXPORT_DIR, N_ROWS
 from .utils_text import clean_text
 
 SERVICE = EXPORT_DIR  # Path("service")
@@ -80,19 +81,146 @@ def write_api_requirements_and_dockerfile():
         encoding="utf-8"
     )
 
-def main():
+def write_vocab():
+    """tokenizer.json -> vocab.bin (vocabulaire compact élagué à num_words)."""
+    from service.preprocess import VOCAB_FILE, vocab_from_tokenizer_json, write_vocab_file
+    parsed = vocab_from_tokenizer_json(json.loads((SERVICE / "tokenizer.json").read_text(encoding="utf-8")))
+    if parsed is None:
+        raise ValueError("tokenizer.json : word_counts / word_index introuvables")
+    return write_vocab_file(SERVICE / VOCAB_FILE, *parsed)
+
+def write_numpy_weights():
+    """model.keras -> model_weights.npz (moteur NumPy, service sans TensorFlow)."""
+    import tensorflow as tf  # import tardif : seul cet export en a besoin
+    from service.numpy_model import export_keras_weights
+    model = tf.keras.models.load_model(SERVICE / "model.keras")
+    return export_keras_weights(model, SERVICE / "model_weights.npz")
+
+# dérive max tolérée (score absolu, par label) et baisse de F1 max vs le modèle float32
+QUANT_MAX_DRIFT = {"float16": 0.01, "int8": 0.05}
+QUANT_MAX_F1_DROP = 0.01
+# lignes par forward du contrôle de parité : encode matérialise (N, 120, 8*units) float32
+PARITY_BATCH = 1024
+
+def _trained_on_anonymized() -> bool:
+    """Colonne de texte utilisée par step2 (training_report.json), False si inconnue."""
+    p = SERVICE / "training_report.json"
+    if p.exists():
+        return bool(json.loads(p.read_text(encoding="utf-8")).get("use_anonymized", False))
+    return False
+
+def _held_out(csv, n_rows, use_anonymized=None):
+    """
+    Split de validation de step2_train -> (ids (N, MAX_LEN), Y) ; None si pas de données.
+    Même préparation (step2_train.load_prepared : colonne de texte, nettoyage, split, tokenizer,
+    cache compris) : le contrôle de parité tourne sur les lignes de validation du modèle.
+    """
+    if not Path(csv).exists():
+        return None
+    from .step2_train import load_prepared
+    if use_anonymized is None:
+        use_anonymized = _trained_on_anonymized()
+    _, _, Xva, _, Y_val, _ = load_prepared(csv, n_rows, use_anonymized)
+    return np.asarray(Xva, dtype=np.int32), np.asarray(Y_val)
+
+def _synthetic_ids(vocab_size, n=2000, max_len=120, seed=0):
+    """Repli sans CSV : séquences aléatoires de longueurs variées (dérive seule, F1 vs float32)."""
+    rng = np.random.default_rng(seed)
+    ids = np.zeros((n, max_len), dtype=np.int32)
+    for i, L in enumerate(rng.integers(1, max_len + 1, size=n)):
+        ids[i, :L] = rng.integers(1, vocab_size, size=L)
+    return ids
+
+def _predict_batched(model, ids, batch_size=PARITY_BATCH):
+    """Scores (N, C) par batchs de batch_size lignes : mémoire bornée quel que soit N."""
+    return np.concatenate([model.predict(ids[i:i + batch_size]) for i in range(0, max(len(ids), 1), batch_size)])
+
+def parity_report(ref_scores, scores, Y=None, labels=None, threshold=0.5):
+    """Dérive par label et F1 micro/macro d'une variante vs le modèle float32 (et vs Y si fourni)."""
+    from sklearn.metrics import f1_score
+    labels = labels or [str(j) for j in range(ref_scores.shape[1])]
+    drift = np.abs(scores - ref_scores)
+    truth = Y if Y is not None else (ref_scores >= threshold).astype(int)
+    rep = {
+        "drift": {lab: {"max": float(drift[:, j].max()), "mean": float(drift[:, j].mean())}
+                  for j, lab in enumerate(labels)},
+        "max_drift": float(drift.max()),
+        "reference": "labels" if Y is not None else "float32",
+    }
+    for avg in ("micro", "macro"):
+        rep[f"f1_{avg}"] = float(f1_score(truth, (scores >= threshold).astype(int), average=avg, zero_division=0))
+        rep[f"f1_{avg}_float32"] = float(f1_score(truth, (ref_scores >= threshold).astype(int), average=avg, zero_division=0))
+    return rep
+
+def write_quantized_weights(csv=None, n_rows=None, variants=("float16", "int8"), use_anonymized=None):
+    """
+    model_weights.npz -> variantes float16 / int8, gardées seulement si elles passent le
+    contrôle de parité (dérive max et baisse de F1) sur le split de validation.
+    Rapport écrit dans service/quantization_report.json.
+    """
+    from service.numpy_model import NumpyBiLSTM, VARIANT_FILES, quantize_weights
+    with np.load(SERVICE / "model_weights.npz") as data:
+        weights = {k: data[k] for k in data.files}
+    ref = NumpyBiLSTM(weights)
+    labels = [l.strip() for l in (SERVICE / "labels.txt").read_text(encoding="utf-8").splitlines() if l.strip()]
+
+    held = _held_out(csv, n_rows, use_anonymized) if csv else None
+    if held is None:
+        print("Parité : pas de CSV -> séquences synthétiques, F1 mesuré vs le modèle float32")
+        ids, Y = _synthetic_ids(ref.vocab_size), None
+    else:
+        ids, Y = held
+    ref_scores = _predict_batched(ref, ids)
+
+    report = {"n": int(len(ids)), "variants": {}}
+    for variant in variants:
+        path = SERVICE / VARIANT_FILES[variant]
+        np.savez(path, **quantize_weights(weights, variant))
+        model = NumpyBiLSTM.load(path)
+        rep = parity_report(ref_scores, _predict_batched(model, ids), Y, labels)
+        rep["file_bytes"] = path.stat().st_size
+        rep["resident_bytes"] = model.nbytes
+        rep["passed"] = bool(
+            rep["max_drift"] <= QUANT_MAX_DRIFT[variant]
+            and rep["f1_micro_float32"] - rep["f1_micro"] <= QUANT_MAX_F1_DROP
+            and rep["f1_macro_float32"] - rep["f1_macro"] <= QUANT_MAX_F1_DROP
+        )
+        if not rep["passed"]:
+            path.unlink()  # variante hors tolérance : jamais servie
+        report["variants"][variant] = rep
+        print(f"{variant:<8} dérive max={rep['max_drift']:.4f} F1 micro={rep['f1_micro']:.3f} "
+              f"(float32 {rep['f1_micro_float32']:.3f}) macro={rep['f1_macro']:.3f} "
+              f"(float32 {rep['f1_macro_float32']:.3f}) -> {'OK' if rep['passed'] else 'REJETÉE'}")
+    report["float32"] = {"file_bytes": (SERVICE / "model_weights.npz").stat().st_size, "resident_bytes": ref.nbytes}
+    (SERVICE / "quantization_report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+def main(csv=None, n_rows=None, quantize=True, use_anonymized=None):
     SERVICE.mkdir(parents=True, exist_ok=True)
     # On suppose que model.keras, tokenizer.json, labels.txt existent déjà (Étape 2)
     assert (SERVICE / "model.keras").exists(),  "service/model.keras manquant (exécute step2_train)"
     assert (SERVICE / "tokenizer.json").exists(),"service/tokenizer.json manquant (exécute step2_train)"
     assert (SERVICE / "labels.txt").exists(),   "service/labels.txt manquant (exécute step2_train)"
 
-    write_preprocess()
-    write_app()
-    write_api_requirements_and_dockerfile()
+    # squelettes générés seulement s'ils n'existent pas (ne jamais écraser le service maintenu)
+    if not (SERVICE / "preprocess.py").exists():
+        write_preprocess()
+    if not (SERVICE / "app.py").exists():
+        write_app()
+    if not (SERVICE / "requirements.txt").exists() or not (SERVICE / "Dockerfile").exists():
+        write_api_requirements_and_dockerfile()
+    write_vocab()
+    write_numpy_weights()
+    if quantize:
+        write_quantized_weights(csv, n_rows, use_anonymized=use_anonymized)
     print("API et fichiers d’export prêts dans ./service")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.parse_args()
-    main()
+    parser.add_argument("--csv", default=str(CSV_PATH), help="données pour le contrôle de parité")
+    parser.add_argument("--n-rows", type=int, default=N_ROWS)
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--use-anonymized", action=argparse.BooleanOptionalAction, default=None,
+                        help="colonne de texte du split de parité (défaut : celle de step2, training_report.json)")
+    args = parser.parse_args()
+    main(args.csv, args.n_rows, quantize=not args.no_quantize, use_anonymized=args.use_anonymized)
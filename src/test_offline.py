@@ -1,20 +1,12 @@
-import json, re
 from pathlib import Path
 import tensorflow as tf
 from tensorflow.keras.preprocessing.text import tokenizer_from_json
 from tensorflow.keras.preprocessing.sequence import pad_sequences
+from service.preprocess import clean_text_batch
 
 
 SERVICE = Path("service")
 
-def clean_text_local(s):
-    s = s.lower()
-    s = re.sub(r"https?://\S+|www\.\S+", " ", s)
-    s = re.sub(r"[\U00010000-\U0010ffff]", " ", s)
-    s = re.sub(r"[^a-z0-9\s']", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
 if __name__ == "__main__":
     tok = tokenizer_from_json((SERVICE/"tokenizer.json").read_text(encoding="utf-8"))
     labels = [l.strip() for l in (SERVICE/"labels.txt").read_text(encoding="utf-8").splitlines() if l.strip()]
@@ -24,7 +16,7 @@ if __name__ == "__main__":
         "You are awesome, thanks!",
         "You are a stupid idiot and I hate you.",
     ]
-    cleaned = [clean_text_local(t) for t in samples]
+    cleaned = clean_text_batch(samples)
     pad = pad_sequences(tok.texts_to_sequences(cleaned), maxlen=120, padding="post", truncating="post")
     preds = model.predict(pad, verbose=0)
 
@@ -0,0 +1,75 @@
+"""
+Pipeline d'entrée tf.data pour l'entraînement (step2_train --pipeline tfdata) :
+- séquences re-découpées à leur longueur réelle puis regroupées par bucket de longueur
+  (service.artifacts.pad_buckets : mêmes bornes que PAD_BUCKETS côté service) : chaque batch
+  n'est paddé qu'à la borne de son bucket, le LSTM (mask_zero=True) ne déroule plus 120 pas pour 6 mots
+- gros batchs (`batch_size`), shuffle à chaque epoch, map parallèle et prefetch
+- `ThroughputCallback` : durée et débit (échantillons/s) de chaque epoch
+"""
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from service.artifacts import pad_buckets
+
+# mêmes bornes que le service ($PAD_BUCKETS, défaut 16,32,64 + MAX_LEN) : pas de dérive entraînement / service
+DEFAULT_BUCKETS = tuple(pad_buckets())
+
+
+def set_cpu_threads(intra: int = None, inter: int = None):
+    """
+    Threads TF (à appeler avant toute opération TF) ; None = réglage de TF laissé tel quel,
+    0 = choix de TF. -> valeurs effectives (0 = choix de TF).
+    """
+    if intra is not None:
+        tf.config.threading.set_intra_op_parallelism_threads(intra)
+    if inter is not None:
+        tf.config.threading.set_inter_op_parallelism_threads(inter)
+    return (tf.config.threading.get_intra_op_parallelism_threads(),
+            tf.config.threading.get_inter_op_parallelism_threads())
+
+
+def bucketed_dataset(X, Y, batch_size: int, max_len: int, buckets=DEFAULT_BUCKETS,
+                     shuffle: bool = True, seed: int = 42) -> tf.data.Dataset:
+    """
+    X : ids right-paddés (N, max_len) ; Y : (N, C). -> Dataset de (ids (B, borne), Y (B, C)),
+    chaque batch ne contenant que des séquences d'un même bucket de longueur.
+    """
+    X = np.asarray(X, dtype=np.int32)
+    lengths = (X != 0).sum(axis=1).astype(np.int32)  # right pad : longueur = nb d'ids non nuls
+    ds = tf.data.Dataset.from_tensor_slices((X, lengths, np.asarray(Y, dtype=np.float32)))
+    if shuffle:
+        ds = ds.shuffle(len(X), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.map(lambda x, n, y: (x[:n], y), num_parallel_calls=tf.data.AUTOTUNE)
+    bounds = sorted({min(int(b), max_len) for b in buckets} | {max_len})
+    # bucket i : longueurs < bounds[i] + 1, paddées à bounds[i]
+    ds = ds.bucket_by_sequence_length(
+        element_length_func=lambda x, y: tf.shape(x)[0],
+        bucket_boundaries=[b + 1 for b in bounds],
+        bucket_batch_sizes=[batch_size] * (len(bounds) + 1),
+        pad_to_bucket_boundary=True,
+    )
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+class ThroughputCallback(tf.keras.callbacks.Callback):
+    """Durée et débit de chaque epoch (la 1re inclut le traçage des graphes)."""
+
+    def __init__(self, n_samples: int):
+        super().__init__()
+        self.n_samples = n_samples
+        self.epochs = []  # [{"epoch", "seconds", "samples_per_s"}]
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._t0 = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        dt = time.perf_counter() - self._t0
+        self.epochs.append({"epoch": epoch + 1, "seconds": round(dt, 3),
+                            "samples_per_s": round(self.n_samples / dt, 1) if dt else None})
+
+    def steady_samples_per_s(self):
+        """Débit moyen hors 1re epoch (ou de l'unique epoch)."""
+        runs = [e["samples_per_s"] for e in (self.epochs[1:] or self.epochs) if e["samples_per_s"]]
+        return round(sum(runs) / len(runs), 1) if runs else None
@@ -1,15 +1,9 @@
-import re
-
-EMOJI_RE = re.compile(r"[\U00010000-\U0010ffff]", flags=re.UNICODE)
-URL_RE   = re.compile(r"https?://\S+|www\.\S+")
+from service.preprocess import clean_text_batch
 
 def clean_text(s: str) -> str:
-    s = str(s).lower()
-    s = URL_RE.sub(" ", s)
-    s = EMOJI_RE.sub(" ", s)
-    s = re.sub(r"[^a-z0-9\s']", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    # même nettoyage que le service (service/preprocess.py), sans correction orthographique :
+    # à l'entraînement, le vocabulaire est justement construit sur ces textes
+    return clean_text_batch([s], enable_spellcorrect=False)[0]
 
 def short(s, n=140):
     s = str(s).replace("\n", " ")
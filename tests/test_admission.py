@@ -0,0 +1,79 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+
+def load_admission_module():
+    mod_path = Path("service") / "admission.py"
+    assert mod_path.exists(), "service/admission.py manquant"
+    spec = importlib.util.spec_from_file_location("admission", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+
+def test_limit_queue_and_early_rejection():
+    m = load_admission_module()
+    now = [0.0]
+    ctl = m.AdmissionController(target_s=1.0, initial_limit=2, max_limit=2, max_queue=10, clock=lambda: now[0])
+
+    async def scenario():
+        a = await ctl.acquire()
+        b = await ctl.acquire()
+        waiter = asyncio.ensure_future(ctl.acquire())
+        await asyncio.sleep(0)
+        assert (ctl.inflight, ctl.queued) == (2, 1)
+        now[0] = 0.3
+        ctl.release(a)  # slot transféré au premier en file
+        c = await waiter
+        assert (ctl.inflight, ctl.queued) == (2, 0)
+
+        # service ~0.3s, 2 slots occupés : file de 4 -> attente estimée 0.9s + 0.3s > 1s
+        for _ in range(4):
+            ctl._waiters.append(asyncio.get_running_loop().create_future())
+        with pytest.raises(m.Rejected) as e:
+            await ctl.acquire()
+        assert e.value.retry_after_s >= 1
+        ctl._waiters.clear()
+        ctl.release(b)
+        ctl.release(c)
+
+    asyncio.run(scenario())
+    st = ctl.stats()
+    assert st["rejected"] == 1 and st["admitted"] == 3 and st["queue_depth"] == 0
+
+
+def test_limit_adapts_to_service_time():
+    m = load_admission_module()
+    now = [0.0]
+    ctl = m.AdmissionController(target_s=10.0, initial_limit=4, max_limit=16, clock=lambda: now[0])
+
+    async def run(n, service_s):
+        for _ in range(n):
+            starts = [await ctl.acquire() for _ in range(ctl.limit)]
+            now[0] += service_s
+            for s in starts:
+                ctl.release(s)
+
+    asyncio.run(run(20, 0.05))   # latence stable à pleine charge -> la limite monte
+    grown = ctl.limit
+    assert grown > 4
+    asyncio.run(run(20, 0.5))    # temps de service x10 -> la limite redescend
+    assert ctl.limit < grown
+
+
+def test_predict_sheds_load_with_429(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from service import app as app_mod
+    from service.admission import AdmissionController
+    ctl = AdmissionController(target_s=1.0, initial_limit=1, max_limit=1)
+    ctl.inflight, ctl.ewma_service_s = 1, 2.0  # slot occupé, service 2s > cible 1s
+    monkeypatch.setattr(app_mod, "admission", ctl)
+    client = TestClient(app_mod.app)
+    r = client.post("/predict", json={"texts": ["hello"]})
+    assert r.status_code == 429 and int(r.headers["Retry-After"]) >= 1
+    assert "toxicity_admission_queue_depth 1" in client.get("/metrics").text
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from src.anon_store import AnonStore, text_digest
+from src.step1_anonymize import _anonymize_chunk
+
+
+def _fake_batch(calls):
+    def anonymize_batch(texts, **kw):
+        calls.append(list(texts))
+        return [t.upper() for t in texts], [{"PERSON": 1} for _ in texts]
+    return anonymize_batch
+
+
+def test_only_new_or_changed_rows_are_anonymized(tmp_path):
+    store = AnonStore(tmp_path / "s.sqlite", {"use_labels": True})
+    calls = []
+    out, counts, n = _anonymize_chunk(_fake_batch(calls), ["a", "b"], ["1", "2"], store)
+    assert out == ["A", "B"] and n == 2
+
+    # id 2 modifié, id 3 nouveau : seuls eux repassent par anonymize_batch
+    out, counts, n = _anonymize_chunk(_fake_batch(calls), ["a", "bb", "c"], ["1", "2", "3"], store)
+    assert out == ["A", "BB", "C"] and counts == [{"PERSON": 1}] * 3 and n == 2
+    assert calls[-1] == ["bb", "c"]
+    store.close()
+
+    # persistant : un nouveau run (ex. après interruption) relit tout
+    store = AnonStore(tmp_path / "s.sqlite", {"use_labels": True})
+    assert len(store) == 3 and not store.reset
+    assert store.lookup(["3", "3", "4"], [text_digest("c"), text_digest("x"), text_digest("c")]) == \
+        [("C", {"PERSON": 1}), None, None]
+    store.close()
+
+
+def test_config_change_clears_the_store(tmp_path):
+    store = AnonStore(tmp_path / "s.sqlite", {"use_labels": True})
+    store.upsert([("1", text_digest("a"), "A", {})])
+    store.close()
+    store = AnonStore(tmp_path / "s.sqlite", {"use_labels": False})
+    assert store.reset and len(store) == 0
+    store.close()
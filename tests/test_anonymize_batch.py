@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("pandas")
+
+from service.pii_scan import PiiScrubber
+
+
+def _anonymize_module():
+    try:
+        from src import anonymize
+    except RuntimeError as e:  # modèle en_core_web_sm non installé
+        pytest.skip(str(e))
+    return anonymize
+
+
+def test_anonymize_batch_matches_row_by_row_full_pipeline():
+    A = _anonymize_module()
+    texts = [
+        "John Smith wrote to jane.doe@example.com",
+        "",
+        "call me at 555-123-4567, Mary",
+        "@troll123 lives at 12 rue de la Paix",
+        "nothing to see here",
+    ] * 3
+
+    def reference(text, use_labels):
+        # ancienne implémentation : regex puis pipeline spaCy complet, texte par texte
+        counts, mask = {}, (lambda L: L if use_labels else "****")
+        if not text:
+            return text, counts
+        tmp = PiiScrubber(use_labels).scrub(text, counts)
+        return A._person_pass(tmp, A.nlp(tmp), counts, mask), counts
+
+    for use_labels in (True, False):
+        expected = [reference(t, use_labels) for t in texts]
+        out, counts = A.anonymize_batch(texts, use_label_tokens=use_labels, batch_size=4)
+        assert out == [e[0] for e in expected]
+        assert counts == [e[1] for e in expected]
+
+    assert "ner" not in A._ner_only_disable()
+    local = {"EMAIL": 1}
+    anonymized, counts0 = reference(texts[0], True)
+    assert A.anonymize_text(texts[0], local) == anonymized
+    assert local["EMAIL"] == counts0["EMAIL"] + 1  # comptes ajoutés au dict fourni
@@ -0,0 +1,53 @@
+import importlib.util
+import threading
+from pathlib import Path
+
+def load_batching_module():
+    mod_path = Path("service") / "batching.py"
+    assert mod_path.exists(), "service/batching.py manquant"
+    spec = importlib.util.spec_from_file_location("batching", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+def test_batcher_routes_outputs_back_to_each_request():
+    m = load_batching_module()
+    calls = []
+    def fn(items):
+        calls.append(len(items))
+        return [x * 10 for x in items]
+
+    b = m.MicroBatcher(fn, max_batch_size=8, max_wait_ms=50)
+    results = {}
+    def worker(i):
+        results[i] = b([i * 100 + k for k in range(3)])
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    b.close()
+
+    for i in range(4):
+        assert results[i] == [(i * 100 + k) * 10 for k in range(3)]
+    assert sum(calls) == 12
+    assert max(calls) <= 8
+    assert len(calls) < 12  # au moins une fusion entre requêtes
+    st = b.stats()
+    assert st["items"] == 12 and sum(st["batch_sizes"].values()) == st["batches"]
+
+def test_batcher_splits_oversized_request_and_propagates_errors():
+    m = load_batching_module()
+    b = m.MicroBatcher(lambda items: [x + 1 for x in items], max_batch_size=4, max_wait_ms=0)
+    assert b(list(range(10))) == list(range(1, 11))
+    assert b([]) == []
+    assert all(size <= 4 for size in b.stats()["batch_sizes"])
+    b.close()
+
+    def boom(items):
+        raise ValueError("boom")
+    b = m.MicroBatcher(boom, max_batch_size=4, max_wait_ms=0)
+    try:
+        b([1, 2])
+        assert False, "l'exception du forward doit remonter"
+    except ValueError:
+        pass
+    b.close()
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks import suite
+
+
+def _res(**cases):
+    return {"meta": {"commit": "x"}, "results": {k: {"us_per_item": v} for k, v in cases.items()}}
+
+
+def test_compare_flags_only_regressions_above_threshold():
+    base = _res(pad=1.0, tokenize=10.0, predict_e2e=100.0)
+    cur = _res(pad=1.1, tokenize=12.0, predict_e2e=50.0, clean_text_nospell=3.0)
+    lines, regressions = suite.compare(cur, base, threshold=0.15)
+    assert regressions == ["tokenize"]
+    assert any("nouveau" in l for l in lines)
+    assert suite.compare(cur, base, threshold=0.25)[1] == []
+
+
+def test_suite_writes_json_and_fails_on_regression(tmp_path):
+    out = tmp_path / "cur.json"
+    assert suite.main(["--quick", "--only", "pad", "--out", str(out)]) == 0
+    baseline = tmp_path / "base.json"
+    baseline.write_text('{"results": {"pad": {"us_per_item": 1e-9}}}', encoding="utf-8")
+    assert suite.main(["--quick", "--only", "pad", "--out", str(out), "--baseline", str(baseline)]) == 1
+
+
+def test_predict_e2e_case_restores_app_state(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from service import app as app_mod
+    monkeypatch.delenv("APP_SKIP_STARTUP", raising=False)
+    before = {name: getattr(app_mod, name) for name in suite._E2E_GLOBALS}
+    suite.case_predict_e2e(0.05, 1)
+    assert {name: getattr(app_mod, name) for name in suite._E2E_GLOBALS} == before
+    assert "APP_SKIP_STARTUP" not in os.environ
@@ -0,0 +1,38 @@
+import importlib.util
+from pathlib import Path
+
+def load_cache_module():
+    mod_path = Path("service") / "cache.py"
+    assert mod_path.exists(), "service/cache.py manquant"
+    spec = importlib.util.spec_from_file_location("cache", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+def test_lru_eviction_and_counters():
+    m = load_cache_module()
+    c = m.PredictionCache(maxsize=2, version="v1")
+    c.put_many(["a", "b"], [1, 2])
+    assert c.get_many(["a", "x"]) == [1, None]   # "a" devient le plus récent
+    c.put_many(["c"], [3])                       # évince "b"
+    assert c.get_many(["b", "a", "c"]) == [None, 1, 3]
+    st = c.stats()
+    assert (st["hits"], st["misses"], st["evictions"], st["size"]) == (3, 2, 1, 2)
+
+def test_ttl_and_version_invalidation():
+    m = load_cache_module()
+    now = [100.0]
+    c = m.PredictionCache(maxsize=10, ttl_s=5, version="v1", clock=lambda: now[0])
+    c.put_many(["a"], [1])
+    now[0] = 104.0
+    assert c.get_many(["a"]) == [1]
+    now[0] = 106.0
+    assert c.get_many(["a"]) == [None]
+    assert c.stats()["expirations"] == 1
+
+    c.put_many(["a"], [1])
+    c.set_version("v1")
+    assert c.get_many(["a"]) == [1]
+    c.set_version("v2")                          # nouveaux artefacts -> cache vidé
+    assert c.get_many(["a"]) == [None] and c.stats()["size"] == 0
+    assert c.key("a") != m.PredictionCache(version="v1").key("a")
@@ -0,0 +1,59 @@
+import importlib.util
+import random
+import re
+import unicodedata
+from pathlib import Path
+
+def load_preprocess_module():
+    mod_path = Path("service") / "preprocess.py"
+    assert mod_path.exists(), "service/preprocess.py manquant"
+    spec = importlib.util.spec_from_file_location("preprocess", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+def legacy_clean_text(m, s, enable_spellcorrect=True):
+    """Implémentation de référence (6 passes regex + NFKC systématique)."""
+    if s is None:
+        return s
+    m._load_tokenizer_vocab()
+    s1 = unicodedata.normalize("NFKC", str(s))
+    s1 = re.compile(r"https?://\S+|www\.\S+").sub(" ", s1)
+    s1 = re.compile(r"[\U00010000-\U0010ffff]", flags=re.UNICODE).sub(" ", s1)
+    s1 = s1.lower()
+    s1 = re.sub(r"[^a-z0-9\s']", " ", s1)
+    s1 = re.sub(r"\s+", " ", s1).strip()
+    s1 = re.sub(r"(.)\1{2,}", r"\1\1", s1)
+    if not enable_spellcorrect or m._TOKENIZER_VOCAB is None:
+        return s1
+    return " ".join(m._correct_token_cached(t.strip()) for t in s1.split())
+
+def _corpus():
+    rng = random.Random(0)
+    base = [
+        "Hello WORLD!!!  ", "Visit https://example.com 😃 NOW!", "I can't... believe\tthis!!",
+        "Sooooo goooood", "ＦＵＬＬＷＩＤＴＨ ｔｅｘｔ", "ﬁne ligature", "Ⅻ ① ²³", "İstanbul ǅ",
+        "www.spam.com/buy NOW http://x.y😃z", "tab\tnew\nline\x0bvt\x1cfs nbsp em　ideo",
+        "𝐁𝐨𝐥𝐝 𝕕𝕠𝕦𝕓𝕝𝕖", "émoji 🎉🎉 à côté", "", "   ", "'''", "aaa''' 111", None, 42,
+    ]
+    pools = ["abc XYZ 09'", " \t\n", "!?.,;:-_()", "éèàüßÆØ", "😃🎉𝐁", "  ​　",
+             "ﬁﬂＡＢ①²", "http://", "www.", "İĲǅ"]
+    fuzz = []
+    for _ in range(2000):
+        fuzz.append("".join(rng.choice(rng.choice(pools)) for _ in range(rng.randrange(0, 40))))
+    return base + fuzz
+
+def test_clean_text_batch_matches_legacy_clean_text():
+    m = load_preprocess_module()
+    corpus = _corpus()
+    for spell in (False, True):
+        expected = [legacy_clean_text(m, s, spell) for s in corpus]
+        assert m.clean_text_batch(corpus, enable_spellcorrect=spell) == expected
+        assert [m.clean_text(s, spell) for s in corpus[:50]] == expected[:50]
+
+def test_training_clean_text_is_the_service_implementation():
+    from src.utils_text import clean_text as train_clean_text
+    m = load_preprocess_module()
+    for s in _corpus()[:300]:
+        if s is not None:
+            assert train_clean_text(s) == m.clean_text(s, enable_spellcorrect=False)
@@ -0,0 +1,41 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from src import dataio
+
+
+def _write_csv(path, n):
+    pd.DataFrame({
+        "id": [f"id{i}" for i in range(n)],
+        "comment_text": [f"comment {i}" if i % 7 else "" for i in range(n)],
+        "toxic": [str(i % 2) for i in range(n)],
+        "extra": ["x" * 50] * n,  # colonne inutile : jamais parsée
+    }).to_csv(path, index=False)
+
+
+def test_load_df_reads_only_requested_rows_and_columns(tmp_path):
+    p = tmp_path / "train.csv"
+    _write_csv(p, 250)
+
+    df = dataio.load_df(p, 30)
+    assert list(df.columns) == ["id", "comment_text", "toxic"]  # colonnes absentes ignorées
+    assert len(df) == 30 and df["id"].iloc[-1] == "id29"
+    assert df["comment_text"].iloc[0] == ""  # keep_default_na=False : pas de NaN
+
+    full = dataio.load_df(p, None, columns=None)
+    assert len(full) == 250 and "extra" in full.columns
+
+
+def test_iter_df_yields_fixed_size_chunks_in_order(tmp_path):
+    p = tmp_path / "train.csv"
+    _write_csv(p, 250)
+
+    chunks = list(dataio.iter_df(p, chunksize=100, columns=["id", "comment_text"]))
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    assert pd.concat(chunks)["id"].tolist() == [f"id{i}" for i in range(250)]
+    assert all(list(c.columns) == ["id", "comment_text"] for c in chunks)
+
+    capped = list(dataio.iter_df(p, chunksize=100, n_rows=130))
+    assert [len(c) for c in capped] == [100, 30]
+    assert pd.concat(capped, ignore_index=True).equals(dataio.load_df(p, 130))
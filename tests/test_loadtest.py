@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from benchmarks import loadtest
+
+
+def test_payload_mix_and_duplicate_ratio():
+    sizes, weights = loadtest.parse_sizes("1:0.5,10:0.5")
+    assert sizes == [1, 10] and weights == [0.5, 0.5]
+    make = loadtest.PayloadFactory(sizes, weights, dup=0.5, seed=0, corpus_size=500, hot_size=5)
+    reqs = [make() for _ in range(400)]
+    assert {len(r) for r in reqs} == {1, 10}
+    texts = [t for r in reqs for t in r]
+    hot = sum(t in make.hot for t in texts) / len(texts)
+    assert 0.4 < hot < 0.6
+    cold = [t for t in texts if t not in make.hot]
+    assert len(set(cold)) == len(cold)  # textes froids jamais répétés
+
+
+def test_recorder_percentiles_ignore_errors():
+    rec = loadtest.Recorder()
+    for i in range(1, 1001):
+        rec.add(i / 1000.0, 200, 2)
+    rec.add(9.0, 429, 2)
+    rep = rec.report(10.0)
+    assert rep["requests"] == 1001 and rep["ok"] == 1000 and rep["status"]["429"] == 1
+    assert rep["latency_ms"]["p50"] == 500.0 and rep["latency_ms"]["p99.9"] == 999.0
+    assert rep["throughput_rps"] == 100.0 and rep["throughput_texts_s"] == 200.0
@@ -0,0 +1,64 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+
+def load_metrics_module():
+    mod_path = Path("service") / "metrics.py"
+    assert mod_path.exists(), "service/metrics.py manquant"
+    spec = importlib.util.spec_from_file_location("metrics", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+
+def test_histogram_buckets_and_prometheus_text():
+    m = load_metrics_module()
+    h = m.Histogram("x_seconds", "aide", buckets=(0.1, 1.0), label="stage")
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v, "model")
+    with h.time("pad"):
+        pass
+    cum, total, n = h.snapshot("model")
+    assert cum == [2, 3, 4] and n == 4 and abs(total - 3.65) < 1e-9
+
+    text = m.render([h, m.CallbackMetric("rss_bytes", "rss", lambda: 42),
+                     m.CallbackMetric("absent", "ignoré", lambda: None)])
+    assert "# TYPE x_seconds histogram" in text
+    assert 'x_seconds_bucket{stage="model",le="0.1"} 2' in text
+    assert 'x_seconds_bucket{stage="model",le="+Inf"} 4' in text
+    assert 'x_seconds_count{stage="model"} 4' in text
+    assert 'x_seconds_count{stage="pad"} 1' in text
+    assert "rss_bytes 42" in text and "absent" not in text
+    assert m.process_rss_bytes() > 0
+
+
+def test_metrics_report_stages_after_predict(monkeypatch):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from service import app as app_mod
+
+    class _Stub:
+        """Modèle factice : scores nuls."""
+        mask_zero = True
+
+        def predict(self, arr, verbose=0):
+            return np.zeros((arr.shape[0], 6), dtype="float32")
+
+    monkeypatch.setattr(app_mod, "tokenizer", app_mod._load_tokenizer())
+    monkeypatch.setattr(app_mod, "LABELS", ["toxic", "severe_toxic", "obscene", "threat", "insult", "identity_hate"])
+    monkeypatch.setattr(app_mod, "model", _Stub())
+    monkeypatch.setattr(app_mod, "batcher", None)
+    monkeypatch.setattr(app_mod, "cache", None)
+    client = TestClient(app_mod.app)
+    assert client.post("/predict", json={"texts": ["you idiot", "hello"]}).status_code == 200
+    text = client.get("/metrics").text
+    for stage in ("preprocess", "tokenize", "pad", "model", "response", "total"):
+        assert f'toxicity_stage_seconds_count{{stage="{stage}"}}' in text
+    assert "toxicity_texts_per_request_count" in text
+    assert "toxicity_model_batch_size_count" in text
+    assert "toxicity_spellcheck_cache_hit_ratio" in text
+    assert "process_resident_memory_bytes" in text
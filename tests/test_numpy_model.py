@@ -0,0 +1,108 @@
+import importlib.util
+from pathlib import Path
+import pytest
+
+np = pytest.importorskip("numpy")
+
+def load_numpy_model_module():
+    mod_path = Path("service") / "numpy_model.py"
+    assert mod_path.exists(), "service/numpy_model.py manquant"
+    spec = importlib.util.spec_from_file_location("numpy_model", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+def test_numpy_bilstm_matches_keras(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    from tensorflow.keras import layers, models
+    m = load_numpy_model_module()
+
+    # même architecture que src/step2_train.py (vocab réduit pour la vitesse)
+    vocab, max_len = 500, 120
+    keras_model = models.Sequential([
+        layers.Input(shape=(max_len,), dtype="int32"),
+        layers.Embedding(input_dim=vocab, output_dim=64),
+        layers.Bidirectional(layers.LSTM(64)),
+        layers.Dropout(0.2),
+        layers.Dense(64, activation="relu"),
+        layers.Dense(6, activation="sigmoid"),
+    ])
+    rng = np.random.default_rng(0)
+    keras_model.set_weights([rng.normal(0, 0.3, w.shape).astype("float32") for w in keras_model.get_weights()])
+
+    path = m.export_keras_weights(keras_model, tmp_path / "model_weights.npz")
+    np_model = m.NumpyBiLSTM.load(path)
+
+    # séquences right-paddées comme en production (longueurs variées, dont vide)
+    arr = np.zeros((7, max_len), dtype="int32")
+    for i, n in enumerate([0, 1, 5, 17, 60, 119, 120]):
+        arr[i, :n] = rng.integers(1, vocab, size=n)
+
+    expected = keras_model.predict(arr, verbose=0)
+    got = np_model.predict(arr, verbose=0)
+    assert got.shape == expected.shape == (7, 6)
+    np.testing.assert_allclose(got, expected, atol=1e-5)
+    assert np_model.predict(np.zeros((0, max_len), dtype="int32")).shape == (0, 6)
+
+def test_numpy_bilstm_mask_zero_matches_keras_and_ignores_padding(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    from tensorflow.keras import layers, models
+    m = load_numpy_model_module()
+
+    vocab = 300
+    keras_model = models.Sequential([
+        layers.Input(shape=(None,), dtype="int32"),
+        layers.Embedding(input_dim=vocab, output_dim=64, mask_zero=True),
+        layers.Bidirectional(layers.LSTM(64)),
+        layers.Dropout(0.2),
+        layers.Dense(64, activation="relu"),
+        layers.Dense(6, activation="sigmoid"),
+    ])
+    rng = np.random.default_rng(1)
+    keras_model.set_weights([rng.normal(0, 0.3, w.shape).astype("float32") for w in keras_model.get_weights()])
+    np_model = m.NumpyBiLSTM.load(m.export_keras_weights(keras_model, tmp_path / "w.npz"))
+    assert np_model.mask_zero
+
+    arr = np.zeros((4, 120), dtype="int32")
+    for i, n in enumerate([1, 6, 16, 40]):
+        arr[i, :n] = rng.integers(1, vocab, size=n)
+
+    full = np_model.predict(arr)
+    np.testing.assert_allclose(full, keras_model.predict(arr, verbose=0), atol=1e-5)
+    # padding plus court (bucket) -> mêmes scores
+    np.testing.assert_allclose(np_model.predict(arr[:, :40]), full, atol=1e-6)
+
+def test_quantized_variants_stay_close_to_float32(tmp_path):
+    m = load_numpy_model_module()
+    rng = np.random.default_rng(2)
+    vocab, emb, units = 2000, 64, 64
+    shapes = {
+        "embedding": (vocab, emb),
+        "fwd_kernel": (emb, 4 * units), "fwd_recurrent_kernel": (units, 4 * units), "fwd_bias": (4 * units,),
+        "bwd_kernel": (emb, 4 * units), "bwd_recurrent_kernel": (units, 4 * units), "bwd_bias": (4 * units,),
+        "dense_kernel": (2 * units, 64), "dense_bias": (64,),
+        "out_kernel": (64, 6), "out_bias": (6,),
+    }
+    weights = {k: rng.normal(0, 0.2, s).astype("float32") for k, s in shapes.items()}
+    weights["mask_zero"] = np.asarray(True)
+    ref = m.NumpyBiLSTM(weights)
+
+    arr = np.zeros((16, 120), dtype="int32")
+    for i, n in enumerate(rng.integers(1, 121, size=16)):
+        arr[i, :n] = rng.integers(1, vocab, size=n)
+    expected = ref.predict(arr)
+    np.savez(tmp_path / "ref.npz", **m.quantize_weights(weights, "float32"))
+
+    for variant, tol in (("float16", 1e-2), ("int8", 5e-2)):
+        path = tmp_path / m.VARIANT_FILES[variant]
+        np.savez(path, **m.quantize_weights(weights, variant))
+        q = m.NumpyBiLSTM.load(path)
+        assert q.variant == variant and q.mask_zero
+        assert q.nbytes < ref.nbytes
+        assert path.stat().st_size < (tmp_path / "ref.npz").stat().st_size
+        got = q.predict(arr)
+        assert got.dtype == np.float32
+        assert np.abs(got - expected).max() < tol, variant
+
+    with pytest.raises(ValueError):
+        m.quantize_weights(weights, "int4")
@@ -0,0 +1,65 @@
+import random
+import re
+import time
+
+from service.pii_scan import ADDRESS_RE, CREDIT_CARD_RE, REGEX_PATTERNS, USERNAME_RE, PiiScrubber
+
+
+def _sequential(text, counts, use_label_tokens=True):
+    """Passe regex historique de src/anonymize.py : 7 re.sub successifs."""
+    def _mask(label):
+        return label if use_label_tokens else "****"
+
+    if not text:
+        return text
+    tmp = text
+    for label in ["EMAIL", "IP", "PHONE", "URL"]:
+        def repl(m, L=label):
+            counts[L] = counts.get(L, 0) + 1
+            return _mask(L)
+        tmp = REGEX_PATTERNS[label].sub(repl, tmp)
+    tmp = ADDRESS_RE.sub(lambda m: (counts.__setitem__("ADDRESS", counts.get("ADDRESS", 0) + 1)) or _mask("ADDRESS"), tmp)
+
+    def cc_repl(m):
+        digits = re.sub(r"\D", "", m.group(0))
+        if 13 <= len(digits) <= 19:
+            counts["CREDIT_CARD"] = counts.get("CREDIT_CARD", 0) + 1
+            return _mask("CREDIT_CARD")
+        return m.group(0)
+    tmp = CREDIT_CARD_RE.sub(cc_repl, tmp)
+    return USERNAME_RE.sub(lambda m: (counts.__setitem__("USERNAME", counts.get("USERNAME", 0) + 1)) or _mask("USERNAME"), tmp)
+
+
+_PIECES = [
+    "hello", "you idiot", " ", "  ", ".", "..", "@", "-", "+33 6 12 34 56 78", "555-123-4567", "(01) 234 5678",
+    "john.doe@example.com", "a.b@c", "x@y.co", ".x@d.ee", "a@b.cc.x@d.ee", "192.168.0.1", "1.2.3.4.5",
+    "http://ex.com/a?b=1", "https://t.co", "www.site.org", "wwwx", "12 rue de la Paix", "5 Main Street",
+    "4111 1111 1111 1111", "4111-1111-1111-1111-1111-11", "1234567890123", "@troll_42", "mail@", "@a",
+    "١٢٣٤٥٦٧٨٩٠١٢٣", "é@ü.de", "12:30", "2020", "0", "99999", "\n", "...@...", "a+b%c@x-y.z.com",
+]
+
+
+def test_scrubber_matches_sequential_subs_on_random_texts():
+    rng = random.Random(0)
+    for use_labels in (True, False):
+        scrub = PiiScrubber(use_labels).scrub
+        for _ in range(3000):
+            sep = rng.choice(["", " ", ",", "."])
+            text = sep.join(rng.choice(_PIECES) for _ in range(rng.randint(0, 8)))
+            expected_counts, counts = {}, {}
+            expected = _sequential(text, expected_counts, use_labels)
+            assert scrub(text, counts) == expected, text
+            assert counts == expected_counts, text
+
+
+def test_scrubber_is_linear_on_pathological_inputs():
+    scrub = PiiScrubber().scrub
+    # longues suites de caractères d'email sans '@' valide : quadratique avec EMAIL_RE.sub
+    for text in ["a" * 4000 + "@", "1.2.3." * 1000, ("a" * 50 + "@x ") * 100, "1 " * 3000]:
+        counts, expected_counts = {}, {}
+        assert scrub(text, counts) == _sequential(text, expected_counts)
+        assert counts == expected_counts
+    t0 = time.perf_counter()
+    assert scrub("a" * 50000 + "@") == "a" * 50000 + "@"
+    scrub("1.2.3." * 10000)
+    assert time.perf_counter() - t0 < 0.5
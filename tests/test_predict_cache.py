@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from service import app as app_mod
+from service.cache import PredictionCache
+
+
+class _CountingStub:
+    """Modèle factice : toxique si un id >= 3000 ; compte les lignes réellement scorées."""
+    mask_zero = True
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict(self, arr, verbose=0):
+        self.rows += arr.shape[0]
+        return np.repeat((arr >= 3000).any(axis=1, keepdims=True).astype("float32"), 6, axis=1)
+
+
+def test_duplicates_scored_once_and_cached(monkeypatch):
+    stub = _CountingStub()
+    monkeypatch.setattr(app_mod, "tokenizer", app_mod._load_tokenizer())
+    monkeypatch.setattr(app_mod, "LABELS", ["toxic", "severe_toxic", "obscene", "threat", "insult", "identity_hate"])
+    monkeypatch.setattr(app_mod, "model", stub)
+    monkeypatch.setattr(app_mod, "batcher", None)
+    monkeypatch.setattr(app_mod, "cache", PredictionCache(maxsize=100, version="test"))
+    client = TestClient(app_mod.app)
+
+    texts = ["you idiot", "You IDIOT!!", "hello there", "you idiot"]
+    r = client.post("/predict", json={"texts": texts})
+    assert r.status_code == 200
+    assert r.json()["labels"] == ["toxic", "toxic", "non toxic", "toxic"]
+    assert stub.rows == 2  # 2 textes distincts après nettoyage
+
+    r = client.post("/predict", json={"texts": ["hello there", "you idiot", "first"]})
+    assert r.json()["labels"] == ["non toxic", "toxic", "non toxic"]
+    assert stub.rows == 3  # seul "first" est nouveau
+    st = app_mod.cache.stats()
+    assert st["hits"] == 2 and st["misses"] == 3
@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+from service import app as app_mod
+
+
+class _MaskedStub:
+    """Modèle factice insensible au padding : score = somme des ids."""
+    mask_zero = True
+
+    def __init__(self):
+        self.shapes = []
+
+    def predict(self, arr, verbose=0):
+        self.shapes.append(arr.shape)
+        return np.repeat(arr.sum(axis=1, keepdims=True).astype("float32"), 6, axis=1)
+
+
+def test_pad_truncates_and_right_pads():
+    out = app_mod._pad([[1, 2, 3], [], list(range(1, 10))], maxlen=4)
+    assert out.dtype == np.int32
+    assert out.tolist() == [[1, 2, 3, 0], [0, 0, 0, 0], [1, 2, 3, 4]]
+
+
+def test_forward_buckets_by_length_and_restores_order(monkeypatch):
+    stub = _MaskedStub()
+    monkeypatch.setattr(app_mod, "model", stub)
+    monkeypatch.setattr(app_mod, "PAD_BUCKETS", [4, 16, 120])
+    monkeypatch.setattr(app_mod, "PREDICT_SUB_BATCH", 2)
+
+    seqs = [[1] * 10, [2], [3, 3], [4] * 200, [5] * 3]
+    preds = app_mod._forward(seqs)
+    assert preds[:, 0].tolist() == [10, 2, 6, 480, 15]  # 200 tronqué à MAX_LEN
+    assert all(n <= 2 for n, _ in stub.shapes)
+    assert sorted({t for _, t in stub.shapes}) == [4, 16, 120]
+
+
+def test_forward_keeps_fixed_padding_without_mask(monkeypatch):
+    stub = _MaskedStub()
+    stub.mask_zero = False
+    monkeypatch.setattr(app_mod, "model", stub)
+    app_mod._forward([[1], [2, 2]])
+    assert stub.shapes == [(2, app_mod.MAX_LEN)]
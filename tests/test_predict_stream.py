@@ -0,0 +1,93 @@
+import json
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from service import app as app_mod
+from service.cache import PredictionCache
+
+LABELS = ["toxic", "severe_toxic", "obscene", "threat", "insult", "identity_hate"]
+
+
+class _Stub:
+    """Modèle factice : toxique si un id >= 3000 ; garde la taille des batches reçus."""
+    mask_zero = True
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, arr, verbose=0):
+        self.batches.append(arr.shape[0])
+        return np.repeat((arr >= 3000).any(axis=1, keepdims=True).astype("float32"), 6, axis=1)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_mod, "tokenizer", app_mod._load_tokenizer())
+    monkeypatch.setattr(app_mod, "LABELS", LABELS)
+    monkeypatch.setattr(app_mod, "model", _Stub())
+    monkeypatch.setattr(app_mod, "batcher", None)
+    monkeypatch.setattr(app_mod, "cache", PredictionCache(maxsize=0))
+    monkeypatch.setattr(app_mod, "STREAM_CHUNK_SIZE", 2)
+    monkeypatch.setattr(app_mod, "STREAM_MAX_LINE_BYTES", 64)
+    return TestClient(app_mod.app)
+
+
+def test_stream_matches_predict_in_chunks(client):
+    texts = ["you idiot", "hello there", "first", "you are an idiot", "thanks"]
+    body = "".join(json.dumps(t) + "\n" for t in texts).encode()
+
+    def chunks():  # découpage arbitraire, au milieu des lignes
+        for i in range(0, len(body), 7):
+            yield body[i:i + 7]
+
+    r = client.post("/predict/stream", content=chunks())
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(l) for l in r.text.splitlines()]
+    expected = client.post("/predict", json={"texts": texts}).json()["labels"]
+    assert [row["label"] for row in rows] == expected
+    assert [row["index"] for row in rows] == list(range(len(texts)))
+    assert set(rows[0]["scores"]) == set(LABELS)
+    assert max(app_mod.model.batches[:3]) <= 2  # chunks de STREAM_CHUNK_SIZE
+
+
+def test_stream_ids_and_errors_keep_order(client):
+    body = "\n".join([
+        json.dumps({"id": "a", "text": "you idiot"}),
+        "",
+        "{pas du json",
+        json.dumps({"id": 7, "text": "hello"}),
+        json.dumps("x" * 100),
+        json.dumps({"text": 3}),
+    ]).encode()
+    rows = [json.loads(l) for l in client.post("/predict/stream", content=body).text.splitlines()]
+    assert [r["index"] for r in rows] == [0, 1, 2, 3, 4]
+    assert rows[0]["id"] == "a" and rows[0]["label"] == "toxic"
+    assert "error" in rows[1] and "error" in rows[3] and "error" in rows[4]
+    assert rows[2]["id"] == 7 and rows[2]["label"] == "non toxic"
+
+
+def test_stream_chunks_go_through_admission(client, monkeypatch):
+    from service.admission import AdmissionController, Rejected
+
+    class _Ctl(AdmissionController):
+        rejects = 1
+
+        async def acquire(self):
+            if self.rejects:  # surcharge au premier chunk : le flux attend puis réessaie
+                self.rejects -= 1
+                raise Rejected(0.01, "test")
+            return await super().acquire()
+
+    ctl = _Ctl(target_s=10.0, initial_limit=4, max_limit=4)
+    monkeypatch.setattr(app_mod, "admission", ctl)
+    texts = ["you idiot", "hello there", "first", "you are an idiot", "thanks"]
+    body = "".join(json.dumps(t) + "\n" for t in texts).encode()
+    rows = [json.loads(l) for l in client.post("/predict/stream", content=body).text.splitlines()]
+    assert [row["index"] for row in rows] == list(range(len(texts)))
+    st = ctl.stats()
+    assert st["admitted"] == 3 and st["inflight"] == 0  # un slot par chunk de 2, tous rendus
@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.prep_cache import PrepCache, cache_key, code_digest
+
+
+def test_cache_key_tracks_content_rows_and_config(tmp_path):
+    p = tmp_path / "train.csv"
+    p.write_text("id,comment_text\n1,hello\n", encoding="utf-8")
+    k = cache_key(p, 100, {"max_len": 120})
+    assert k == cache_key(p, 100, {"max_len": 120})
+    assert k != cache_key(p, 200, {"max_len": 120})
+    assert k != cache_key(p, 100, {"max_len": 64})
+    assert k != cache_key(p, 100, {"max_len": 120}, ("service/preprocess.py",))  # sources du prétraitement
+    p.write_text("id,comment_text\n1,hello!\n", encoding="utf-8")
+    assert k != cache_key(p, 100, {"max_len": 120})
+
+
+def test_code_digest_tracks_sources():
+    d = code_digest(("service/preprocess.py",))
+    assert d == code_digest(("service/preprocess.py",))
+    assert d != code_digest(("service/preprocess.py", "service/pii_scan.py"))
+
+
+def test_entry_roundtrip_texts_and_mmapped_arrays(tmp_path):
+    cache = PrepCache(tmp_path)
+    assert cache.get("train", "k") is None
+    w = cache.writer("train", "k")
+    w.extend_texts("cleaned", ["héllo", ""])
+    w.extend_texts("cleaned", [None, "monde 🌍"])  # ajout par chunk
+    w.save_array("Xtr", np.arange(12, dtype=np.int32).reshape(3, 4))
+    w.save_text("tokenizer.json", '{"a": 1}')
+    w.meta = {"n_train": 3}
+    assert cache.get("train", "k") is None  # rien de visible avant commit()
+    w.commit()
+
+    e = cache.get("train", "k")
+    assert e.meta == {"n_train": 3}
+    texts = e.texts("cleaned")
+    assert len(texts) == 4 and texts.tolist() == ["héllo", "", "", "monde 🌍"]
+    assert texts[1:3] == ["", ""]
+    X = e.array("Xtr")
+    assert isinstance(X, np.memmap) and X.dtype == np.int32 and X[2, 3] == 11
+    assert e.read_text("tokenizer.json") == '{"a": 1}'
+
+
+def test_abort_leaves_no_entry(tmp_path):
+    cache = PrepCache(tmp_path)
+    w = cache.writer("anonymize", "k")
+    w.extend_texts("anonymized", ["x"])
+    w.abort()
+    assert cache.get("anonymize", "k") is None
+    assert list(tmp_path.iterdir()) == []
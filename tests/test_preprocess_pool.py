@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from service import preprocess as pp
+from service.preprocess_pool import PreprocessPool
+from service.tokenizer import BatchTokenizer
+
+
+class _Stub:
+    mask_zero = True
+
+    def predict(self, arr, verbose=0):
+        # score dépendant des ids et de la longueur : détecte tout décalage de ligne
+        return np.repeat(((arr % 97).sum(axis=1, keepdims=True) % 13 / 13.0).astype("float32"), 6, axis=1)
+
+
+def test_pool_matches_inline_preprocessing(monkeypatch):
+    texts = ["You are an IDIOOOT!!! http://x.y", "hello   wrld", "", "Thanks for the artcle", "ok"] * 3
+    tok = BatchTokenizer.from_vocab(pp.load_vocab())
+    expected = pp.clean_text_batch(texts)
+    exp_ids, exp_len = tok.encode_batch(expected, 120, assume_clean=True)
+
+    pool = PreprocessPool(2, max_inflight=1, chunk_size=4)  # max_inflight=1 : tranches sérialisées
+    try:
+        pool.warmup()
+        cleaned, ids, lengths = pool.clean_and_encode(texts, 120)
+        empty = pool.clean_and_encode([], 120)
+        # le slot est libéré par un done-callback, qui peut tourner après le réveil de result()
+        deadline = time.monotonic() + 5
+        while pool.stats()["inflight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        st = pool.stats()
+
+        # chemin /predict : mêmes scores avec ou sans pool (doublons et cache compris)
+        from service import app as app_mod
+        monkeypatch.setattr(app_mod, "tokenizer", tok)
+        monkeypatch.setattr(app_mod, "LABELS", ["toxic", "a", "b", "c", "d", "e"])
+        monkeypatch.setattr(app_mod, "model", _Stub())
+        monkeypatch.setattr(app_mod, "batcher", None)
+        monkeypatch.setattr(app_mod, "cache", None)
+        inline_scores = app_mod._score(texts)
+        monkeypatch.setattr(app_mod, "preproc_pool", pool)
+        pooled_scores = app_mod._score(texts)
+    finally:
+        pool.close()
+
+    assert cleaned == expected
+    np.testing.assert_array_equal(ids, exp_ids)
+    np.testing.assert_array_equal(lengths, exp_len)
+    assert empty[0] == [] and empty[1].shape == (0, 120)
+    np.testing.assert_array_equal(pooled_scores, inline_scores)
+    assert st["tasks"] == 4 and st["texts"] == len(texts) and st["inflight"] == 0
@@ -0,0 +1,150 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from service import app as app_mod
+from service.cache import PredictionCache
+
+
+class _Const:
+    """Modèle factice masqué : score constant, enregistre les formes reçues."""
+    mask_zero = True
+
+    def __init__(self, value):
+        self.value = value
+        self.shapes = []
+
+    def predict(self, arr, verbose=0):
+        self.shapes.append(arr.shape)
+        return np.full((arr.shape[0], 6), self.value, dtype="float32")
+
+
+@pytest.fixture
+def served(monkeypatch):
+    state = {"model": _Const(0.0), "version": "v1"}
+    monkeypatch.setenv("APP_SKIP_STARTUP", "0")
+    monkeypatch.setattr(app_mod, "_load_model", lambda: state["model"])
+    monkeypatch.setattr(app_mod, "_artifact_version", lambda base=None: state["version"])
+    monkeypatch.setattr(app_mod, "WARMUP_BATCH_SIZES", [1])
+    monkeypatch.setattr(app_mod, "BATCH_MAX_SIZE", 4)
+    monkeypatch.setattr(app_mod, "PREPROC_WORKERS", 0)
+    monkeypatch.setattr(app_mod, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(app_mod, "RELOAD_POLL_S", 0)
+    monkeypatch.setattr(app_mod, "admission", None)
+    monkeypatch.setattr(app_mod, "cache", PredictionCache(maxsize=100))
+    # globals restaurés après le test
+    for name in ("tokenizer", "LABELS", "model", "batcher", "preproc_pool", "_vocab", "_gen",
+                 "MODEL_VERSION", "MODEL_LOAD_SECONDS", "_reload_lock", "_watch_task"):
+        monkeypatch.setattr(app_mod, name, getattr(app_mod, name))
+    monkeypatch.setattr(app_mod, "STARTUP_SECONDS", {})
+    monkeypatch.setattr(app_mod, "RELOAD_STATE", dict(app_mod.RELOAD_STATE, reloads=0, failures=0))
+    with TestClient(app_mod.app) as client:
+        yield client, state
+
+
+def _reload(client, **params):
+    return client.post("/admin/reload", params=params, headers={"X-Admin-Token": "s3cret"})
+
+
+def test_reload_requires_admin_token(served, monkeypatch):
+    client, _ = served
+    assert client.post("/admin/reload").status_code == 403
+    monkeypatch.setattr(app_mod, "ADMIN_TOKEN", "")
+    assert _reload(client).status_code == 404
+
+
+def test_reload_warms_then_swaps_and_reports_version(served):
+    client, state = served
+    assert client.post("/predict", json={"texts": ["hello"]}).json()["labels"] == ["non toxic"]
+    assert _reload(client).json() == {"reloaded": False, "model_version": "v1"}  # rien n'a changé
+
+    new = state["model"] = _Const(1.0)
+    state["version"] = "v2"
+    out = _reload(client).json()
+    assert out["reloaded"] and out["previous_version"] == "v1" and out["model_version"] == "v2"
+    assert new.shapes[:len(app_mod.PAD_BUCKETS)] == [(1, L) for L in app_mod.PAD_BUCKETS]  # chauffé avant bascule
+    # même texte : le cache de l'ancienne version ne sert plus
+    assert client.post("/predict", json={"texts": ["hello"]}).json()["labels"] == ["toxic"]
+    health = client.get("/health").json()
+    assert health["model_version"] == "v2" and health["reload"]["reloads"] == 1
+
+
+def test_failed_reload_keeps_serving_old_artifacts(served, monkeypatch):
+    client, state = served
+    state["version"] = "v2"
+
+    def broken():
+        raise RuntimeError("model.keras illisible")
+    monkeypatch.setattr(app_mod, "_load_model", broken)
+    r = _reload(client)
+    assert r.status_code == 500
+    health = client.get("/health").json()
+    assert health["status"] == "ready" and health["model_version"] == "v1"
+    assert "illisible" in health["reload"]["last_error"] and health["reload"]["failures"] == 1
+
+
+def test_corrupt_vocab_fails_reload(served, monkeypatch, tmp_path):
+    client, state = served
+    (tmp_path / "labels.txt").write_text((app_mod.BASE_DIR / "labels.txt").read_text(encoding="utf-8"))
+    (tmp_path / "vocab.bin").write_bytes(b"TXVOCAB1 truncated")
+    monkeypatch.setattr(app_mod, "BASE_DIR", tmp_path)
+    served_vocab = app_mod._vocab
+    state["model"], state["version"] = _Const(1.0), "v2"
+    assert _reload(client).status_code == 500
+    health = client.get("/health").json()
+    assert health["model_version"] == "v1" and health["reload"]["failures"] == 1
+    assert app_mod._vocab is served_vocab and app_mod.load_vocab() is served_vocab
+    assert client.post("/predict", json={"texts": ["hello"]}).json()["labels"] == ["non toxic"]
+
+
+def test_failed_reload_closes_half_built_artifacts(served, monkeypatch):
+    client, state = served
+    built = []
+
+    class _Batcher(app_mod.MicroBatcher):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            built.append(self)
+
+    class _BrokenPool:
+        def __init__(self, *a, **kw):
+            self.closed = False
+            built.append(self)
+
+        def warmup(self):
+            raise RuntimeError("worker mort au démarrage")
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(app_mod, "MicroBatcher", _Batcher)
+    monkeypatch.setattr(app_mod, "PreprocessPool", _BrokenPool)
+    monkeypatch.setattr(app_mod, "PREPROC_WORKERS", 1)
+    state["version"] = "v2"
+    assert _reload(client).status_code == 500
+    b, pool = built
+    assert b._closed and pool.closed
+    assert client.get("/health").json()["model_version"] == "v1"
+
+
+def test_inflight_request_finishes_on_old_artifacts(served):
+    client, state = served
+    art = app_mod._acquire()  # requête en cours au moment du reload
+    try:
+        state["model"], state["version"] = _Const(1.0), "v2"
+        assert _reload(client).json()["reloaded"]
+        # toujours l'ancien modèle, via son propre batcher (encore ouvert)
+        assert float(app_mod._score(["hello"], art)[0, 0]) == 0.0
+        assert not art.batcher._closed
+    finally:
+        app_mod._release(art)
+    deadline = time.monotonic() + 5
+    while not art.batcher._closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert art.batcher._closed  # fermé une fois sa dernière requête terminée
+    assert float(app_mod._score(["hello"])[0, 0]) == 1.0
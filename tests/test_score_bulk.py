@@ -0,0 +1,78 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from service.numpy_model import WEIGHT_KEYS
+from src import score_bulk
+
+LABELS = ["toxic", "severe_toxic", "obscene", "threat", "insult", "identity_hate"]
+
+
+def _service_dir(tmp_path):
+    """Dossier service minimal : labels + petit BiLSTM NumPy aléatoire + copie du vocab.bin du repo."""
+    rng = np.random.default_rng(0)
+    vocab, emb, units = 8000, 8, 4
+    shapes = {
+        "embedding": (vocab, emb),
+        "fwd_kernel": (emb, 4 * units), "fwd_recurrent_kernel": (units, 4 * units), "fwd_bias": (4 * units,),
+        "bwd_kernel": (emb, 4 * units), "bwd_recurrent_kernel": (units, 4 * units), "bwd_bias": (4 * units,),
+        "dense_kernel": (2 * units, 8), "dense_bias": (8,),
+        "out_kernel": (8, 6), "out_bias": (6,),
+    }
+    assert set(shapes) == set(WEIGHT_KEYS)
+    d = tmp_path / "svc"
+    d.mkdir()
+    np.savez(d / "model_weights.npz", mask_zero=np.asarray(True),
+             **{k: rng.normal(0, 0.5, s).astype("float32") for k, s in shapes.items()})
+    (d / "labels.txt").write_text("\n".join(LABELS) + "\n", encoding="utf-8")
+    shutil.copy(Path(__file__).parents[1] / "service" / "vocab.bin", d / "vocab.bin")
+    return d
+
+
+def test_bulk_scoring_chunks_pool_and_resume(tmp_path, capsys):
+    svc = _service_dir(tmp_path)
+    words = ["you", "idiot", "thanks", "great", "article", "hello", "stupid", "wiki", "page"]
+    rng = np.random.default_rng(1)
+    texts = [" ".join(rng.choice(words, size=rng.integers(0, 30))) + "!!" for _ in range(23)]
+    src_csv = tmp_path / "in.csv"
+    pd.DataFrame({"id": [f"c{i}" for i in range(23)], "comment_text": texts, "other": 1}).to_csv(src_csv, index=False)
+
+    inline = score_bulk.main(src_csv, tmp_path / "inline", chunksize=10, workers=0, batch_size=4,
+                             fmt="csv", service_dir=svc)
+    pooled = score_bulk.main(src_csv, tmp_path / "pooled", chunksize=10, workers=2, batch_size=4,
+                             fmt="csv", service_dir=svc)
+    assert inline["rows"] == pooled["rows"] == 23
+
+    read = lambda d: pd.concat([pd.read_csv(p) for p in sorted(d.glob("part-*.csv"))], ignore_index=True)
+    a, b = read(tmp_path / "inline"), read(tmp_path / "pooled")
+    assert list(a.columns) == ["id"] + LABELS and len(a) == 23
+    assert list(a["id"]) == [f"c{i}" for i in range(23)]
+    np.testing.assert_allclose(a[LABELS].to_numpy(), b[LABELS].to_numpy(), rtol=1e-5)
+
+    # même scores que le chemin du service (nettoyage + tokenisation + padding MAX_LEN)
+    score_bulk._init_worker(str(svc))
+    ids, lengths = score_bulk._encode(texts)
+    model = score_bulk.load_model(svc)
+    np.testing.assert_allclose(a[LABELS].to_numpy(), model.predict(ids), rtol=1e-4, atol=1e-6)
+
+    # reprise : un chunk manquant est recalculé, les autres sautés
+    (tmp_path / "inline" / "part-00001.csv").unlink()
+    resumed = score_bulk.main(src_csv, tmp_path / "inline", chunksize=10, workers=0, fmt="csv", service_dir=svc)
+    assert resumed["rows"] == 10 and resumed["skipped_chunks"] == 2
+    pd.testing.assert_frame_equal(read(tmp_path / "inline"), a)
+
+    with pytest.raises(SystemExit):
+        score_bulk.main(src_csv, tmp_path / "inline", chunksize=5, workers=0, fmt="csv", service_dir=svc)
+    # artefacts ré-exportés entre deux runs : pas de reprise sur des parts d'un autre modèle
+    (svc / "labels.txt").write_text("\n".join(LABELS) + "\n\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        score_bulk.main(src_csv, tmp_path / "inline", chunksize=10, workers=0, fmt="csv", service_dir=svc)
+
+
+def test_worker_reads_vocab_from_service_dir(tmp_path):
+    with pytest.raises(RuntimeError):
+        score_bulk._init_worker(str(tmp_path))  # pas de repli silencieux sur le vocab de service/
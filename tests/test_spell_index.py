@@ -0,0 +1,54 @@
+import importlib.util
+import random
+from pathlib import Path
+
+def load_preprocess_module():
+    mod_path = Path("service") / "preprocess.py"
+    assert mod_path.exists(), "service/preprocess.py manquant"
+    spec = importlib.util.spec_from_file_location("preprocess", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+def test_qgram_index_returns_all_words_within_distance():
+    m = load_preprocess_module()
+    m._load_tokenizer_vocab()
+    assert m._INDEX is not None, "vocabulaire tokenizer.json non chargé"
+    words = m._INDEX.words
+    rng = random.Random(0)
+    queries = ["idot", "stupd", "thnks", "x", "helo", "wikipedai", "aa"] + rng.sample(words, 5)
+    sample = rng.sample(words, 1500)
+    idx = m._QGramIndex(sample)
+    for q in queries:
+        for k in (0, 1, 2, 3):
+            expected = {w for w in sample if m._levenshtein_distance(q, w) <= k}
+            assert {w for w, _ in idx.search(q, k)} == expected, (q, k)
+
+def test_correct_token_uses_index():
+    m = load_preprocess_module()
+    m._load_tokenizer_vocab()
+    assert m._correct_token("idot") == "idiot"
+    assert m._correct_token("thnks") == "thanks"
+    assert m._correct_token("zzzzqqq") == "zzzzqqq"
+
+def _dp_distance(a, b):
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        prev = cur
+    return prev[-1]
+
+def test_bounded_bit_parallel_distance_matches_dp():
+    m = load_preprocess_module()
+    rng = random.Random(1)
+    for _ in range(3000):
+        a = "".join(rng.choice("abc'") for _ in range(rng.randrange(0, 14)))
+        b = "".join(rng.choice("abc'") for _ in range(rng.randrange(0, 14)))
+        d = _dp_distance(a, b)
+        assert m._levenshtein_distance(a, b) == d
+        k = rng.randrange(0, 4)
+        assert m._levenshtein_bounded(a, b, k) == min(d, k + 1)
+    cands = ["idiot", "idot", "diot", "i", "", "idiotic", "xxxxxxxxxxxx"]
+    assert m._levenshtein_many("idiot", cands, 2) == [min(_dp_distance("idiot", c), 3) for c in cands]
@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from service import app as app_mod
+
+
+class _ShapeRecorder:
+    """Modèle factice masqué : enregistre les formes reçues."""
+    mask_zero = True
+
+    def __init__(self):
+        self.shapes = []
+
+    def predict(self, arr, verbose=0):
+        self.shapes.append(arr.shape)
+        return np.zeros((arr.shape[0], 6), dtype="float32")
+
+
+def test_startup_warms_served_shapes_and_reports_phases(monkeypatch):
+    stub = _ShapeRecorder()
+    monkeypatch.setenv("APP_SKIP_STARTUP", "0")
+    monkeypatch.setattr(app_mod, "_load_model", lambda: stub)
+    monkeypatch.setattr(app_mod, "WARMUP_BATCH_SIZES", [1, 8])
+    monkeypatch.setattr(app_mod, "BATCH_MAX_SIZE", 1)
+    monkeypatch.setattr(app_mod, "PREPROC_WORKERS", 0)
+    # globals restaurés après le test
+    for name in ("tokenizer", "LABELS", "model", "batcher", "MODEL_VERSION", "MODEL_LOAD_SECONDS"):
+        monkeypatch.setattr(app_mod, name, getattr(app_mod, name))
+    monkeypatch.setattr(app_mod, "STARTUP_SECONDS", {})
+
+    with TestClient(app_mod.app) as client:  # déclenche le startup
+        # warmup : une forme par (longueur de bucket, taille de batch), avant tout trafic
+        assert stub.shapes == [(bs, L) for L in app_mod.PAD_BUCKETS for bs in (1, 8)]
+
+        health = client.get("/health").json()
+        assert health["status"] == "ready"
+        phases = health["startup_seconds"]
+        for phase in ("tokenizer", "labels", "model", "version", "warmup_preprocess", "warmup_model", "total"):
+            assert phases[phase] >= 0
+        assert phases["total"] >= phases["model"]
+        assert 'toxicity_startup_seconds{phase="warmup_model"}' in client.get("/metrics").text
@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+tf = pytest.importorskip("tensorflow")
+
+from src.tf_input import ThroughputCallback, bucketed_dataset
+
+
+def test_bucketed_dataset_pads_each_batch_to_its_bucket_only():
+    rng = np.random.default_rng(0)
+    n, max_len = 200, 120
+    X = np.zeros((n, max_len), dtype=np.int32)
+    lengths = rng.integers(0, max_len + 1, size=n)
+    for i, L in enumerate(lengths):
+        X[i, :L] = i + 1  # id de ligne : permet de retrouver chaque séquence
+    Y = np.arange(n, dtype=np.float32)[:, None]
+
+    seen = []
+    for xb, yb in bucketed_dataset(X, Y, batch_size=16, max_len=max_len, shuffle=False):
+        width = xb.shape[1]
+        assert width in (16, 32, 64, 120) and xb.shape[0] <= 16
+        for row, y in zip(xb.numpy(), yb.numpy()[:, 0]):
+            i = int(y)
+            L = int(lengths[i])
+            assert L <= width and (width == 16 or L > {32: 16, 64: 32, 120: 64}[width])
+            np.testing.assert_array_equal(row[:L], X[i, :L])
+            assert not row[L:].any()
+            seen.append(i)
+    assert sorted(seen) == list(range(n))
+
+
+def test_throughput_callback_records_each_epoch():
+    model = tf.keras.Sequential([tf.keras.layers.Embedding(50, 4, mask_zero=True),
+                                 tf.keras.layers.GlobalAveragePooling1D(),
+                                 tf.keras.layers.Dense(1, activation="sigmoid")])
+    model.compile(optimizer="adam", loss="binary_crossentropy")
+    X = np.random.default_rng(0).integers(0, 50, size=(64, 20)).astype(np.int32)
+    Y = np.zeros((64, 1), dtype=np.float32)
+    cb = ThroughputCallback(len(X))
+    model.fit(bucketed_dataset(X, Y, batch_size=16, max_len=20), epochs=2, verbose=0, callbacks=[cb])
+    assert [e["epoch"] for e in cb.epochs] == [1, 2]
+    assert all(e["samples_per_s"] > 0 for e in cb.epochs)
+    assert cb.steady_samples_per_s() == cb.epochs[1]["samples_per_s"]
@@ -0,0 +1,57 @@
+import json
+import random
+from pathlib import Path
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from service.tokenizer import BatchTokenizer
+from service.preprocess import clean_text, load_vocab
+
+TOKENIZER_JSON = Path("service") / "tokenizer.json"
+
+
+def _corpus():
+    """Textes bruts variés : vocabulaire réel, mots inconnus, ponctuation, casse, blancs."""
+    cfg = json.loads(TOKENIZER_JSON.read_text(encoding="utf-8"))["config"]
+    words = list(json.loads(cfg["word_counts"]))
+    rng = random.Random(0)
+    extra = ["Hello, WORLD!!", "I can't... believe\tthis!!", "Visit https://example.com 😃 NOW!",
+             "  multiple   spaces\n\nand-dashes_under", "zzqx qqwwee", "", "É à ü ß", "you're an IDIOT?!"]
+    texts = []
+    for _ in range(300):
+        toks = [rng.choice(words) if rng.random() < 0.8 else rng.choice(extra) for _ in range(rng.randrange(0, 150))]
+        texts.append(rng.choice([" ", "  ", ", ", "\t"]).join(toks))
+    return texts + extra
+
+
+def test_batch_tokenizer_matches_keras_tokenizer():
+    pytest.importorskip("tensorflow")
+    from tensorflow.keras.preprocessing.text import tokenizer_from_json
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+    ref = tokenizer_from_json(TOKENIZER_JSON.read_text(encoding="utf-8"))
+    corpus = _corpus()
+    expected = ref.texts_to_sequences(corpus)
+
+    for tok in (BatchTokenizer.from_json(TOKENIZER_JSON.read_text(encoding="utf-8")),
+                BatchTokenizer.from_vocab(load_vocab())):
+        assert tok.texts_to_sequences(corpus) == expected
+        ids, lengths = tok.encode_batch(corpus, maxlen=120)
+        assert ids.dtype == np.int32
+        np.testing.assert_array_equal(ids, pad_sequences(expected, maxlen=120, padding="post", truncating="post"))
+        assert lengths.tolist() == [min(len(s), 120) for s in expected]
+
+    # textes déjà nettoyés : le raccourci assume_clean donne les mêmes ids que Keras
+    cleaned = [clean_text(t) for t in corpus]
+    tok = BatchTokenizer.from_vocab(load_vocab())
+    assert tok.texts_to_sequences(cleaned, assume_clean=True) == ref.texts_to_sequences(cleaned)
+
+
+def test_batch_tokenizer_num_words_and_oov():
+    tok = BatchTokenizer({"<unk>": 1, "a": 2, "b": 3, "c": 4}, num_words=4, oov_token="<unk>")
+    assert tok.texts_to_sequences(["A b, c d"]) == [[2, 3, 1, 1]]
+    tok = BatchTokenizer({"a": 1, "b": 2, "c": 3}, num_words=3)
+    assert tok.texts_to_sequences(["a c b d"]) == [[1, 2]]
+    ids, lengths = tok.encode_batch(["a c b b a", ""], maxlen=3)
+    assert ids.tolist() == [[1, 2, 2], [0, 0, 0]] and lengths.tolist() == [3, 0]
@@ -0,0 +1,57 @@
+import importlib.util
+import json
+from pathlib import Path
+import pytest
+
+def load_preprocess_module():
+    mod_path = Path("service") / "preprocess.py"
+    assert mod_path.exists(), "service/preprocess.py manquant"
+    spec = importlib.util.spec_from_file_location("preprocess", mod_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod
+
+def _tokenizer_json():
+    return json.loads((Path("service") / "tokenizer.json").read_text(encoding="utf-8"))
+
+def test_vocab_file_roundtrip_is_pruned_to_num_words(tmp_path):
+    m = load_preprocess_module()
+    word_index, word_counts, num_words, oov = m.vocab_from_tokenizer_json(_tokenizer_json())
+    path = m.write_vocab_file(tmp_path / "vocab.bin", word_index, word_counts, num_words, oov)
+    v = m._Vocab.load(path)
+
+    assert v.num_words == num_words and v.oov_token == oov
+    assert len(v.words) == num_words and v.words[0] == ""
+    assert all(v.word_index[w] == word_index[w] for w in v.word_index)
+    assert {w for w, i in word_index.items() if i < num_words} == set(v.word_index)
+    assert v.count("the") == word_counts["the"]
+    ref = m._Vocab.from_word_index(word_index, word_counts, num_words, oov)
+    for q in ("idot", "thnks", "wikipedai"):
+        assert sorted(v.index.search(q, 2)) == sorted(ref.index.search(q, 2))
+
+def test_vocab_file_from_other_byteorder_is_rejected(tmp_path, monkeypatch):
+    m = load_preprocess_module()
+    other = "big" if m.sys.byteorder == "little" else "little"
+    with monkeypatch.context() as mp:
+        mp.setattr(m.sys, "byteorder", other)
+        path = m.write_vocab_file(tmp_path / "vocab.bin", {"hello": 1}, {"hello": 3}, 10, None)
+    with pytest.raises(ValueError, match="endian"):
+        m._Vocab.load(path)
+    assert m.read_vocab(tmp_path) is None
+
+def test_committed_vocab_file_matches_tokenizer_json():
+    m = load_preprocess_module()
+    v = m._Vocab.load(Path("service") / m.VOCAB_FILE)
+    word_index, _, num_words, oov = m.vocab_from_tokenizer_json(_tokenizer_json())
+    assert v.word_index == {w: i for w, i in word_index.items() if i < num_words}
+
+def test_keras_tokenizer_from_vocab_matches_tokenizer_json():
+    pytest.importorskip("tensorflow")
+    from tensorflow.keras.preprocessing.text import Tokenizer, tokenizer_from_json
+    m = load_preprocess_module()
+    v = m._Vocab.load(Path("service") / m.VOCAB_FILE)
+    tok = Tokenizer(num_words=v.num_words, oov_token=v.oov_token)
+    tok.word_index = v.word_index
+    ref = tokenizer_from_json((Path("service") / "tokenizer.json").read_text(encoding="utf-8"))
+    texts = ["you are a stupid idiot", "the name yuen lou looks like sifu", "zzzq qwxv the", ""]
+    assert tok.texts_to_sequences(texts) == ref.texts_to_sequences(texts)